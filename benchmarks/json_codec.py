@@ -0,0 +1,175 @@
+"""
+Benchmark del perfil RUNTIME_PROFILE=fast: codec JSON (json vs orjson) y event loop (asyncio vs uvloop).
+
+    python -m benchmarks.json_codec
+    python -m benchmarks.json_codec --repeat 50 --channels 1000
+
+Casos JSON: serializar/leer un backup como el de cogs/backup.py y parsear respuestas HTTP
+con la forma de las APIs que usan ltc (BlockCypher), crypto (CoinGecko) y roblox.
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jsoncodec
+
+
+def load_codec(name):
+    """Recarga jsoncodec con el backend pedido; devuelve (backend real, dumps, loads)."""
+    os.environ["JSON_CODEC"] = name
+    module = importlib.reload(jsoncodec)
+    return module.BACKEND, module.dumps, module.loads
+
+
+# ======================
+# DATOS
+# ======================
+def backup_payload(rng, roles=250, channels=500):
+    perms = ["view_channel", "send_messages", "read_message_history", "manage_messages", "attach_files", "add_reactions"]
+    return {
+        "guild_name": "Servidor de prueba",
+        "guild_description": "Backup sintético para benchmarks",
+        "roles": [
+            {"id": rng.getrandbits(62), "name": f"rol-{i}", "permissions": rng.getrandbits(40), "color": rng.getrandbits(24),
+             "hoist": rng.random() < 0.2, "mentionable": rng.random() < 0.5, "position": i}
+            for i in range(roles)
+        ],
+        "categories": [{"id": rng.getrandbits(62), "name": f"categoría {i}", "position": i} for i in range(channels // 12)],
+        "channels": [
+            {"id": rng.getrandbits(62), "name": f"canal-{i}", "type": "text", "position": i, "category": rng.getrandbits(62),
+             "overwrites": {str(rng.getrandbits(62)): {p: rng.choice([True, False, None]) for p in perms} for _ in range(5)},
+             "topic": "Tema del canal con acentos: canción, año, pingüino", "nsfw": False, "slowmode_delay": 0}
+            for i in range(channels)
+        ],
+    }
+
+
+def blockcypher_payload(rng, txs=200):
+    return {
+        "address": "ltc1q" + "x" * 38, "total_received": rng.getrandbits(40), "total_sent": rng.getrandbits(40),
+        "balance": rng.getrandbits(36), "unconfirmed_balance": 0, "final_balance": rng.getrandbits(36),
+        "n_tx": txs, "unconfirmed_n_tx": 0, "final_n_tx": txs,
+        "txrefs": [
+            {"tx_hash": "%064x" % rng.getrandbits(256), "block_height": 2_500_000 + i, "tx_input_n": -1,
+             "tx_output_n": rng.randint(0, 3), "value": rng.getrandbits(30), "ref_balance": rng.getrandbits(36),
+             "spent": rng.random() < 0.5, "confirmations": rng.randint(1, 100000),
+             "confirmed": "2024-05-01T12:00:00Z", "double_spend": False}
+            for i in range(txs)
+        ],
+    }
+
+
+def coingecko_payload(rng):
+    return {coin: {"usd": rng.random() * 1000, "usd_24h_change": rng.uniform(-10, 10)}
+            for coin in ("bitcoin", "ethereum", "litecoin", "solana", "tether")}
+
+
+def roblox_payload(rng, users=100):
+    return {"data": [
+        {"id": rng.getrandbits(40), "name": f"user{i}", "displayName": f"Usuario {i}", "hasVerifiedBadge": False,
+         "previousUsernames": [f"old{i}_{j}" for j in range(3)]}
+        for i in range(users)
+    ], "nextPageCursor": None, "previousPageCursor": None}
+
+
+# ======================
+# MEDICIÓN
+# ======================
+def measure(fn, repeat):
+    """Mediana en ms de `repeat` ejecuciones (tras una de calentamiento)."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def json_cases(args):
+    rng = random.Random(args.seed)
+    backup = backup_payload(rng, args.roles, args.channels)
+    responses = {
+        "HTTP blockcypher (200 tx)": blockcypher_payload(rng),
+        "HTTP coingecko": coingecko_payload(rng),
+        "HTTP roblox (100 usuarios)": roblox_payload(rng),
+    }
+
+    results = {}
+    for name in ("json", "orjson"):
+        backend, dumps, loads = load_codec(name)
+        if backend != name:
+            print(f"⚠️ {name} no está instalado; se omite")
+            continue
+        backup_text = dumps(backup, indent=True)
+        rows = {
+            "backup dump (indentado)": measure(lambda: dumps(backup, indent=True), args.repeat),
+            "backup load": measure(lambda: loads(backup_text), args.repeat),
+        }
+        for label, payload in responses.items():
+            body = dumps(payload)
+            # aiohttp: resp.json(loads=...) recibe el texto ya decodificado
+            rows[label] = measure(lambda: loads(body), args.repeat * 10)
+        results[name] = rows
+        if name == "json":
+            size = len(backup_text.encode("utf-8"))
+            print(f"Backup: {len(backup['roles'])} roles, {len(backup['channels'])} canales, {size / 1024:,.0f} KiB")
+    return results
+
+
+async def loop_workload(tasks):
+    async def hop():
+        for _ in range(10):
+            await asyncio.sleep(0)
+    await asyncio.gather(*(hop() for _ in range(tasks)))
+
+
+def loop_cases(args):
+    results = {}
+    factories = {"asyncio": asyncio.new_event_loop}
+    try:
+        import uvloop
+        factories["uvloop"] = uvloop.new_event_loop
+    except ImportError:
+        print("⚠️ uvloop no está instalado; se omite")
+    for name, factory in factories.items():
+        with asyncio.Runner(loop_factory=factory) as runner:
+            results[name] = measure(lambda: runner.run(loop_workload(args.tasks)), max(3, args.repeat // 5))
+    return results
+
+
+def print_table(title, base, other, rows):
+    print(f"\n{title:<32}{base + ' ms':>12}{other + ' ms':>12}{'mejora':>10}")
+    for label, (a, b) in rows.items():
+        gain = f"{a / b:.1f}x" if b else "-"
+        print(f"{label:<32}{a:>12.3f}{b:>12.3f}{gain:>10}" if b is not None else f"{label:<32}{a:>12.3f}{'-':>12}{'-':>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="json vs orjson y asyncio vs uvloop")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--roles", type=int, default=250)
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=20000, help="tareas por iteración en el benchmark del loop")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    codecs = json_cases(args)
+    base = codecs["json"]
+    fast = codecs.get("orjson", {})
+    print_table("JSON", "json", "orjson", {label: (ms, fast.get(label)) for label, ms in base.items()})
+
+    loops = loop_cases(args)
+    print_table(f"Event loop ({args.tasks:,} tareas x10 saltos)", "asyncio", "uvloop",
+                {"gather + sleep(0)": (loops["asyncio"], loops.get("uvloop"))})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Microbenchmark de la búsqueda de ítems de cogs/precios.py: escaneo lineal de antes vs ItemIndex.
+
+    python -m benchmarks.price_lookup
+    python -m benchmarks.price_lookup --items 10000 --queries 2000
+
+El catálogo real se amplía con ítems sintéticos (nombre visible + 3 alias cada uno) hasta --items.
+Las consultas mezclan nombres exactos, alias, prefijos, erratas (una letra cambiada, quitada o repetida) y basura.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.precios import ItemIndex, load_catalog, normalize
+
+SYLLABLES = ["ka", "lo", "mi", "tra", "la", "spo", "ky", "din", "so", "ro", "che", "bu", "gu", "ta", "co", "ri", "ne", "pu", "ggy", "sa"]
+
+
+def scaled_catalog(items, seed):
+    """(formulas, aliases) con el catálogo real más ítems sintéticos hasta `items`."""
+    rng = random.Random(seed)
+    catalog = load_catalog()
+    formulas, aliases = dict(catalog.formulas), dict(catalog.aliases)
+    while len(formulas) < items:
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        pretty = " ".join(words).capitalize()
+        key = normalize(pretty)
+        if key in formulas:
+            continue
+        formulas[key] = (rng.uniform(10, 300), 0.02, rng.uniform(1, 50), "", pretty)
+        for _ in range(3):
+            alias = "".join(w[:rng.randint(1, 3)] for w in words) + str(rng.randint(0, 99))
+            aliases.setdefault(alias, key)
+    return formulas, aliases
+
+
+def typo(rng, word):
+    i = rng.randrange(len(word))
+    kind = rng.choice(["swap", "drop", "double"])
+    if kind == "swap":
+        return word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i + 1:]
+    if kind == "drop" and len(word) > 3:
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+def make_queries(formulas, aliases, count, seed):
+    rng = random.Random(seed)
+    keys, alias_names = list(formulas), list(aliases)
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        key = rng.choice(keys)
+        if kind < 0.3:
+            queries.append(key)
+        elif kind < 0.5:
+            queries.append(rng.choice(alias_names))
+        elif kind < 0.65:
+            queries.append(key[:rng.randint(3, max(3, len(key) - 1))])
+        elif kind < 0.95:
+            queries.append(typo(rng, key))
+        else:
+            queries.append("".join(rng.choice("xqzjw") for _ in range(6)))
+    return queries
+
+
+def linear_lookup(formulas, aliases, nombre):
+    """Lo que hacía Precios.precio antes del índice."""
+    nombre = nombre.lower()
+    if nombre in aliases:
+        nombre = aliases[nombre]
+    if nombre in formulas:
+        return nombre, []
+    sugerencias = [k for k in formulas.keys() if nombre in k] or [k for k, v in aliases.items() if nombre in k]
+    return None, sugerencias[:1]
+
+
+def per_query_us(fn, queries, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        samples.append((time.perf_counter() - start) / len(queries) * 1e6)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="escaneo lineal vs ItemIndex")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for items in sorted({36, 1000, args.items}):
+        formulas, aliases = scaled_catalog(items, args.seed)
+        names = {key: key for key in formulas}
+        names.update({pretty: key for key, (*_, pretty) in formulas.items()})
+        names.update(aliases)
+
+        start = time.perf_counter()
+        index = ItemIndex(names)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        queries = make_queries(formulas, aliases, args.queries, args.seed)
+        linear = per_query_us(lambda q: linear_lookup(formulas, aliases, q), queries, args.rounds)
+        ranked = per_query_us(index.resolve, queries, args.rounds)
+        completion = per_query_us(index.complete, [q[:3] for q in queries], args.rounds)
+
+        typos = [q for q in queries if normalize(q) not in index.exact]
+        fixed = sum(1 for q in typos if index.resolve(q)[0] is not None)
+        found_linear = sum(1 for q in typos if linear_lookup(formulas, aliases, q)[0] or linear_lookup(formulas, aliases, q)[1])
+        suggested = sum(1 for q in typos if index.resolve(q)[1])
+
+        print(f"\n{len(formulas):,} ítems, {len(aliases):,} alias • índice construido en {build_ms:.1f} ms "
+              f"({len(index.prefixes):,} prefijos, {len(index.grams):,} trigramas)")
+        print(f"  escaneo lineal      {linear:>9.1f} µs/consulta")
+        print(f"  ItemIndex.resolve   {ranked:>9.1f} µs/consulta")
+        print(f"  ItemIndex.complete  {completion:>9.2f} µs/consulta (prefijo de 3 letras)")
+        print(f"  sin coincidencia exacta: {len(typos)} • lineal con sugerencia: {found_linear} • "
+              f"índice con sugerencias: {suggested} • corregidas solas: {fixed}")
+
+
+if __name__ == "__main__":
+    main()
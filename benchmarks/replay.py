@@ -0,0 +1,437 @@
+"""
+Replay de eventos del gateway contra los listeners reales de los cogs, sin conexión a Discord.
+
+    python -m benchmarks.replay                           # eventos sintéticos (20k a máxima velocidad)
+    python -m benchmarks.replay --events 50000 --rate 10000 --alloc
+    python -m benchmarks.replay data/gateway.jsonl.gz     # grabación de cogs/recorder.py
+    python -m benchmarks.replay --write data/synth.jsonl.gz --events 10000   # solo genera el archivo
+
+Las llamadas REST de discord.py van a una capa HTTP falsa que responde payloads mínimos
+(con --http-latency para simular la latencia de Discord). Al final se muestran eventos/s,
+tiempo por listener y suscriptor del event bus, llamadas HTTP y, con --alloc, las líneas que más memoria asignaron.
+"""
+import argparse
+import asyncio
+import functools
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+from discord.utils import time_snowflake
+
+import config
+import main
+
+DEFAULT_COGS = ["snipe", "logs", "antinuke", "afk"]
+DRAIN_PREFIXES = ("discord.py:", "eventbus:")
+OFFLINE_SKIP = {"database"}  # sin Mongo: GuildConfig usa los valores de config.py
+
+
+# ======================
+# EVENTOS SINTÉTICOS
+# ======================
+class SyntheticGuild:
+    """Genera un servidor y una ráfaga de eventos con la forma de los payloads del gateway."""
+
+    def __init__(self, members=500, channels=20, seed=0):
+        self.rng = random.Random(seed)
+        self._seq = 0
+        self.guild_id = self.snowflake()
+        self.bot_user = self.user("SiquejBot", bot=True)
+        self.owner = self.user("owner")
+        self.users = [self.owner] + [self.user(f"user{i}") for i in range(members - 1)]
+        self.member_roles = {u["id"]: [] for u in self.users}
+        self.bot_role = self.snowflake()
+        self.roles = [
+            self.role(self.guild_id, "@everyone", 0),
+            self.role(str(config.PROTECTED_ROLE_ID), "Protegido", 1),
+            *(self.role(self.snowflake(), f"rol{i}", i + 2) for i in range(10)),
+            self.role(self.bot_role, "Bot", 50, permissions="8"),
+        ]
+        self.channels = [self.channel(str(config.LOG_CHANNEL_ID), "logs", 0)]
+        self.channels += [self.channel(self.snowflake(), f"canal-{i}", i + 1) for i in range(channels - 1)]
+        self.messages = []  # (id, channel_id) de mensajes que siguen existiendo
+
+    def snowflake(self):
+        self._seq += 1
+        return str(time_snowflake(datetime.now(timezone.utc)) + self._seq % 4096)
+
+    def user(self, name, bot=False):
+        return {"id": self.snowflake(), "username": name, "discriminator": "0", "global_name": name,
+                "avatar": None, "bot": bot, "flags": 0, "public_flags": 0}
+
+    def role(self, role_id, name, position, permissions="0"):
+        return {"id": str(role_id), "name": name, "permissions": permissions, "position": position, "color": 0,
+                "hoist": False, "managed": False, "mentionable": False, "flags": 0}
+
+    def channel(self, channel_id, name, position):
+        return {"id": str(channel_id), "type": 0, "name": name, "position": position, "parent_id": None,
+                "permission_overwrites": [], "topic": None, "nsfw": False, "rate_limit_per_user": 0,
+                "last_message_id": None, "guild_id": self.guild_id, "flags": 0}
+
+    def member(self, user, **extra):
+        data = {"user": user, "roles": self.member_roles.get(user["id"], []), "joined_at": "2024-01-01T00:00:00+00:00",
+                "nick": None, "deaf": False, "mute": False, "flags": 0, "pending": False,
+                "premium_since": None, "avatar": None, "communication_disabled_until": None}
+        data.update(extra)
+        return data
+
+    def ready(self):
+        return ("READY", {
+            "v": 10, "user": {**self.bot_user, "verified": True, "mfa_enabled": False},
+            "guilds": [{"id": self.guild_id, "unavailable": True}],
+            "session_id": "replay", "resume_gateway_url": "wss://replay", "application": {"id": self.bot_user["id"], "flags": 0},
+        })
+
+    def guild_create(self):
+        members = [self.member(u) for u in self.users]
+        members.append(self.member(self.bot_user, roles=[self.bot_role]))
+        return ("GUILD_CREATE", {
+            "id": self.guild_id, "name": "Replay", "icon": None, "owner_id": self.owner["id"],
+            "roles": self.roles, "channels": self.channels, "members": members, "member_count": len(members),
+            "emojis": [], "stickers": [], "features": [], "threads": [], "voice_states": [], "presences": [],
+            "stage_instances": [], "guild_scheduled_events": [], "large": len(members) > 250, "unavailable": False,
+            "verification_level": 0, "default_message_notifications": 0, "explicit_content_filter": 0,
+            "mfa_level": 0, "premium_tier": 0, "nsfw_level": 0, "preferred_locale": "es-ES",
+            "system_channel_flags": 0, "afk_timeout": 300, "joined_at": "2024-01-01T00:00:00+00:00",
+        })
+
+    def audit_entry(self, action, target_id, user_id, changes=()):
+        return ("GUILD_AUDIT_LOG_ENTRY_CREATE", {
+            "guild_id": self.guild_id, "id": self.snowflake(), "user_id": user_id, "target_id": target_id,
+            "action_type": action.value, "changes": list(changes), "options": None, "reason": None,
+        })
+
+    def message(self, author, content, mentions=()):
+        channel = self.rng.choice(self.channels)
+        msg_id = self.snowflake()
+        self.messages.append((msg_id, channel["id"]))
+        return ("MESSAGE_CREATE", {
+            "id": msg_id, "channel_id": channel["id"], "guild_id": self.guild_id, "author": author,
+            "member": {k: v for k, v in self.member(author).items() if k != "user"},
+            "content": content, "timestamp": datetime.now(timezone.utc).isoformat(), "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": [dict(u, member={}) for u in mentions],
+            "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0, "flags": 0,
+        })
+
+    def events(self, count):
+        """Ráfaga con la mezcla de tráfico de un servidor activo más algunas acciones de nuke."""
+        rng = self.rng
+        yield self.ready()
+        yield self.guild_create()
+        afk = []
+        generated = 0
+        while generated < count:
+            roll = rng.random()
+            author = rng.choice(self.users[1:])
+            if roll < 0.45 or not self.messages:
+                if rng.random() < 0.01:
+                    afk.append(author)
+                    yield self.message(author, ",afk replay")
+                else:
+                    mentions = [rng.choice(afk)] if afk and rng.random() < 0.2 else []
+                    yield self.message(author, f"mensaje {generated} " + "x" * rng.randint(5, 200), mentions)
+            elif roll < 0.65:
+                msg_id, channel_id = self.messages.pop(rng.randrange(len(self.messages)))
+                yield ("MESSAGE_DELETE", {"id": msg_id, "channel_id": channel_id, "guild_id": self.guild_id})
+            elif roll < 0.8:
+                msg_id, channel_id = rng.choice(self.messages)
+                yield ("MESSAGE_UPDATE", {
+                    "id": msg_id, "channel_id": channel_id, "guild_id": self.guild_id, "author": author,
+                    "content": f"editado {generated}", "edited_timestamp": datetime.now(timezone.utc).isoformat(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(), "mentions": [], "mention_roles": [],
+                    "attachments": [], "embeds": [], "pinned": False, "tts": False, "mention_everyone": False, "type": 0,
+                })
+            elif roll < 0.92:
+                target = rng.choice(self.users[1:])
+                roles = self.member_roles[target["id"]]
+                role = rng.choice(self.roles[1:-1])["id"]
+                self.member_roles[target["id"]] = [r for r in roles if r != role] if role in roles else roles + [role]
+                yield self.audit_entry(discord.AuditLogAction.member_role_update, target["id"], self.owner["id"])
+                yield ("GUILD_MEMBER_UPDATE", {"guild_id": self.guild_id, **self.member(target)})
+            elif roll < 0.96:
+                target = rng.choice(self.users[1:])
+                yield self.audit_entry(discord.AuditLogAction.ban, target["id"], author["id"])
+                yield ("GUILD_BAN_ADD", {"guild_id": self.guild_id, "user": target})
+            else:
+                channel = self.channel(self.snowflake(), f"nuke-{generated}", len(self.channels))
+                yield self.audit_entry(discord.AuditLogAction.channel_create, channel["id"], author["id"])
+                yield ("CHANNEL_CREATE", channel)
+                yield self.audit_entry(discord.AuditLogAction.channel_delete, channel["id"], author["id"])
+                yield ("CHANNEL_DELETE", channel)
+            generated += 1
+
+
+def load_recording(path):
+    """(t, d) de cada dispatch (op 0) de una grabación JSONL (comprimida o no)."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            payload = json.loads(line)["p"]
+            if payload.get("op") == 0:
+                yield payload["t"], payload["d"]
+
+
+def write_recording(path, events):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        for i, (t, d) in enumerate(events):
+            f.write(json.dumps({"ts": time.time(), "p": {"op": 0, "s": i + 1, "t": t, "d": d}}, separators=(",", ":")) + "\n")
+
+
+# ======================
+# HTTP FALSO
+# ======================
+class FakeHTTP:
+    """Sustituye HTTPClient.request de discord.py: cuenta las rutas y responde payloads mínimos."""
+
+    def __init__(self, state, latency=0.0):
+        self.state = state
+        self.latency = latency
+        self.calls = Counter()
+        self._seq = 0
+
+    def snowflake(self):
+        self._seq += 1
+        return str(time_snowflake(datetime.now(timezone.utc)) + self._seq % 4096)
+
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        self.calls[f"{route.method} {route.path}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        payload = kwargs.get("json") or {}
+        if form:
+            payload = json.loads(next((f["value"] for f in form if f["name"] == "payload_json"), "{}"))
+        return self.response(route, payload)
+
+    def response(self, route, payload):
+        user = self.state.user
+        if route.method == "POST" and route.path.endswith("/messages"):
+            return {
+                "id": self.snowflake(), "channel_id": str(route.channel_id), "content": payload.get("content") or "",
+                "author": {"id": str(user.id), "username": user.name, "discriminator": "0", "avatar": None, "bot": True},
+                "timestamp": datetime.now(timezone.utc).isoformat(), "edited_timestamp": None, "tts": False,
+                "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+                "embeds": payload.get("embeds") or [], "pinned": False, "type": 0, "flags": 0,
+            }
+        if route.method == "POST" and route.path == "/guilds/{guild_id}/channels":
+            return {"id": self.snowflake(), "guild_id": str(route.guild_id), "type": payload.get("type", 0),
+                    "name": payload.get("name", "canal"), "position": payload.get("position") or 0,
+                    "permission_overwrites": payload.get("permission_overwrites", []), "parent_id": payload.get("parent_id"),
+                    "topic": payload.get("topic"), "nsfw": False, "rate_limit_per_user": 0, "flags": 0}
+        if route.method == "PATCH" and route.path.startswith("/guilds/{guild_id}/members/"):
+            guild = self.state._get_guild(route.guild_id)
+            member = guild and guild.get_member(int(route.url.rsplit("/", 1)[1]))
+            if member is None:
+                return {}
+            return {"user": member._user._to_minimal_user_json(), "roles": payload.get("roles", [str(r) for r in member._roles]),
+                    "nick": payload.get("nick", member.nick), "joined_at": "2024-01-01T00:00:00+00:00",
+                    "communication_disabled_until": payload.get("communication_disabled_until"), "flags": 0}
+        if route.path == "/guilds/{guild_id}/roles/{role_id}" and route.method == "PATCH":
+            guild = self.state._get_guild(route.guild_id)
+            role = guild and guild.get_role(int(route.url.rsplit("/", 1)[1]))
+            return {"id": str(role.id), "name": role.name, "position": role.position, "color": 0, "hoist": False,
+                    "managed": False, "mentionable": False, "flags": 0,
+                    "permissions": str(payload.get("permissions", role.permissions.value))} if role else {}
+        return {}
+
+
+# ======================
+# MEDICIÓN
+# ======================
+class ListenerStats:
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+
+def instrument(bot):
+    """Envuelve los listeners de los cogs y on_message del bot para medir su tiempo (de pared)."""
+    stats = defaultdict(ListenerStats)
+
+    def timed(listener):
+        entry = stats[listener.__qualname__]
+
+        @functools.wraps(listener)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await listener(*args, **kwargs)
+            finally:
+                entry.add(time.perf_counter() - start)
+        return wrapper
+
+    for name, listeners in bot.extra_events.items():
+        bot.extra_events[name] = [timed(listener) for listener in listeners]
+    bot.on_message = timed(bot.on_message)
+    return stats
+
+
+async def drain(bot):
+    """Espera a que terminen los listeners, suscriptores del bus y acciones encoladas."""
+    current = asyncio.current_task()
+    queue = bot.get_cog("ActionQueue")
+    lanes = queue.lanes.values() if queue else ()
+    while True:
+        tasks = [t for t in asyncio.all_tasks() if t is not current and t.get_name().startswith(DRAIN_PREFIXES)]
+        busy = [q for q in lanes if q._unfinished_tasks]
+        if not tasks and not busy:
+            return
+        await asyncio.gather(*tasks, *(q.join() for q in busy), return_exceptions=True)
+
+
+async def run(args):
+    if args.path:
+        events = list(load_recording(args.path))
+        if args.events:
+            events = events[:args.events]
+    else:
+        events = list(SyntheticGuild(args.members, args.channels, args.seed).events(args.events))
+    if args.write:
+        write_recording(args.write, events)
+        print(f"{len(events):,} eventos escritos en {args.write}")
+        return
+
+    bot = main.SiquejBot(
+        command_prefix=",", intents=main.intents, help_command=None,
+        chunk_guilds_at_startup=False, member_cache_flags=main.member_cache_flags(),
+        guild_ready_timeout=0.1, max_messages=args.max_messages,
+    )
+    await bot._async_setup_hook()
+    state = bot._connection
+    fake = FakeHTTP(state, args.http_latency / 1000)
+    bot.http.request = fake.request
+
+    errors = Counter()
+
+    async def on_error(event, *a, **kw):
+        errors[event] += 1
+        if errors[event] == 1:
+            import traceback
+            traceback.print_exc()
+    bot.on_error = on_error
+
+    names = set()
+    pending = list(args.cogs)
+    while pending:
+        name = pending.pop()
+        if name not in names and name not in OFFLINE_SKIP:
+            names.add(name)
+            pending.extend(main.COG_DEPENDENCIES.get(name, []))
+    for level in main.cog_load_levels(names):
+        for name in level:
+            await bot.load_extension(f"cogs.{name}")
+
+    # Estado inicial (READY y GUILD_CREATE) fuera de la medición
+    parsers = state.parsers
+    start_index = 0
+    for t, d in events:
+        if t not in ("READY", "GUILD_CREATE"):
+            break
+        parsers[t](d)
+        start_index += 1
+    await bot.wait_until_ready()
+    await drain(bot)
+
+    listener_stats = instrument(bot)
+    bus = bot.get_cog("EventBus")
+    if bus:
+        bus.stats.clear()
+    fake.calls.clear()
+    burst = events[start_index:]
+    if args.alloc:
+        tracemalloc.start(1)
+        before = tracemalloc.take_snapshot()
+
+    batch = max(1, args.rate // 100) if args.rate else 500
+    start = time.perf_counter()
+    skipped = Counter()
+    for i, (t, d) in enumerate(burst, 1):
+        parser = parsers.get(t)
+        if parser is None:
+            skipped[t] += 1
+            continue
+        parser(d)
+        if i % batch == 0:
+            if args.rate:
+                delay = start + i / args.rate - time.perf_counter()
+                await asyncio.sleep(max(0, delay))
+            else:
+                await asyncio.sleep(0)
+    fed = time.perf_counter() - start
+    await drain(bot)
+    total = time.perf_counter() - start
+
+    if args.alloc:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # ======================
+    # INFORME
+    # ======================
+    print(f"\nEventos: {len(burst):,} • envío {fed:.2f}s • total con drenado {total:.2f}s "
+          f"• {len(burst) / total:,.0f} eventos/s" + (f" (objetivo {args.rate:,}/s)" if args.rate else ""))
+    if skipped:
+        print(f"Sin parser: {dict(skipped)}")
+    if errors:
+        print(f"Errores en eventos: {dict(errors)}")
+
+    rows = [(n, s.calls, s.total, s.max) for n, s in listener_stats.items() if s.calls]
+    if bus:
+        rows += [(f"[bus] {n}", s["calls"], s["total"], s["max"]) for n, s in bus.stats.items()]
+    print(f"\n{'listener':<48}{'llamadas':>10}{'total ms':>12}{'media µs':>12}{'máx ms':>10}")
+    for name, calls, spent, worst in sorted(rows, key=lambda r: -r[2]):
+        print(f"{name[:47]:<48}{calls:>10,}{spent * 1000:>12.1f}{spent / calls * 1e6:>12.1f}{worst * 1000:>10.2f}")
+
+    if fake.calls:
+        print(f"\n{'HTTP falso':<60}{'llamadas':>10}")
+        for route, n in fake.calls.most_common():
+            print(f"{route:<60}{n:>10,}")
+
+    if args.alloc:
+        print(f"\nMemoria trazada: actual {current / 1024:,.0f} KiB • pico {peak / 1024:,.0f} KiB")
+        stats = after.compare_to(before, "lineno")
+        print(f"{'línea':<70}{'KiB':>10}{'bloques':>10}")
+        for stat in stats[:args.alloc_top]:
+            frame = stat.traceback[0]
+            where = f"{os.path.relpath(frame.filename)}:{frame.lineno}"
+            print(f"{where[-69:]:<70}{stat.size_diff / 1024:>10.1f}{stat.count_diff:>10,}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay de eventos del gateway contra los cogs")
+    parser.add_argument("path", nargs="?", help="grabación .jsonl(.gz); sin ella se generan eventos sintéticos")
+    parser.add_argument("--events", type=int, default=20000, help="eventos a reproducir/generar")
+    parser.add_argument("--rate", type=int, default=0, help="eventos/s objetivo (0 = lo más rápido posible)")
+    parser.add_argument("--cogs", nargs="+", default=DEFAULT_COGS, help="cogs a cargar (más sus dependencias)")
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-messages", type=int, default=1000, help="tamaño de la caché de mensajes de discord.py")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="ms de latencia de la capa HTTP falsa")
+    parser.add_argument("--alloc", action="store_true", help="medir asignaciones con tracemalloc (más lento)")
+    parser.add_argument("--alloc-top", type=int, default=15)
+    parser.add_argument("--write", help="solo escribir los eventos en este archivo .jsonl(.gz)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,236 @@
+import discord
+from discord.ext import commands
+from collections import defaultdict
+from datetime import datetime, timezone
+import asyncio
+import itertools
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ======================
+# CONFIGURACIÓN
+# ======================
+PRIORITY_URGENT = 0   # respuestas del antinuke
+PRIORITY_NORMAL = 5   # comandos de moderación
+PRIORITY_BULK = 10    # restore, unbanall, ...
+
+# Acciones simultáneas por bucket de rate limit (ruta de la API) y servidor.
+# 1 mantiene el orden de envío dentro del bucket (importa al recrear roles/canales).
+BUCKET_CONCURRENCY = {"unban": 2, "ban": 2}
+DEFAULT_CONCURRENCY = 1
+
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0
+PROGRESS_INTERVAL = 2.0  # segundos entre ediciones del mensaje de progreso
+LANE_IDLE_TIMEOUT = 30   # los workers de un bucket sin trabajo se cierran tras este tiempo
+ACTION_TIMEOUT = 60      # segundos máximos que `do` espera una acción (cola + reintentos)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Action:
+    __slots__ = ("priority", "seq", "bucket", "factory", "label", "job", "future")
+
+    def __init__(self, priority, seq, bucket, factory, label, job, future):
+        self.priority = priority
+        self.seq = seq
+        self.bucket = bucket
+        self.factory = factory
+        self.label = label
+        self.job = job
+        self.future = future
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Job:
+    """Grupo de acciones con progreso visible y cancelable con ,cancelqueue."""
+
+    def __init__(self, guild, name, total, channel=None):
+        self.guild = guild
+        self.name = name
+        self.total = total
+        self.channel = channel
+        self.message = None
+        self.done = 0
+        self.failed = 0
+        self.cancelled = False
+        self.errors = []
+        self.started_at = time.monotonic()
+        self._last_update = 0.0
+
+    @property
+    def finished(self):
+        return self.done + self.failed >= self.total
+
+    def progress_text(self):
+        elapsed = time.monotonic() - self.started_at
+        estado = "🛑 Cancelado" if self.cancelled else "✅ Terminado" if self.finished else "⏳ En curso"
+        return (
+            f"{estado} **{self.name}**: {self.done + self.failed}/{self.total} "
+            f"({self.failed} errores) • {elapsed:.0f}s"
+        )
+
+    async def update_progress(self, force=False):
+        if self.channel is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_update < PROGRESS_INTERVAL:
+            return
+        self._last_update = now
+        try:
+            if self.message is None:
+                self.message = await self.channel.send(self.progress_text())
+            else:
+                await self.message.edit(content=self.progress_text())
+        except discord.HTTPException:
+            self.channel = None  # el canal pudo ser borrado (p. ej. durante un restore)
+
+
+class ActionQueue(commands.Cog):
+    """
+    Cola por servidor para acciones de escritura en Discord.
+    Cada bucket de rate limit (ban, channel_delete, role_create, ...) tiene su propia cola con prioridad,
+    así un trabajo grande en un bucket no retrasa acciones urgentes en otros.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.lanes = {}                  # {(guild_id, bucket): asyncio.PriorityQueue}
+        self.workers = defaultdict(set)  # {(guild_id, bucket): {tasks}}
+        self.jobs = defaultdict(list)    # {guild_id: [Job]}
+        self._seq = itertools.count()
+
+    async def cog_unload(self):
+        for tasks in self.workers.values():
+            for task in tasks:
+                task.cancel()
+
+    # ======================
+    # ENVÍO DE ACCIONES
+    # ======================
+    def submit(self, guild, bucket, factory, *, priority=PRIORITY_NORMAL, label=None, job=None):
+        """Encola `factory()` (una corrutina nueva por intento) y devuelve un future con su resultado."""
+        future = asyncio.get_running_loop().create_future()
+        action = Action(priority, next(self._seq), bucket, factory, label or bucket, job, future)
+        key = (guild.id, bucket)
+        if key not in self.lanes:
+            self.lanes[key] = asyncio.PriorityQueue()
+        self.lanes[key].put_nowait(action)
+        limit = BUCKET_CONCURRENCY.get(bucket, DEFAULT_CONCURRENCY)
+        self.workers[key] = {t for t in self.workers[key] if not t.done()}
+        while len(self.workers[key]) < limit:
+            self.workers[key].add(asyncio.create_task(self.lane_worker(key), name=f"actionqueue:{bucket}"))
+        return future
+
+    async def do(self, guild, bucket, factory, *, priority=PRIORITY_NORMAL, label=None, timeout=ACTION_TIMEOUT):
+        """
+        Ejecuta una acción a través de la cola y espera su resultado. Pasado `timeout` se cancela
+        (si aún no empezó, no se ejecuta) y se lanza asyncio.TimeoutError.
+        """
+        future = self.submit(guild, bucket, factory, priority=priority, label=label)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Acción {label or bucket} en {guild.id} sin resultado tras {timeout}s")
+            raise
+
+    async def run_job(self, guild, name, actions, *, priority=PRIORITY_BULK, channel=None):
+        """
+        Ejecuta un lote de acciones [(bucket, factory, label)] y devuelve sus resultados en orden
+        (None para las que fallaron o se cancelaron). Si se pasa `channel`, muestra el progreso ahí.
+        """
+        job = Job(guild, name, len(actions), channel)
+        self.jobs[guild.id].append(job)
+        try:
+            await job.update_progress(force=True)
+            futures = [
+                self.submit(guild, bucket, factory, priority=priority, label=label, job=job)
+                for bucket, factory, label in actions
+            ]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+        except asyncio.CancelledError:
+            # el comando que lo lanzó se canceló (apagado, ,reload): lo que quede en cola no se ejecuta
+            job.cancelled = True
+            raise
+        finally:
+            self.jobs[guild.id].remove(job)
+            await job.update_progress(force=True)
+        return [None if isinstance(r, BaseException) else r for r in results], job
+
+    # ======================
+    # WORKERS
+    # ======================
+    async def lane_worker(self, key):
+        queue = self.lanes[key]
+        while True:
+            try:
+                action = await asyncio.wait_for(queue.get(), LANE_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if not queue.empty():
+                    continue  # algo llegó mientras expiraba la espera
+                # sin await entre la comprobación y la baja: el próximo submit ya no cuenta con este worker
+                self.workers[key].discard(asyncio.current_task())
+                return
+            if action.future.cancelled():
+                queue.task_done()  # quien esperaba (`do`) ya se rindió
+                continue
+            try:
+                result = await self.execute(action)
+                if not action.future.done():
+                    action.future.set_result(result)
+                if action.job:
+                    action.job.done += 1
+            except Exception as e:
+                if not action.future.done():
+                    action.future.set_exception(e)
+                if action.job:
+                    action.job.failed += 1
+                    action.job.errors.append(f"{action.label}: {e}")
+            finally:
+                queue.task_done()
+                if action.job:
+                    await action.job.update_progress()
+
+    async def execute(self, action):
+        for attempt in range(MAX_ATTEMPTS):
+            if action.job and action.job.cancelled:
+                raise JobCancelled(action.label)
+            try:
+                return await action.factory()
+            except discord.HTTPException as e:
+                # 429 que discord.py no pudo absorber o errores 5xx: se reintenta con backoff
+                if (e.status == 429 or e.status >= 500) and attempt < MAX_ATTEMPTS - 1:
+                    await asyncio.sleep(BACKOFF_BASE * 2 ** attempt)
+                    continue
+                raise
+
+    # ======================
+    # COMANDOS
+    # ======================
+    @commands.command(name="queue", aliases=["cola"])
+    @commands.has_permissions(administrator=True)
+    async def queue_status(self, ctx):
+        jobs = self.jobs.get(ctx.guild.id, [])
+        pending = {bucket: q.qsize() for (gid, bucket), q in self.lanes.items() if gid == ctx.guild.id and q.qsize()}
+        embed = discord.Embed(title="📋 Cola de acciones", color=discord.Color.blurple(), timestamp=datetime.now(timezone.utc))
+        embed.add_field(name="Trabajos", value="\n".join(j.progress_text() for j in jobs) or "Ninguno", inline=False)
+        embed.add_field(name="Pendientes por bucket", value="\n".join(f"`{b}`: {n}" for b, n in sorted(pending.items())) or "Ninguna", inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="cancelqueue", aliases=["cancelarcola"])
+    @commands.has_permissions(administrator=True)
+    async def cancelqueue(self, ctx):
+        jobs = self.jobs.get(ctx.guild.id, [])
+        for job in jobs:
+            job.cancelled = True
+        await ctx.send(f"🛑 Cancelados {len(jobs)} trabajos en curso.")
+
+
+async def setup(bot):
+    await bot.add_cog(ActionQueue(bot))
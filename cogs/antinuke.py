@@ -1,42 +1,42 @@
 import discord
 from discord.ext import commands
 from datetime import datetime, timedelta, timezone
+import asyncio
 import logging
-import os
+from cogs.actionqueue import PRIORITY_URGENT
+from cogs.eventbus import EventBus
+from cogs.guildconfig import DEFAULTS
+import config
 
 # =====================================================
 # CONFIGURACIÓN
 # =====================================================
-OWNER_IDS = [335596693603090434, 523662219020337153, 1158970670928113745]
-WHITELIST = {1325579039888511056, 235148962103951360, 416358583220043796, 710034409214181396, 972725581236043796}
-LOG_CHANNEL_ID = 1421331172969156660
-PROTECTED_ROLE_ID = 1421330892038869063
-OWNER_ROLE_ID = 1421330806399565888  # ID del rol Co-Owner
-
+# Whitelist, canal de logs y roles protegidos: por servidor en cogs/guildconfig.py
 MAX_BANS = 3
 MAX_CHANNELS = 3
 MAX_ROLES = 3
 ACTION_EXPIRY_SECONDS = 300
 
-# Configurar logging
-LOG_DIR = "./data"
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_FILE = os.path.join(LOG_DIR, "antinuke.log")
-
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
 
 class AntiNuke(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.user_actions = {}  # Almacena acciones recientes por usuario
 
+    async def cog_load(self):
+        EventBus.attach(self, {"member.roles_added": self.on_roles_added, "member.join.bot": self.on_bot_join})
+
+    async def cog_unload(self):
+        EventBus.detach(self)
+
+    def settings(self, guild):
+        guild_config = self.bot.get_cog("GuildConfig")
+        return guild_config.get(guild) if guild_config else DEFAULTS
+
     async def log_action(self, guild, description):
         """Registra una acción en el canal de logs y en el archivo de log."""
-        channel = guild.get_channel(LOG_CHANNEL_ID)
+        channel = guild.get_channel(self.settings(guild).log_channel_id)
         if channel:
             embed = discord.Embed(
                 title="🛡️ Sistema AntiNuke",
@@ -45,11 +45,11 @@ class AntiNuke(commands.Cog):
                 timestamp=datetime.now(timezone.utc)
             )
             await channel.send(embed=embed)
-        logging.info(f"{guild.name}: {description}")
+        logger.info(f"{guild.name}: {description}", extra={"guild_id": guild.id})
 
     def is_authorized(self, user_id, guild):
         """Verifica si un usuario está autorizado (owner, whitelist o dueño del servidor)."""
-        return user_id in OWNER_IDS or user_id == guild.owner_id or user_id in WHITELIST
+        return user_id in config.OWNER_IDS or user_id == guild.owner_id or user_id in self.settings(guild).whitelist
 
     async def track_action(self, executor):
         """Registra y verifica las acciones recientes de un usuario."""
@@ -66,151 +66,175 @@ class AntiNuke(commands.Cog):
         self.user_actions[executor.id][action_type] += 1
         if self.user_actions[executor.id][action_type] >= max_limit:
             try:
-                await guild.ban(executor, reason=reason)
+                await self.urgent(guild, "ban", lambda: guild.ban(executor, reason=reason))
                 await self.log_action(guild, f"🚫 {executor.mention} baneado por {reason.lower()}.")
             except discord.Forbidden:
                 await self.log_action(guild, f"⛔ No tengo permisos para banear a {executor.mention}.")
 
+    @property
+    def audit(self):
+        return self.bot.get_cog("AuditLog")
+
+    @property
+    def actions(self):
+        return self.bot.get_cog("ActionQueue")
+
+    async def urgent(self, guild, bucket, factory):
+        """Respuesta del antinuke: pasa por la cola con prioridad máxima y reintentos."""
+        return await self.actions.do(guild, bucket, factory, priority=PRIORITY_URGENT)
+
+    async def resolve_member(self, guild, user):
+        """Member del servidor para `user` (que puede ser un User sin datos del servidor); None si ya no está."""
+        if isinstance(user, discord.Member):
+            return user
+        member = guild.get_member(user.id)
+        if member is not None:
+            return member
+        try:
+            return await guild.fetch_member(user.id)
+        except discord.HTTPException:
+            return None
+
+    async def find_executor(self, guild, action, target, within):
+        """Quién hizo la acción, según el audit log compartido (sin llamadas REST)."""
+        entry = await self.audit.wait_for(guild, action, target=target, within=within)
+        if entry is None:
+            return None
+        return await self.audit.executor(entry)
+
     # 🚨 Anti Massban
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
-        async for entry in guild.audit_logs(limit=5, action=discord.AuditLogAction.ban):
-            if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 60:
-                executor = entry.user
-                if self.is_authorized(executor.id, guild):
-                    return
-                await self.track_action(executor)
-                await self.enforce_action_limit(guild, executor, "bans", MAX_BANS, "AntiNuke: demasiados bans")
-                break
+        executor = await self.find_executor(guild, discord.AuditLogAction.ban, user.id, 60)
+        if executor is None or self.is_authorized(executor.id, guild):
+            return
+        await self.track_action(executor)
+        await self.enforce_action_limit(guild, executor, "bans", MAX_BANS, "AntiNuke: demasiados bans")
 
     # 🚨 Anti Creación Masiva de Canales
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel):
-        async for entry in channel.guild.audit_logs(limit=5, action=discord.AuditLogAction.channel_create):
-            if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 60:
-                executor = entry.user
-                if self.is_authorized(executor.id, channel.guild):
-                    return
-                await self.track_action(executor)
-                await self.enforce_action_limit(channel.guild, executor, "channels", MAX_CHANNELS, "AntiNuke: creación masiva de canales")
-                break
+        executor = await self.find_executor(channel.guild, discord.AuditLogAction.channel_create, channel.id, 60)
+        if executor is None or self.is_authorized(executor.id, channel.guild):
+            return
+        await self.track_action(executor)
+        await self.enforce_action_limit(channel.guild, executor, "channels", MAX_CHANNELS, "AntiNuke: creación masiva de canales")
 
     # 🚨 Anti Eliminación de Canales
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel):
-        async for entry in channel.guild.audit_logs(limit=5, action=discord.AuditLogAction.channel_delete):
-            if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 60:
-                executor = entry.user
-                if self.is_authorized(executor.id, channel.guild):
-                    return
-                try:
-                    new_channel = await channel.guild.create_text_channel(
-                        name=channel.name,
-                        topic=getattr(channel, "topic", None),
-                        position=channel.position,
-                        overwrites=channel.overwrites
-                    )
-                    await channel.guild.ban(executor, reason="AntiNuke: eliminación de canal")
-                    await self.log_action(channel.guild, f"🔄 {executor.mention} eliminó {channel.name}, canal recreado como {new_channel.mention}.")
-                    await self.log_action(channel.guild, f"🚫 {executor.mention} baneado por eliminar {channel.name}.")
-                except discord.Forbidden:
-                    await self.log_action(channel.guild, f"⛔ No tengo permisos para recrear el canal o banear a {executor.mention}.")
-                break
+        executor = await self.find_executor(channel.guild, discord.AuditLogAction.channel_delete, channel.id, 60)
+        if executor is None or self.is_authorized(executor.id, channel.guild):
+            return
+        try:
+            guild = channel.guild
+            # ban y recreación van en buckets distintos: se ejecutan a la vez
+            _, new_channel = await asyncio.gather(
+                self.urgent(guild, "ban", lambda: guild.ban(executor, reason="AntiNuke: eliminación de canal")),
+                self.urgent(guild, "channel_create", lambda: guild.create_text_channel(
+                    name=channel.name,
+                    topic=getattr(channel, "topic", None),
+                    position=channel.position,
+                    overwrites=channel.overwrites
+                )),
+            )
+            await self.log_action(channel.guild, f"🔄 {executor.mention} eliminó {channel.name}, canal recreado como {new_channel.mention}.")
+            await self.log_action(channel.guild, f"🚫 {executor.mention} baneado por eliminar {channel.name}.")
+        except discord.Forbidden:
+            await self.log_action(channel.guild, f"⛔ No tengo permisos para recrear el canal o banear a {executor.mention}.")
 
     # 🚨 Anti Creación Masiva de Roles
     @commands.Cog.listener()
     async def on_guild_role_create(self, role):
-        async for entry in role.guild.audit_logs(limit=5, action=discord.AuditLogAction.role_create):
-            if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 60:
-                executor = entry.user
-                if self.is_authorized(executor.id, role.guild):
-                    return
-                await self.track_action(executor)
-                await self.enforce_action_limit(role.guild, executor, "roles", MAX_ROLES, "AntiNuke: creación masiva de roles")
-                break
+        executor = await self.find_executor(role.guild, discord.AuditLogAction.role_create, role.id, 60)
+        if executor is None or self.is_authorized(executor.id, role.guild):
+            return
+        await self.track_action(executor)
+        await self.enforce_action_limit(role.guild, executor, "roles", MAX_ROLES, "AntiNuke: creación masiva de roles")
 
     # 🚨 Anti Permisos Peligrosos
     @commands.Cog.listener()
     async def on_guild_role_update(self, before, after):
-        async for entry in after.guild.audit_logs(limit=5, action=discord.AuditLogAction.role_update):
-            if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 10:
-                executor = entry.user
-                if self.is_authorized(executor.id, after.guild) or after.id in (PROTECTED_ROLE_ID, OWNER_ROLE_ID):
-                    return
-                dangerous_perms = discord.Permissions(administrator=True, manage_guild=True, ban_members=True, kick_members=True)
-                if after.permissions.value & dangerous_perms.value:
-                    bot_member = after.guild.me
-                    if not bot_member.guild_permissions.manage_roles or bot_member.top_role <= after:
-                        await self.log_action(after.guild, f"⛔ No tengo permisos suficientes para revertir el rol {after.mention}.")
-                        return
-                    try:
-                        await after.edit(permissions=before.permissions, reason="AntiNuke: permisos peligrosos detectados")
-                        await after.guild.ban(executor, reason="AntiNuke: otorgó permisos peligrosos")
-                        await self.log_action(after.guild, f"🚫 {executor.mention} baneado por otorgar permisos peligrosos al rol {after.mention}.")
-                    except discord.Forbidden:
-                        await self.log_action(after.guild, f"⛔ No tengo permisos para revertir el rol o banear a {executor.mention}.")
-                    except discord.HTTPException as e:
-                        await self.log_action(after.guild, f"⛔ Error al revertir permisos: {e}")
-                    break
+        executor = await self.find_executor(after.guild, discord.AuditLogAction.role_update, after.id, 10)
+        if executor is None:
+            return
+        settings = self.settings(after.guild)
+        if self.is_authorized(executor.id, after.guild) or after.id in (settings.protected_role_id, settings.owner_role_id):
+            return
+        dangerous_perms = discord.Permissions(administrator=True, manage_guild=True, ban_members=True, kick_members=True)
+        if after.permissions.value & dangerous_perms.value:
+            bot_member = after.guild.me
+            if not bot_member.guild_permissions.manage_roles or bot_member.top_role <= after:
+                await self.log_action(after.guild, f"⛔ No tengo permisos suficientes para revertir el rol {after.mention}.")
+                return
+            try:
+                await self.urgent(after.guild, "role_edit", lambda: after.edit(permissions=before.permissions, reason="AntiNuke: permisos peligrosos detectados"))
+                await self.urgent(after.guild, "ban", lambda: after.guild.ban(executor, reason="AntiNuke: otorgó permisos peligrosos"))
+                await self.log_action(after.guild, f"🚫 {executor.mention} baneado por otorgar permisos peligrosos al rol {after.mention}.")
+            except discord.Forbidden:
+                await self.log_action(after.guild, f"⛔ No tengo permisos para revertir el rol o banear a {executor.mention}.")
+            except discord.HTTPException as e:
+                await self.log_action(after.guild, f"⛔ Error al revertir permisos: {e}")
 
     # 🚨 Anti Otorgar Rol Protegido
-    @commands.Cog.listener()
-    async def on_member_update(self, before, after):
-        protected_role = after.guild.get_role(PROTECTED_ROLE_ID)
-        if protected_role and protected_role in after.roles and protected_role not in before.roles:
-            async for entry in after.guild.audit_logs(limit=5, action=discord.AuditLogAction.member_role_update):
-                if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 10:
-                    executor = entry.user
-                    if self.is_authorized(executor.id, after.guild):
-                        return
-                    try:
-                        await after.remove_roles(protected_role, reason="AntiNuke: otorgó rol protegido")
-                        await executor.timeout(duration=timedelta(minutes=5), reason="AntiNuke: otorgó rol protegido")
-                        await self.log_action(
-                            after.guild,
-                            f"⛔ {executor.mention} intentó dar el rol protegido a {after.mention}. "
-                            f"El rol fue removido y {executor.mention} recibió un timeout de 5 minutos."
-                        )
-                    except discord.Forbidden:
-                        await self.log_action(after.guild, f"⛔ No tengo permisos para remover el rol de {after.mention} o aplicar timeout a {executor.mention}.")
-                    break
+    async def on_roles_added(self, record):
+        after = record.after
+        protected_role = after.guild.get_role(self.settings(after.guild).protected_role_id)
+        if not protected_role or protected_role not in record.roles_added:
+            return
+        executor = await self.find_executor(after.guild, discord.AuditLogAction.member_role_update, after.id, 10)
+        if executor is None or self.is_authorized(executor.id, after.guild):
+            return
+        try:
+            await self.urgent(after.guild, "member_edit", lambda: after.remove_roles(protected_role, reason="AntiNuke: otorgó rol protegido"))
+            member = await self.resolve_member(after.guild, executor)
+            if member is None:
+                # el audit log puede devolver un User (fetch_user) y a un User no se le puede dar timeout
+                return await self.log_action(
+                    after.guild,
+                    f"⛔ {executor.mention} intentó dar el rol protegido a {after.mention}. "
+                    f"El rol fue removido, pero {executor.mention} ya no es miembro: sin timeout."
+                )
+            await self.urgent(after.guild, "member_edit", lambda: member.timeout(timedelta(minutes=5), reason="AntiNuke: otorgó rol protegido"))
+            await self.log_action(
+                after.guild,
+                f"⛔ {executor.mention} intentó dar el rol protegido a {after.mention}. "
+                f"El rol fue removido y {executor.mention} recibió un timeout de 5 minutos."
+            )
+        except discord.Forbidden:
+            await self.log_action(after.guild, f"⛔ No tengo permisos para remover el rol de {after.mention} o aplicar timeout a {executor.mention}.")
 
     # 🚨 Anti Creación de Webhooks
     @commands.Cog.listener()
     async def on_webhook_create(self, webhook):
-        async for entry in webhook.guild.audit_logs(limit=5, action=discord.AuditLogAction.webhook_create):
-            if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 10:
-                executor = entry.user
-                if self.is_authorized(executor.id, webhook.guild):
-                    return
-                try:
-                    await webhook.delete(reason="AntiNuke: creación de webhook no autorizada")
-                    await webhook.guild.ban(executor, reason="AntiNuke: creó un webhook no autorizado")
-                    await self.log_action(webhook.guild, f"🔗 {executor.mention} baneado por crear un webhook no autorizado en {webhook.channel.mention}.")
-                except discord.Forbidden:
-                    await self.log_action(webhook.guild, f"⛔ No tengo permisos para eliminar el webhook creado por {executor.mention}.")
-                except discord.HTTPException as e:
-                    await self.log_action(webhook.guild, f"⛔ Error al eliminar webhook: {e}")
-                break
+        executor = await self.find_executor(webhook.guild, discord.AuditLogAction.webhook_create, webhook.id, 10)
+        if executor is None or self.is_authorized(executor.id, webhook.guild):
+            return
+        try:
+            await self.urgent(webhook.guild, "webhook_delete", lambda: webhook.delete(reason="AntiNuke: creación de webhook no autorizada"))
+            await self.urgent(webhook.guild, "ban", lambda: webhook.guild.ban(executor, reason="AntiNuke: creó un webhook no autorizado"))
+            await self.log_action(webhook.guild, f"🔗 {executor.mention} baneado por crear un webhook no autorizado en {webhook.channel.mention}.")
+        except discord.Forbidden:
+            await self.log_action(webhook.guild, f"⛔ No tengo permisos para eliminar el webhook creado por {executor.mention}.")
+        except discord.HTTPException as e:
+            await self.log_action(webhook.guild, f"⛔ Error al eliminar webhook: {e}")
 
     # 🚨 Anti Adición de Bots
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        if member.bot:
-            async for entry in member.guild.audit_logs(limit=5, action=discord.AuditLogAction.bot_add):
-                if (datetime.now(timezone.utc) - entry.created_at).total_seconds() < 60:
-                    executor = entry.user
-                    if self.is_authorized(executor.id, member.guild):
-                        return
-                    try:
-                        await member.ban(reason="AntiNuke: adición de bot no autorizada")
-                        await member.guild.ban(executor, reason="AntiNuke: añadió un bot no autorizado")
-                        await self.log_action(member.guild, f"🤖 {executor.mention} baneado por añadir un bot: {member.mention}.")
-                    except discord.Forbidden:
-                        await self.log_action(member.guild, f"⛔ No tengo permisos para banear al bot {member.mention} o a {executor.mention}.")
-                    except discord.HTTPException as e:
-                        await self.log_action(member.guild, f"⛔ Error al banear bot: {e}")
-                    break
+    async def on_bot_join(self, record):
+        member = record.member
+        executor = await self.find_executor(member.guild, discord.AuditLogAction.bot_add, member.id, 60)
+        if executor is None or self.is_authorized(executor.id, member.guild):
+            return
+        try:
+            await asyncio.gather(
+                self.urgent(member.guild, "ban", lambda: member.ban(reason="AntiNuke: adición de bot no autorizada")),
+                self.urgent(member.guild, "ban", lambda: member.guild.ban(executor, reason="AntiNuke: añadió un bot no autorizado")),
+            )
+            await self.log_action(member.guild, f"🤖 {executor.mention} baneado por añadir un bot: {member.mention}.")
+        except discord.Forbidden:
+            await self.log_action(member.guild, f"⛔ No tengo permisos para banear al bot {member.mention} o a {executor.mention}.")
+        except discord.HTTPException as e:
+            await self.log_action(member.guild, f"⛔ Error al banear bot: {e}")
 
     # 📖 Comando de ayuda
     @commands.command(name="helpantinuke")
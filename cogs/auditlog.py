@@ -0,0 +1,145 @@
+import discord
+from discord.ext import commands
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Entradas que se guardan por servidor (las más antiguas se descartan)
+ENTRIES_PER_GUILD = 1000
+# Cuánto esperar a que llegue la entrada del audit log si el evento llegó antes
+DEFAULT_WAIT = 3.0
+
+
+def target_id(entry):
+    return getattr(entry.target, "id", None)
+
+
+class GuildAuditIndex:
+    """Últimas entradas del audit log de un servidor, indexadas por acción, objetivo y ejecutor."""
+
+    def __init__(self, maxlen=ENTRIES_PER_GUILD):
+        self.entries = deque(maxlen=maxlen)
+        self.by_action = defaultdict(deque)
+        self.by_target = defaultdict(deque)
+        self.by_user = defaultdict(deque)
+
+    def _keys(self, entry):
+        return ((self.by_action, entry.action), (self.by_target, target_id(entry)), (self.by_user, entry.user_id))
+
+    def add(self, entry):
+        if len(self.entries) == self.entries.maxlen:
+            # La entrada más antigua también es la primera de cada índice en el que aparece
+            oldest = self.entries[0]
+            for index, key in self._keys(oldest):
+                bucket = index.get(key)
+                if bucket:
+                    bucket.popleft()
+                    if not bucket:
+                        del index[key]
+        self.entries.append(entry)
+        for index, key in self._keys(entry):
+            index[key].append(entry)
+
+    def find(self, action=None, target=None, user=None, within=None, check=None):
+        """Entradas que cumplen los filtros, de la más nueva a la más antigua."""
+        candidates = [self.entries]
+        if action is not None:
+            candidates.append(self.by_action.get(action, ()))
+        if target is not None:
+            candidates.append(self.by_target.get(target, ()))
+        if user is not None:
+            candidates.append(self.by_user.get(user, ()))
+        bucket = min(candidates, key=len)
+
+        now = datetime.now(timezone.utc)
+        results = []
+        for entry in reversed(bucket):
+            if within is not None and (now - entry.created_at).total_seconds() > within:
+                break
+            if action is not None and entry.action != action:
+                continue
+            if target is not None and target_id(entry) != target:
+                continue
+            if user is not None and entry.user_id != user:
+                continue
+            if check is not None and not check(entry):
+                continue
+            results.append(entry)
+        return results
+
+
+class AuditLog(commands.Cog):
+    """
+    Audit log compartido alimentado por el evento on_audit_log_entry_create.
+    Los cogs consultan este índice en vez de llamar a guild.audit_logs() (REST) en cada evento.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.guilds = defaultdict(GuildAuditIndex)
+        self.waiters = []  # [(guild_id, action, target, check, future)]
+
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        self.guilds[entry.guild.id].add(entry)
+        if not self.waiters:
+            return
+        remaining = []
+        for waiter in self.waiters:
+            guild_id, action, target, check, future = waiter
+            if future.done():
+                continue
+            if (
+                guild_id == entry.guild.id
+                and (action is None or entry.action == action)
+                and (target is None or target_id(entry) == target)
+                and (check is None or check(entry))
+            ):
+                future.set_result(entry)
+            else:
+                remaining.append(waiter)
+        self.waiters = remaining
+
+    # ======================
+    # CONSULTAS
+    # ======================
+    def find(self, guild, action=None, target=None, user=None, within=None, check=None):
+        index = self.guilds.get(guild.id)
+        if index is None:
+            return []
+        return index.find(action=action, target=target, user=user, within=within, check=check)
+
+    def latest(self, guild, action=None, target=None, user=None, within=None, check=None):
+        found = self.find(guild, action=action, target=target, user=user, within=within, check=check)
+        return found[0] if found else None
+
+    async def wait_for(self, guild, action=None, target=None, within=60, check=None, timeout=DEFAULT_WAIT):
+        """Entrada más reciente que cumpla los filtros; si aún no llegó por el gateway, espera hasta `timeout`."""
+        entry = self.latest(guild, action=action, target=target, within=within, check=check)
+        if entry is not None:
+            return entry
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((guild.id, action, target, check, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def executor(self, entry):
+        """Usuario que hizo la acción (la entrada del gateway solo trae el ID si no está en caché)."""
+        if entry.user is not None:
+            return entry.user
+        member = entry.guild.get_member(entry.user_id)
+        if member:
+            return member
+        try:
+            return await self.bot.fetch_user(entry.user_id)
+        except discord.HTTPException:
+            return None
+
+
+async def setup(bot):
+    await bot.add_cog(AuditLog(bot))
@@ -1,8 +1,12 @@
 import discord
 from discord.ext import commands
 import os
-import json
+import jsoncodec
+import functools
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 # 📁 Carpeta donde se guardarán los backups
 BACKUP_FOLDER = "/app/backups"
@@ -83,7 +87,7 @@ class BackupSystem(commands.Cog):
         os.makedirs(BACKUP_FOLDER, exist_ok=True)
         file_name = f"{BACKUP_FOLDER}/backup_{guild.id}_{int(datetime.utcnow().timestamp())}.json"
         with open(file_name, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+            jsoncodec.dump(data, f, indent=True)
 
         await ctx.send(f"✅ Backup guardado correctamente en `{file_name}`")
 
@@ -106,82 +110,104 @@ class BackupSystem(commands.Cog):
 
         try:
             with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+                data = jsoncodec.load(f)
             guild = ctx.guild
-
-            # 1️⃣ Eliminar roles y canales existentes
-            for channel in guild.channels:
-                try:
-                    await channel.delete()
-                except:
-                    pass
-            for role in guild.roles:
-                if not role.is_default():
-                    try:
-                        await role.delete()
-                    except:
-                        pass
-
-            # 2️⃣ Restaurar roles
-            role_map = {}
-            for role_data in sorted(data["roles"], key=lambda r: r["position"]):
-                try:
-                    role = await guild.create_role(
-                        name=role_data["name"],
-                        permissions=discord.Permissions(role_data["permissions"]),
-                        colour=discord.Colour(role_data["color"]),
-                        hoist=role_data["hoist"],
-                        mentionable=role_data["mentionable"]
-                    )
-                    role_map[str(role_data["id"])] = role
-                except Exception as e:
-                    print(f"❌ Error creando rol {role_data['name']}: {e}")
+            queue = self.bot.get_cog("ActionQueue")
+            # El canal del comando se borra en el paso 1, así que el progreso va por DM
+            progress = ctx.author
+
+            # 1️⃣ Eliminar roles y canales existentes (buckets distintos, en paralelo)
+            deletions = [("channel_delete", channel.delete, f"canal {channel.name}") for channel in guild.channels]
+            deletions += [
+                ("role_delete", role.delete, f"rol {role.name}")
+                for role in guild.roles
+                if not role.is_default() and not role.managed
+            ]
+            errors = []  # de todos los pasos
+            _, job = await queue.run_job(guild, "Eliminar roles y canales", deletions, channel=progress)
+            errors += job.errors
+            if job.cancelled:
+                return
+
+            # 2️⃣ Restaurar roles (mismo bucket y concurrencia 1: se crean en orden de posición)
+            roles_data = sorted(data["roles"], key=lambda r: r["position"])
+            roles_data = [r for r in roles_data if r["name"] != "@everyone"]
+            created, job = await queue.run_job(guild, "Restaurar roles", [
+                ("role_create", functools.partial(
+                    guild.create_role,
+                    name=role_data["name"],
+                    permissions=discord.Permissions(role_data["permissions"]),
+                    colour=discord.Colour(role_data["color"]),
+                    hoist=role_data["hoist"],
+                    mentionable=role_data["mentionable"]
+                ), f"rol {role_data['name']}")
+                for role_data in roles_data
+            ], channel=progress)
+            errors += job.errors
+            role_map = {str(r["id"]): role for r, role in zip(roles_data, created) if role}
+            role_map.update({str(r["id"]): guild.default_role for r in data["roles"] if r["name"] == "@everyone"})
+            if job.cancelled:
+                return
 
             # 3️⃣ Restaurar categorías
-            category_map = {}
-            for category_data in data["categories"]:
-                try:
-                    cat = await guild.create_category(
-                        name=category_data["name"],
-                        position=category_data["position"]
-                    )
-                    category_map[str(category_data["id"])] = cat
-                except Exception as e:
-                    print(f"❌ Error creando categoría {category_data['name']}: {e}")
+            created, job = await queue.run_job(guild, "Restaurar categorías", [
+                ("channel_create", functools.partial(
+                    guild.create_category,
+                    name=category_data["name"],
+                    position=category_data["position"]
+                ), f"categoría {category_data['name']}")
+                for category_data in data["categories"]
+            ], channel=progress)
+            errors += job.errors
+            category_map = {str(c["id"]): cat for c, cat in zip(data["categories"], created) if cat}
+            if job.cancelled:
+                return
 
             # 4️⃣ Restaurar canales
+            actions = []
             for channel_data in data["channels"]:
-                try:
-                    category = category_map.get(str(channel_data["category"]))
-                    overwrites = {}
-                    for target_id, perm_values in channel_data["overwrites"].items():
-                        target = role_map.get(target_id) or guild.get_member(int(target_id))
-                        if target:
-                            overwrites[target] = discord.PermissionOverwrite(**perm_values)
-
-                    if "text" in channel_data["type"]:
-                        await guild.create_text_channel(
-                            name=channel_data["name"],
-                            topic=channel_data.get("topic"),
-                            nsfw=channel_data.get("nsfw", False),
-                            slowmode_delay=channel_data.get("slowmode_delay", 0),
-                            category=category,
-                            overwrites=overwrites,
-                            position=channel_data["position"]
-                        )
-                    elif "voice" in channel_data["type"]:
-                        await guild.create_voice_channel(
-                            name=channel_data["name"],
-                            user_limit=channel_data.get("user_limit", 0),
-                            bitrate=channel_data.get("bitrate", 64000),
-                            category=category,
-                            overwrites=overwrites,
-                            position=channel_data["position"]
-                        )
-                except Exception as e:
-                    print(f"❌ Error creando canal {channel_data['name']}: {e}")
-
-            await ctx.send(f"✅ Backup restaurado correctamente desde `{backup_file}`")
+                category = category_map.get(str(channel_data["category"]))
+                overwrites = {}
+                for target_id, perm_values in channel_data["overwrites"].items():
+                    target = role_map.get(target_id) or guild.get_member(int(target_id))
+                    if target:
+                        overwrites[target] = discord.PermissionOverwrite(**perm_values)
+
+                if "text" in channel_data["type"]:
+                    factory = functools.partial(
+                        guild.create_text_channel,
+                        name=channel_data["name"],
+                        topic=channel_data.get("topic"),
+                        nsfw=channel_data.get("nsfw", False),
+                        slowmode_delay=channel_data.get("slowmode_delay", 0),
+                        category=category,
+                        overwrites=overwrites,
+                        position=channel_data["position"]
+                    )
+                elif "voice" in channel_data["type"]:
+                    factory = functools.partial(
+                        guild.create_voice_channel,
+                        name=channel_data["name"],
+                        user_limit=channel_data.get("user_limit", 0),
+                        bitrate=channel_data.get("bitrate", 64000),
+                        category=category,
+                        overwrites=overwrites,
+                        position=channel_data["position"]
+                    )
+                else:
+                    continue
+                actions.append(("channel_create", factory, f"canal {channel_data['name']}"))
+            _, job = await queue.run_job(guild, "Restaurar canales", actions, channel=progress)
+            errors += job.errors
+
+            for error in errors:
+                logger.error(f"Error restaurando {error}", extra={"guild_id": guild.id, "backup": backup_file})
+            if errors:
+                detalle = "\n".join(f"• {e}" for e in errors[:10])
+                extra = f"\n… y {len(errors) - 10} más (ver log)" if len(errors) > 10 else ""
+                await progress.send(f"⚠️ Backup `{backup_file}` restaurado con {len(errors)} errores:\n{detalle[:1500]}{extra}")
+            else:
+                await progress.send(f"✅ Backup restaurado correctamente desde `{backup_file}`")
 
         except Exception as e:
             await ctx.send(f"⚠️ Error restaurando backup: `{e}`")
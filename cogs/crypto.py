@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import requests
 from datetime import datetime
 
 class Crypto(commands.Cog):
@@ -53,9 +52,7 @@ class Crypto(commands.Cog):
         }
 
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = await self.bot.get_cog("HTTPClient").request_json("GET", url, params=params)
 
             if not data:
                 embed = discord.Embed(
@@ -99,7 +96,7 @@ class Crypto(commands.Cog):
                 embed.set_thumbnail(url=crypto["image"])
                 await ctx.send(embed=embed)
 
-        except requests.exceptions.RequestException as e:
+        except Exception as e:  # HTTPError del cliente compartido o datos inválidos
             embed = discord.Embed(
                 title="⚠️ Error en la API",
                 description="No pude obtener los datos en este momento. Intenta de nuevo más tarde.",
@@ -1,41 +1,515 @@
 import motor.motor_asyncio
 from discord.ext import commands
+from pymongo import ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+from collections import Counter, OrderedDict, defaultdict
+import asyncio
+import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# ======================
+# CONFIGURACIÓN
+# ======================
+MONGO_DB = os.getenv("MONGO_DB", "siquej_db")  # base de datos por defecto de `db` / `collection()`
+
+
+def _write_concern(value):
+    return int(value) if value.isdigit() else value
+
+
+# Un solo cliente (y un solo pool) para todo el bot; ver Database.client
+MONGO_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL", 50)),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL", 0)),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_MS", 300000)),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000)),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000)),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 20000)),
+    "w": _write_concern(os.getenv("MONGO_W", "1")),
+    "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+    "readConcernLevel": os.getenv("MONGO_READ_CONCERN", "local"),
+    "retryWrites": True,
+    "appname": "siquej-bot",
+}
+COUNTER_FLUSH_MS = int(os.getenv("COUNTER_FLUSH_MS", 1000))  # ventana de agrupación de contadores
+COUNTER_FLUSH_OPS = int(os.getenv("COUNTER_FLUSH_OPS", 500))  # incrementos pendientes que fuerzan un flush
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 300))  # segundos; acota lo desfasado frente a otros procesos
+USER_CACHE_NEGATIVE_TTL = 30  # usuarios que no existen (get_user_data(create=False))
+
+USER_DEFAULTS = {"kisses": 0, "hugs": 0, "slaps": 0}
+
+
+class AsyncLRUCache:
+    """
+    Caché LRU con TTL para lecturas asíncronas. Las llamadas concurrentes a la misma clave comparten
+    una sola carga; None se guarda con su propio TTL (resultado negativo).
+    """
+
+    def __init__(self, maxsize, ttl, negative_ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.data = OrderedDict()  # {clave: (expira, valor)}
+        self.loading = {}          # {clave: Task de la carga en curso}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key, loader):
+        entry = self.data.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self.data[key]
+
+        task = self.loading.get(key)
+        if task is None:
+            self.misses += 1
+            # la carga es una tarea propia: si se cancela quien la pidió, los demás que esperan no se enteran
+            task = asyncio.ensure_future(self._load(key, loader))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())  # error leído aunque nadie espere
+            self.loading[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _load(self, key, loader):
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+        except BaseException:
+            if self.loading.get(key) is task:
+                del self.loading[key]
+            raise
+        # si se invalidó mientras cargaba, el valor puede estar desfasado: se devuelve pero no se guarda
+        if self.loading.get(key) is task:
+            del self.loading[key]
+            self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self.data[key] = (time.monotonic() + ttl, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def invalidate(self, key):
+        self.data.pop(key, None)
+        self.loading.pop(key, None)
+
+
+class CounterBuffer:
+    """
+    Write-behind de contadores: los `$inc` se acumulan en memoria por (colección, documento, campo)
+    y se escriben con un solo `bulk_write` por colección cada COUNTER_FLUSH_MS o COUNTER_FLUSH_OPS incrementos.
+    Las lecturas suman los incrementos aún no escritos (`merge`), así que nunca ven un valor atrasado.
+    Una lectura que coincide con la escritura de su documento espera a que termine (`settle`): a mitad del
+    bulk_write no se sabe si Mongo ya aplicó el $inc, y sumarlo otra vez contaría doble.
+    """
+
+    def __init__(self, interval=COUNTER_FLUSH_MS / 1000, max_ops=COUNTER_FLUSH_OPS):
+        self.interval = interval
+        self.max_ops = max_ops
+        self.collections = {}              # {nombre completo: colección Motor}
+        self.pending = defaultdict(Counter)  # {(colección, filtro): Counter(campo → delta)}
+        self.inflight = {}                 # parte del lote que aún no terminó de escribirse
+        self.writing = {}                  # {nombre de colección: Future que se resuelve al terminar su bulk_write}
+        self.flush_seq = 0                 # flushes empezados; una lectura que ve cambiarlo se repite
+        self.pending_ops = 0
+        self.flushes = 0
+        self.written = 0
+        self.task = None
+        self.listeners = []  # callbacks(nombre de colección, filtro) tras escribir cada documento
+        self._closing = False
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def key(collection, doc_filter):
+        return collection.full_name, tuple(sorted(doc_filter.items()))
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def close(self):
+        """Detiene el bucle y escribe todo lo pendiente."""
+        # sin cancel(): cancelar a mitad de un bulk_write perdería el lote en curso
+        self._closing = True
+        self._wake.set()
+        if self.task is not None:
+            await self.task
+            self.task = None
+        await self.flush()
+
+    # ======================
+    # ESCRITURA
+    # ======================
+    def incr(self, collection, doc_filter, field, amount=1):
+        """Suma `amount` a `field` en el documento que cumple `doc_filter` (se crea si no existe)."""
+        key = self.key(collection, doc_filter)
+        self.collections[key[0]] = collection
+        self.pending[key][field] += amount
+        self.pending_ops += 1
+        if self.pending_ops >= self.max_ops:
+            self._wake.set()
+
+    async def run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Error en el flush de contadores")
+
+    async def flush(self):
+        async with self._lock:
+            if not self.pending:
+                return
+            batch, self.pending, self.pending_ops = self.pending, defaultdict(Counter), 0
+            self.flush_seq += 1
+            by_collection = defaultdict(list)
+            for key, deltas in batch.items():
+                deltas = {field: delta for field, delta in deltas.items() if delta}
+                if deltas:
+                    by_collection[key[0]].append((key, UpdateOne(dict(key[1]), {"$inc": deltas}, upsert=True)))
+            loop = asyncio.get_running_loop()
+            self.inflight = {key: batch[key] for items in by_collection.values() for key, _ in items}
+            self.writing = {name: loop.create_future() for name in by_collection}
+            for name, items in by_collection.items():
+                failed, written = [], items
+                try:
+                    await self.collections[name].bulk_write([op for _, op in items], ordered=False)
+                except BulkWriteError as e:
+                    # ordered=False: el resto del lote sí se aplicó, solo se reintentan los que fallaron
+                    errors = {error["index"] for error in e.details.get("writeErrors", [])}
+                    failed = [items[i][0] for i in errors]
+                    written = [item for i, item in enumerate(items) if i not in errors]
+                    logger.warning(f"Error escribiendo {len(errors)} contadores en {name}: {e}")
+                except PyMongoError as e:
+                    failed, written = [key for key, _ in items], []
+                    logger.warning(f"Error escribiendo {len(items)} contadores en {name}: {e}")
+                finally:
+                    # sin await entre esto y notify(): nadie ve la colección a medias
+                    for key, _ in items:
+                        self.inflight.pop(key, None)
+                    # lo que no se escribió vuelve a la cola para la siguiente ventana
+                    for key in failed:
+                        self.pending[key].update(batch[key])
+                        self.pending_ops += len(batch[key])
+                    self.notify(written)
+                    self.writing.pop(name).set_result(None)
+            self.flushes += 1
+
+    def notify(self, items):
+        self.written += len(items)
+        for (name, doc_filter), _ in items:
+            for listener in self.listeners:
+                listener(name, dict(doc_filter))
+
+    # ======================
+    # LECTURA
+    # ======================
+    def pending_delta(self, collection, doc_filter, field):
+        key = self.key(collection, doc_filter)
+        delta = self.pending[key][field] if key in self.pending else 0
+        if key in self.inflight:
+            delta += self.inflight[key][field]
+        return delta
+
+    def merge(self, collection, doc_filter, doc):
+        """
+        Devuelve `doc` (o uno nuevo si es None) con los incrementos pendientes aplicados.
+        `doc` tiene que haberse leído con el documento fuera de vuelo (ver `read`).
+        """
+        deltas = self.pending.get(self.key(collection, doc_filter))
+        if not deltas:
+            return doc
+        doc = dict(doc or doc_filter)
+        for field, delta in deltas.items():
+            doc[field] = doc.get(field, 0) + delta
+        return doc
+
+    async def settle(self, collection, doc_filter):
+        """Espera a que termine la escritura en curso del documento, si la hay."""
+        key = self.key(collection, doc_filter)
+        while key in self.inflight:
+            await asyncio.shield(self.writing[key[0]])
+
+    async def read(self, collection, doc_filter, reader):
+        """
+        `await reader()` sin solaparse con la escritura del documento: espera la que esté en curso y,
+        si empieza un flush mientras se lee, vuelve a leer. Devuelve el resultado con los pendientes aplicados.
+        """
+        while True:
+            await self.settle(collection, doc_filter)
+            seq = self.flush_seq
+            doc = await reader()
+            if seq == self.flush_seq:
+                return self.merge(collection, doc_filter, doc)
+
+    async def get(self, collection, doc_filter):
+        """Documento guardado + incrementos pendientes."""
+        return await self.read(collection, doc_filter, lambda: collection.find_one(doc_filter))
+
+
+# Opciones que hacen distinto a un índice con las mismas claves
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def plan_stages(plan):
+    """Etapas (COLLSCAN, IXSCAN, FETCH, ...) de un plan de explain(), recorriendo los hijos."""
+    stages = [plan.get("stage")] if plan.get("stage") else []
+    for child in ("inputStage", "queryPlan"):
+        if child in plan:
+            stages += plan_stages(plan[child])
+    for sub in plan.get("inputStages", []):
+        stages += plan_stages(sub)
+    return stages
+
+
+def index_key(spec):
+    return tuple((field, direction) for field, direction in dict(spec).items())
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Métricas del pool de conexiones de pymongo. Los eventos llegan desde los hilos de Motor,
+    por eso los contadores van bajo un lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = 0           # conexiones abiertas
+        self.checked_out = 0    # conexiones en uso ahora mismo
+        self.checkouts = 0
+        self.checkout_failures = Counter()  # {motivo: n}
+        self.wait_total = 0.0   # segundos esperando una conexión libre
+        self.wait_max = 0.0
+
+    def connection_created(self, event):
+        with self.lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.open -= 1
+
+    def connection_checked_out(self, event):
+        with self.lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_total += event.duration
+            self.wait_max = max(self.wait_max, event.duration)
+
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self.checkout_failures[event.reason] += 1
+            self.wait_total += event.duration
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.checked_out -= 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+
 class Database(commands.Cog):
+    """
+    Dueño del único cliente de MongoDB del bot. Los demás cogs piden colecciones con
+    `database.collection(nombre)` (o `database.db[nombre]`) en vez de crear su propio cliente.
+    """
+
     def __init__(self, bot):
         self.bot = bot
-        mongo_uri = os.getenv("MONGO_URI")
-        if not mongo_uri:
+        self.mongo_uri = os.getenv("MONGO_URI")
+        if not self.mongo_uri:
             raise ValueError("⚠️ No se encontró MONGO_URI en las variables de entorno.")
-        self.client = motor.motor_asyncio.AsyncIOMotorClient(mongo_uri)
-        self.db = self.client["siquej_db"]  # nombre de tu base de datos
-        print("✅ Conectado a MongoDB correctamente.")
+        self._client = None
+        self.pool = PoolMonitor()
+        self.counters = CounterBuffer()
+        self.counters.listeners.append(self.on_counters_written)
+        self.user_cache = AsyncLRUCache(USER_CACHE_SIZE, USER_CACHE_TTL, USER_CACHE_NEGATIVE_TTL)
+        self.index_specs = {}   # {nombre completo: (colección, [IndexModel], [consultas])}
+        self.index_report = {}  # {nombre completo: [líneas]} del último ensure_indexes
+        self._index_tasks = set()
+
+    @property
+    def client(self):
+        """Se crea con el primer uso: sin accesos a Mongo no hay pool ni hilos de monitorización."""
+        if self._client is None:
+            self._client = motor.motor_asyncio.AsyncIOMotorClient(
+                self.mongo_uri, event_listeners=[self.pool], **MONGO_OPTIONS
+            )
+            logger.info(f"✅ Cliente MongoDB creado (pool máx. {MONGO_OPTIONS['maxPoolSize']})")
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[MONGO_DB]
+
+    def collection(self, name, database=None):
+        return self.client[database or MONGO_DB][name]
+
+    async def cog_load(self):
+        self.counters.start()
+
+    async def cog_unload(self):
+        # bot.close() descarga los cogs, así que esto también cubre el apagado
+        for task in self._index_tasks:
+            task.cancel()
+        await self.counters.close()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
     @commands.Cog.listener()
     async def on_ready(self):
         print("🗃️ Cog Database cargado correctamente.")
 
-    async def get_user_data(self, user_id: int):
-        """Obtiene los datos del usuario, o los crea si no existen"""
+    # ======================
+    # ÍNDICES
+    # ======================
+    def declare_indexes(self, collection, indexes=(), queries=()):
+        """
+        Cada cog declara en su cog_load los índices que necesita y las consultas que hace.
+        Se crean en segundo plano los que falten y se avisa si alguna consulta recorre toda la colección.
+        `queries`: filtros de ejemplo, o tuplas (filtro, sort).
+        """
+        self.index_specs[collection.full_name] = (collection, list(indexes), list(queries))
+        task = asyncio.create_task(self.ensure_indexes(collection.full_name))
+        self._index_tasks.add(task)
+        task.add_done_callback(self._index_tasks.discard)
+
+    async def ensure_indexes(self, full_name):
+        collection, indexes, queries = self.index_specs[full_name]
+        report = []
+        try:
+            existing = {index_key(info["key"]): (name, info) for name, info in (await collection.index_information()).items()}
+            missing = []
+            for model in indexes:
+                spec = model.document
+                found = existing.get(index_key(spec["key"]))
+                if found is None:
+                    missing.append(model)
+                    continue
+                name, info = found
+                differs = [opt for opt in INDEX_OPTIONS if spec.get(opt) != info.get(opt)]
+                if differs:
+                    # create_index fallaría: cambiarlo implica borrar el índice, y eso se decide a mano
+                    report.append(f"⚠️ {name} existe con otras opciones ({', '.join(differs)})")
+                    logger.warning(f"Índice {full_name}.{name} distinto al declarado ({', '.join(differs)}); bórralo para recrearlo")
+                else:
+                    report.append(f"✅ {name}")
+            if missing:
+                names = await collection.create_indexes(missing)
+                report += [f"🆕 {name}" for name in names]
+                logger.info(f"Índices creados en {full_name}: {', '.join(names)}")
+            for query in queries:
+                report.append(await self.check_query(collection, query))
+        except OperationFailure as e:
+            # p. ej. un índice único sobre datos que ya tienen duplicados
+            report.append(f"❌ {e}")
+            logger.error(f"No se pudieron crear los índices de {full_name}: {e}")
+        except PyMongoError as e:
+            report.append(f"❌ {e}")
+            logger.warning(f"Índices de {full_name} sin comprobar: {e}")
+        self.index_report[full_name] = report
+        return report
+
+    async def explain(self, collection, query):
+        doc_filter, sort = query if isinstance(query, tuple) else (query, None)
+        cursor = collection.find(doc_filter).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        return plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+
+    async def check_query(self, collection, query):
+        stages = await self.explain(collection, query)
+        shown = query if isinstance(query, tuple) else (query,)
+        if "COLLSCAN" in stages:
+            logger.warning(f"Consulta sin índice en {collection.full_name}: {shown} → {' > '.join(stages)}")
+            return f"🐢 {shown}: {' > '.join(stages)}"
+        return f"⚡ {shown}: {' > '.join(stages)}"
+
+    @commands.command(name="dbindexes")
+    @commands.is_owner()
+    async def dbindexes(self, ctx):
+        """Vuelve a comprobar los índices declarados y el plan (explain) de cada consulta."""
+        if not self.index_specs:
+            return await ctx.send("Ningún cog ha declarado índices.")
+        reports = await asyncio.gather(*(self.ensure_indexes(name) for name in self.index_specs))
+        lines = []
+        for name, report in zip(self.index_specs, reports):
+            lines.append(f"**{name}**")
+            lines += [f"  {line}" for line in report]
+        await ctx.send("\n".join(lines)[:2000])
+
+    async def get_user_data(self, user_id: int, create: bool = True):
+        """
+        Obtiene los datos del usuario (con los contadores pendientes aplicados), o los crea si no existen.
+        Con create=False devuelve None para usuarios nuevos. Casi siempre se responde desde la caché.
+        """
         users = self.db["users"]
-        user = await users.find_one({"_id": user_id})
-        if not user:
-            user = {"_id": user_id, "kisses": 0, "hugs": 0, "slaps": 0}
-            await users.insert_one(user)
-        return user
+        if create:
+            loader = lambda: self.create_user(user_id)
+        else:
+            loader = lambda: users.find_one({"_id": user_id})
 
-    async def add_interaction(self, user_id: int, field: str):
-        """Suma 1 al contador indicado (por ejemplo, 'kisses' o 'hugs')"""
+        async def cached():
+            user = await self.user_cache.get(user_id, loader)
+            if user is None and create:
+                # había un resultado negativo cacheado por una llamada con create=False
+                self.user_cache.invalidate(user_id)
+                user = await self.user_cache.get(user_id, loader)
+            return dict(user) if user is not None else None
+
+        return await self.counters.read(users, {"_id": user_id}, cached)
+
+    async def create_user(self, user_id: int):
+        """Un solo round trip: devuelve el documento existente o lo crea con los valores por defecto."""
         users = self.db["users"]
-        await users.update_one(
-            {"_id": user_id},
-            {"$inc": {field: 1}},
-            upsert=True
-        )
+        try:
+            return await users.find_one_and_update(
+                {"_id": user_id},
+                {"$setOnInsert": USER_DEFAULTS},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # otro proceso lo insertó a la vez
+            return await users.find_one({"_id": user_id})
+
+    async def add_interaction(self, user_id: int, field: str):
+        """Suma 1 al contador indicado (por ejemplo, 'kisses' o 'hugs'); se escribe en el próximo flush"""
+        self.counters.incr(self.db["users"], {"_id": user_id}, field)
+
+    def on_counters_written(self, collection_name, doc_filter):
+        # hasta el flush, get_user_data suma los pendientes a lo cacheado; después hay que releerlo
+        if collection_name == self.db["users"].full_name:
+            self.user_cache.invalidate(doc_filter["_id"])
 
 # 👇 ESTA PARTE ES LA QUE FALTABA 👇
 async def setup(bot):
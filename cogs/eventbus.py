@@ -0,0 +1,178 @@
+import discord
+from discord.ext import commands
+from collections import defaultdict
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# ======================
+# REGISTROS DE CAMBIOS
+# ======================
+class MemberUpdate:
+    """on_member_update decodificado una sola vez para todos los cogs."""
+    __slots__ = ("before", "after", "guild", "roles_added", "roles_removed", "nick_before", "nick_after", "kinds")
+
+    def __init__(self, before: discord.Member, after: discord.Member):
+        self.before = before
+        self.after = after
+        self.guild = after.guild
+        self.roles_added = []
+        self.roles_removed = []
+        self.nick_before = before.nick
+        self.nick_after = after.nick
+        self.kinds = set()
+
+        if before.roles != after.roles:
+            before_roles = set(before.roles)
+            after_roles = set(after.roles)
+            self.roles_added = [r for r in after.roles if r not in before_roles]
+            self.roles_removed = [r for r in before.roles if r not in after_roles]
+            self.kinds.add("member.roles")
+            if self.roles_added:
+                self.kinds.add("member.roles_added")
+            if self.roles_removed:
+                self.kinds.add("member.roles_removed")
+        if before.nick != after.nick:
+            self.kinds.add("member.nick")
+        if before.timed_out_until != after.timed_out_until:
+            self.kinds.add("member.timeout")
+
+
+class MessageDelete:
+    """Mensaje de usuario (no bot) eliminado en un servidor."""
+    __slots__ = ("message", "guild", "channel", "author", "content", "attachments", "_embeds", "kinds")
+
+    def __init__(self, message: discord.Message):
+        self.message = message
+        self.guild = message.guild
+        self.channel = message.channel
+        self.author = message.author
+        self.content = message.content
+        self.attachments = [a.url for a in message.attachments]
+        self._embeds = None
+        self.kinds = {"message.delete"}
+
+    @property
+    def embeds(self):
+        """Embeds como dicts; se convierten la primera vez que un suscriptor los pide."""
+        if self._embeds is None:
+            self._embeds = [e.to_dict() for e in self.message.embeds]
+        return self._embeds
+
+
+class MemberJoin:
+    __slots__ = ("member", "guild", "kinds")
+
+    def __init__(self, member: discord.Member):
+        self.member = member
+        self.guild = member.guild
+        self.kinds = {"member.join", "member.join.bot"} if member.bot else {"member.join"}
+
+
+# ======================
+# BUS
+# ======================
+def subscribers_of(bot):
+    """
+    {tipo: [callback]} guardado en el bot: sobrevive a un ,reload eventbus y admite suscripciones
+    aunque el bus todavía no esté cargado (o no haya podido cargarse).
+    """
+    if not hasattr(bot, "_event_subscribers"):
+        bot._event_subscribers = defaultdict(list)
+    return bot._event_subscribers
+
+
+class EventBus(commands.Cog):
+    """
+    Recibe los eventos del gateway una vez, calcula el cambio y lo reparte a los cogs suscritos.
+    Uso desde un cog:
+        async def cog_load(self):   EventBus.attach(self, {"member.roles_added": self.handler})
+        async def cog_unload(self): EventBus.detach(self)
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.subscribers = subscribers_of(bot)
+        self.stats = defaultdict(lambda: {"calls": 0, "errors": 0, "total": 0.0, "max": 0.0})
+
+    @staticmethod
+    def attach(owner, handlers):
+        """Suscribe los handlers {tipo: callback} del cog `owner`; no necesita que el bus esté cargado."""
+        subscribers = subscribers_of(owner.bot)
+        for kind, callback in handlers.items():
+            if callback not in subscribers[kind]:
+                subscribers[kind].append(callback)
+        if owner.bot.get_cog("EventBus") is None:
+            logger.warning(f"{type(owner).__name__} suscrito sin EventBus cargado: no recibirá eventos hasta que cargue")
+
+    @staticmethod
+    def detach(owner):
+        """Quita todas las suscripciones de un cog (para cog_unload / reload)."""
+        subscribers = subscribers_of(owner.bot)
+        for kind in list(subscribers):
+            subscribers[kind] = [cb for cb in subscribers[kind] if getattr(cb, "__self__", None) is not owner]
+
+    def publish(self, record):
+        targets = []
+        for kind in record.kinds:
+            for callback in self.subscribers.get(kind, ()):
+                if callback not in targets:
+                    targets.append(callback)
+        for callback in targets:
+            asyncio.create_task(self._run(callback, record), name=f"eventbus:{callback.__qualname__}")
+
+    async def _run(self, callback, record):
+        stats = self.stats[callback.__qualname__]
+        start = time.perf_counter()
+        try:
+            await callback(record)
+        except Exception:
+            stats["errors"] += 1
+            logger.exception(f"Error en suscriptor {callback.__qualname__}")
+        finally:
+            elapsed = time.perf_counter() - start
+            stats["calls"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+
+    # ======================
+    # EVENTOS DEL GATEWAY
+    # ======================
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        record = MemberUpdate(before, after)
+        if record.kinds:
+            self.publish(record)
+
+    @commands.Cog.listener()
+    async def on_message_delete(self, message):
+        if not message.guild or message.author.bot:
+            return
+        self.publish(MessageDelete(message))
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.publish(MemberJoin(member))
+
+    # ======================
+    # ESTADÍSTICAS
+    # ======================
+    @commands.command(name="busstats")
+    @commands.is_owner()
+    async def busstats(self, ctx):
+        lines = []
+        for name, s in sorted(self.stats.items(), key=lambda item: -item[1]["total"]):
+            avg = s["total"] / s["calls"] * 1000 if s["calls"] else 0
+            lines.append(f"`{name}` — {s['calls']} llamadas, {avg:.2f} ms prom., {s['max'] * 1000:.1f} ms máx., {s['errors']} errores")
+        subs = "\n".join(f"`{kind}`: {len(cbs)}" for kind, cbs in sorted(self.subscribers.items()) if cbs)
+        embed = discord.Embed(title="📨 Event bus", color=discord.Color.blurple())
+        embed.add_field(name="Suscripciones", value=subs or "Ninguna", inline=False)
+        embed.add_field(name="Suscriptores", value="\n".join(lines)[:1024] or "Sin llamadas todavía", inline=False)
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(EventBus(bot))
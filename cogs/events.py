@@ -2,7 +2,8 @@ import discord
 from discord.ext import commands
 from datetime import datetime, timezone
 
-from config import get_log_channel
+from cogs.eventbus import EventBus
+from cogs.guildconfig import DEFAULTS
 
 # Función para calcular el tiempo en meses, días y horas
 def time_difference_string(dt):
@@ -17,10 +18,20 @@ class Events(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        EventBus.attach(self, {"member.join": self.on_join})
+
+    async def cog_unload(self):
+        EventBus.detach(self)
+
+    def get_log_channel(self, guild):
+        guild_config = self.bot.get_cog("GuildConfig")
+        return guild.get_channel((guild_config.get(guild) if guild_config else DEFAULTS).log_channel_id)
+
     # === EVENTOS ===
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        channel = get_log_channel(member.guild)
+    async def on_join(self, record):
+        member = record.member
+        channel = self.get_log_channel(member.guild)
         if channel:
             embed = discord.Embed(
                 title=f"✅ {member} se unió",
@@ -34,7 +45,7 @@ class Events(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
-        channel = get_log_channel(member.guild)
+        channel = self.get_log_channel(member.guild)
         if channel:
             embed = discord.Embed(
                 title=f"❌ {member} salió",
@@ -2,8 +2,11 @@ import discord
 from discord.ext import commands
 from datetime import datetime, timedelta, timezone
 import asyncio
+import functools
 import typing
 
+from cogs.eventbus import EventBus
+
 # ---------- Configuración ----------
 COLOMBIA_TZ = timezone(timedelta(hours=-5))
 
@@ -25,6 +28,12 @@ class Fun(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        EventBus.attach(self, {"member.roles_added": self.on_roles_added})
+
+    async def cog_unload(self):
+        EventBus.detach(self)
+
     async def send_dm(self, member: typing.Union[discord.Member, discord.User], embed: discord.Embed, staff_channel: typing.Optional[discord.TextChannel] = None, max_attempts: int = 3):
         delay = 2
         for attempt in range(1, max_attempts + 1):
@@ -70,10 +79,10 @@ class Fun(commands.Cog):
         return None
 
     # Listener: al recibir rol
-    @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
+    async def on_roles_added(self, record):
+        after: discord.Member = record.after
         try:
-            added_roles = [r for r in after.roles if r not in before.roles]
+            added_roles = record.roles_added
             print(f"DEBUG: {after} roles agregados: {[r.id for r in added_roles]}")
 
             staff_channel = after.guild.get_channel(STAFF_CHANNEL_ID)
@@ -137,19 +146,18 @@ class Fun(commands.Cog):
                     try:
                         if role.position > mm_role.position:  # Rol superior a Middleman Novato
                             assigner = None
-                            async for entry in after.guild.audit_logs(limit=5, action=discord.AuditLogAction.member_role_update):
+                            audit = self.bot.get_cog("AuditLog")
+                            if audit:
                                 # entry.after puede ser None o un objeto con .roles
-                                try:
-                                    entry_target_id = getattr(entry.target, "id", None)
-                                    entry_after_roles = getattr(entry.after, "roles", None)
-                                    role_ids_in_entry = {r.id for r in entry_after_roles} if entry_after_roles else set()
-                                except Exception:
-                                    entry_target_id = None
-                                    role_ids_in_entry = set()
-
-                                if entry_target_id == after.id and role.id in role_ids_in_entry:
-                                    assigner = entry.user
-                                    break
+                                entry = await audit.wait_for(
+                                    after.guild,
+                                    discord.AuditLogAction.member_role_update,
+                                    target=after.id,
+                                    within=60,
+                                    check=lambda e: role.id in {r.id for r in (getattr(e.after, "roles", None) or [])}
+                                )
+                                if entry:
+                                    assigner = await audit.executor(entry)
 
                             owner = self.bot.get_user(OWNER_ID)
                             if owner is None:
@@ -197,26 +205,24 @@ class Fun(commands.Cog):
     async def unbanall(self, ctx: commands.Context):
         await ctx.send("🔓 Iniciando proceso de desbaneo...")
         try:
-            banned_users = await ctx.guild.bans()  # devuelve lista de BanEntry
+            banned_users = [entry async for entry in ctx.guild.bans(limit=None)]
             if not banned_users:
                 await ctx.send("✅ No hay usuarios baneados.")
                 return
-            await ctx.send(f"🛠️ Desbaneando {len(banned_users)} usuarios...")
-            desbaneados = 0
-            for ban_entry in banned_users:
-                user = ban_entry.user
-                try:
-                    await ctx.guild.unban(user)
-                    desbaneados += 1
-                except discord.NotFound:
-                    continue
-                except discord.Forbidden:
-                    await ctx.send(f"⛔ No tengo permiso para desbanear a {user}.")
-                    continue
-                except Exception as e:
-                    await ctx.send(f"⚠️ Error con {user}: {e}")
-                    continue
-            await ctx.send(f"✅ Desbaneados {desbaneados} usuarios exitosamente.")
+            queue = self.bot.get_cog("ActionQueue")
+            results, job = await queue.run_job(
+                ctx.guild,
+                f"Desbanear {len(banned_users)} usuarios",
+                [
+                    ("unban", functools.partial(ctx.guild.unban, entry.user), str(entry.user))
+                    for entry in banned_users
+                ],
+                channel=ctx.channel
+            )
+            if job.errors:
+                resumen = "\n".join(job.errors[:10])
+                await ctx.send(f"⚠️ {job.failed} errores:\n{resumen}")
+            await ctx.send(f"✅ Desbaneados {job.done} usuarios exitosamente.")
         except Exception as e:
             await ctx.send(f"❌ Error inesperado: {e}")
             print(f"[ERROR] {e}")
@@ -226,8 +232,7 @@ class Fun(commands.Cog):
     @commands.has_permissions(ban_members=True)
     async def banlist(self, ctx: commands.Context):
         try:
-            banned_entries = await ctx.guild.bans()
-            total = len(banned_entries)
+            total = sum([1 async for _ in ctx.guild.bans(limit=None)])
             embed = discord.Embed(
                 title="📊 Lista de baneados",
                 description=f"🔒 Este servidor tiene **{total}** usuarios baneados.",
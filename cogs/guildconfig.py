@@ -0,0 +1,289 @@
+import discord
+from discord.ext import commands
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+import asyncio
+import re
+import logging
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# ======================
+# CONFIGURACIÓN
+# ======================
+COLLECTION = "guild_config"
+POLL_INTERVAL = 60  # segundos entre recargas si Mongo no soporta change streams (sin replica set)
+
+# clave → (tipo, valor por defecto de config.py)
+SETTINGS = {
+    "prefix": ("prefix", config.PREFIX),
+    "log_channel_id": ("channel", config.LOG_CHANNEL_ID),
+    "mod_log_channel_id": ("channel", None),  # logs de moderation; None = log_channel_id
+    "mute_role_id": ("role", config.MUTE_ROLE_ID),
+    "limit_role_id": ("role", config.LIMIT_ROLE_ID),
+    "protected_role_id": ("role", config.PROTECTED_ROLE_ID),
+    "owner_role_id": ("role", config.OWNER_ROLE_ID),
+    "whitelist": ("users", frozenset(config.WHITELIST)),
+}
+
+# IDs que moderation.py tenía fijos antes de este servicio. Se guardan una vez como overrides del servidor
+# que todavía tiene ese rol o canal, para que sus comandos sigan usando lo mismo que antes.
+LEGACY_MODERATION = {
+    "mute_role_id": 1418314510049083556,
+    "limit_role_id": 1415860204624416971,
+    "mod_log_channel_id": 1418314310739955742,
+}
+SEEDED_FIELD = "_legacy_seeded"  # marca en el documento: un ,config reset posterior no se vuelve a sembrar
+
+ID_RE = re.compile(r"\d{15,20}")
+
+
+class GuildSettings:
+    """Configuración efectiva de un servidor (defaults de config.py + lo guardado en Mongo)."""
+    __slots__ = ("guild_id", "overrides", *SETTINGS)
+
+    def __init__(self, guild_id, overrides=None):
+        self.guild_id = guild_id
+        self.overrides = overrides or {}
+        for key, (kind, default) in SETTINGS.items():
+            value = self.overrides.get(key, default)
+            setattr(self, key, frozenset(value) if kind == "users" else value)
+        if self.mod_log_channel_id is None:
+            self.mod_log_channel_id = self.log_channel_id
+
+
+DEFAULTS = GuildSettings(None)  # lo que ven los cogs si GuildConfig no está cargado
+
+
+def parse_value(key, raw):
+    kind = SETTINGS[key][0]
+    if kind == "prefix":
+        if not 1 <= len(raw) <= 5 or " " in raw:
+            raise commands.BadArgument("El prefijo debe tener entre 1 y 5 caracteres, sin espacios.")
+        return raw
+    match = ID_RE.search(raw)
+    if not match:
+        raise commands.BadArgument(f"`{raw}` no es un ID ni una mención válida.")
+    return int(match.group())
+
+
+class GuildConfig(commands.Cog):
+    """
+    Configuración por servidor guardada en Mongo con caché en memoria (write-through).
+    Las lecturas (`get`) son un acceso a diccionario; los cambios de otros procesos llegan por change stream.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.cache = {}  # {guild_id: GuildSettings}, solo servidores con cambios
+        self.defaults = DEFAULTS
+        self.collection = None
+        self.loaded = False  # False mientras no se haya podido leer Mongo: se sirven los defaults
+        self.watch_task = None
+
+    async def cog_load(self):
+        database = self.bot.get_cog("Database")
+        if database is None:
+            logger.warning("GuildConfig sin base de datos: se usan los valores de config.py")
+            return
+        self.collection = database.db[COLLECTION]
+        try:
+            await self.reload()
+        except PyMongoError as e:
+            # el bot arranca igual con config.py; watch_changes reintenta
+            logger.warning(f"GuildConfig no pudo leer Mongo ({e}); se usan los valores de config.py hasta reconectar")
+        self.watch_task = asyncio.create_task(self.watch_changes())
+
+    async def cog_unload(self):
+        if self.watch_task:
+            self.watch_task.cancel()
+
+    # ======================
+    # LECTURA
+    # ======================
+    def get(self, guild):
+        """Configuración de un servidor (objeto Guild o ID); nunca hace I/O."""
+        guild_id = getattr(guild, "id", guild)
+        return self.cache.get(guild_id, self.defaults)
+
+    async def load_all(self):
+        return {doc.pop("_id"): doc async for doc in self.collection.find({})}
+
+    async def reload(self):
+        self.cache = {guild_id: GuildSettings(guild_id, doc) for guild_id, doc in (await self.load_all()).items()}
+        self.loaded = True
+
+    async def sync(self):
+        """Relee la colección y aplica (con su evento) solo lo que cambió."""
+        docs = await self.load_all()
+        for guild_id in set(docs) | set(self.cache):
+            if guild_id not in self.cache or docs.get(guild_id) != self.cache[guild_id].overrides:
+                self.apply(guild_id, docs.get(guild_id))
+        self.loaded = True
+
+    async def wait_loaded(self):
+        while not self.loaded:
+            await asyncio.sleep(POLL_INTERVAL)
+            try:
+                await self.sync()
+                logger.info("GuildConfig conectado a Mongo; configuración por servidor cargada")
+            except PyMongoError as e:
+                logger.warning(f"GuildConfig sigue sin Mongo: {e}")
+
+    async def seed_legacy(self):
+        """Guarda LEGACY_MODERATION en los servidores que aún tienen ese rol o canal (una sola vez por servidor)."""
+        await self.bot.wait_until_ready()
+        for guild in self.bot.guilds:
+            if not any(guild.get_role(v) or guild.get_channel(v) for v in LEGACY_MODERATION.values()):
+                continue
+            overrides = self.get(guild).overrides
+            if overrides.get(SEEDED_FIELD):
+                continue
+            missing = {k: v for k, v in LEGACY_MODERATION.items() if k not in overrides}
+            try:
+                doc = await self.collection.find_one_and_update(
+                    {"_id": guild.id, SEEDED_FIELD: {"$ne": True}},
+                    {"$set": {**missing, SEEDED_FIELD: True}},
+                    upsert=True, return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                continue  # otro proceso lo sembró primero
+            except PyMongoError as e:
+                logger.warning(f"No se pudo sembrar la configuración antigua de moderation en {guild.id}: {e}")
+                continue
+            self.apply(guild.id, doc)
+            logger.info(f"Configuración antigua de moderation guardada en {guild.id}: {', '.join(missing) or 'nada nuevo'}")
+
+    def apply(self, guild_id, doc):
+        old = self.get(guild_id)
+        if doc:
+            doc.pop("_id", None)
+            self.cache[guild_id] = GuildSettings(guild_id, doc)
+        else:
+            self.cache.pop(guild_id, None)
+        new = self.get(guild_id)
+        for key in SETTINGS:
+            if getattr(old, key) != getattr(new, key):
+                self.bot.dispatch("guild_config_update", guild_id, key, getattr(new, key))
+
+    async def watch_changes(self):
+        """Propaga cambios hechos por otros procesos (otros shards, o a mano en la base de datos)."""
+        await self.wait_loaded()
+        await self.seed_legacy()
+        try:
+            async with self.collection.watch(full_document="updateLookup") as stream:
+                async for change in stream:
+                    self.apply(change["documentKey"]["_id"], change.get("fullDocument"))
+        except PyMongoError as e:
+            logger.info(f"GuildConfig sin change streams ({e}); recargando cada {POLL_INTERVAL}s")
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            try:
+                await self.sync()
+            except PyMongoError as e:
+                logger.warning(f"Error recargando GuildConfig: {e}")
+
+    # ======================
+    # ESCRITURA
+    # ======================
+    async def set(self, guild_id, key, value):
+        if self.collection is None:
+            raise commands.CommandError("No hay base de datos configurada.")
+        if isinstance(value, (set, frozenset)):
+            value = sorted(value)
+        doc = await self.collection.find_one_and_update(
+            {"_id": guild_id}, {"$set": {key: value}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self.apply(guild_id, doc)
+
+    async def reset(self, guild_id, key):
+        if self.collection is None:
+            raise commands.CommandError("No hay base de datos configurada.")
+        doc = await self.collection.find_one_and_update(
+            {"_id": guild_id}, {"$unset": {key: ""}}, return_document=ReturnDocument.AFTER
+        )
+        if doc is not None and len(doc) == 1:
+            await self.collection.delete_one({"_id": guild_id, **{k: {"$exists": False} for k in SETTINGS}})
+            doc = None
+        self.apply(guild_id, doc)
+
+    # ======================
+    # COMANDOS
+    # ======================
+    def format_value(self, guild, key, value):
+        kind = SETTINGS[key][0]
+        if kind == "channel":
+            return f"<#{value}>" if guild.get_channel(value) else f"`{value}` (no existe)"
+        if kind == "role":
+            return f"<@&{value}>" if guild.get_role(value) else f"`{value}` (no existe)"
+        if kind == "users":
+            return ", ".join(f"<@{u}>" for u in sorted(value)) or "vacía"
+        return f"`{value}`"
+
+    @commands.group(name="config", invoke_without_command=True)
+    @commands.has_permissions(manage_guild=True)
+    async def config_group(self, ctx):
+        settings = self.get(ctx.guild)
+        lines = [
+            f"**{key}**{' ✏️' if key in settings.overrides else ''}: {self.format_value(ctx.guild, key, getattr(settings, key))}"
+            for key in SETTINGS
+        ]
+        embed = discord.Embed(title="⚙️ Configuración del servidor", description="\n".join(lines), color=discord.Color.blurple())
+        embed.set_footer(text=f"✏️ = cambiado en este servidor • {ctx.clean_prefix}config set/reset/add/remove <clave> <valor>")
+        await ctx.send(embed=embed)
+
+    @config_group.command(name="set")
+    @commands.has_permissions(manage_guild=True)
+    async def config_set(self, ctx, key: str, *, value: str):
+        if key not in SETTINGS or SETTINGS[key][0] == "users":
+            return await ctx.send(f"❌ Clave inválida. Usa una de: {', '.join(k for k, v in SETTINGS.items() if v[0] != 'users')}")
+        parsed = parse_value(key, value)
+        await self.set(ctx.guild.id, key, parsed)
+        await ctx.send(f"✅ **{key}** = {self.format_value(ctx.guild, key, parsed)}")
+
+    @config_group.command(name="reset")
+    @commands.has_permissions(manage_guild=True)
+    async def config_reset(self, ctx, key: str):
+        if key not in SETTINGS:
+            return await ctx.send(f"❌ Clave inválida. Usa una de: {', '.join(SETTINGS)}")
+        if key == "whitelist" and not self.can_edit_whitelist(ctx):
+            return await ctx.send("⛔ Solo el dueño del servidor puede cambiar la whitelist.")
+        await self.reset(ctx.guild.id, key)
+        await ctx.send(f"♻️ **{key}** vuelve al valor por defecto.")
+
+    def can_edit_whitelist(self, ctx):
+        return ctx.author.id == ctx.guild.owner_id or ctx.author.id in config.OWNER_IDS
+
+    @config_group.command(name="add")
+    @commands.has_permissions(manage_guild=True)
+    async def config_add(self, ctx, key: str, *, value: str):
+        await self.edit_users(ctx, key, value, add=True)
+
+    @config_group.command(name="remove")
+    @commands.has_permissions(manage_guild=True)
+    async def config_remove(self, ctx, key: str, *, value: str):
+        await self.edit_users(ctx, key, value, add=False)
+
+    async def edit_users(self, ctx, key, value, add):
+        if key not in SETTINGS or SETTINGS[key][0] != "users":
+            return await ctx.send(f"❌ Clave inválida. Usa una de: {', '.join(k for k, v in SETTINGS.items() if v[0] == 'users')}")
+        if not self.can_edit_whitelist(ctx):
+            return await ctx.send("⛔ Solo el dueño del servidor puede cambiar la whitelist.")
+        user_id = parse_value(key, value)
+        current = getattr(self.get(ctx.guild), key)
+        await self.set(ctx.guild.id, key, current | {user_id} if add else current - {user_id})
+        await ctx.send(f"✅ <@{user_id}> {'añadido a' if add else 'quitado de'} **{key}**.")
+
+    @commands.command(name="prefix")
+    @commands.has_permissions(manage_guild=True)
+    async def prefix(self, ctx, new_prefix: str = None):
+        if new_prefix is None:
+            return await ctx.send(f"Prefijo actual: `{self.get(ctx.guild).prefix}`")
+        await self.set(ctx.guild.id, "prefix", parse_value("prefix", new_prefix))
+        await ctx.send(f"✅ Nuevo prefijo: `{new_prefix}`")
+
+
+async def setup(bot):
+    await bot.add_cog(GuildConfig(bot))
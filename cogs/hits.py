@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-import json
+import jsoncodec
 from datetime import datetime
 
 # ====================================================
@@ -10,14 +10,14 @@ LOG_FILE = "join_logs.json"
 
 def load_logs():
     try:
-        with open(LOG_FILE, "r") as f:
-            return json.load(f)
+        with open(LOG_FILE, "r", encoding="utf-8") as f:
+            return jsoncodec.load(f)
     except FileNotFoundError:
         return {}
 
 def save_logs(data):
-    with open(LOG_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    with open(LOG_FILE, "w", encoding="utf-8") as f:
+        jsoncodec.dump(data, f, indent=True)
 
 join_logs = load_logs()
 
@@ -0,0 +1,258 @@
+import discord
+from discord.ext import commands
+from collections import defaultdict
+import aiohttp
+import asyncio
+import contextvars
+import random
+import time
+import logging
+from urllib.parse import urlsplit
+
+import jsoncodec
+
+logger = logging.getLogger(__name__)
+
+# ======================
+# CONFIGURACIÓN
+# ======================
+# Límites por host (se compara por sufijo): peticiones simultáneas y token bucket (peticiones/segundo, ráfaga)
+HOST_LIMITS = {
+    "api.coingecko.com": {"concurrency": 2, "rate": 0.5, "burst": 5},
+    "api.blockcypher.com": {"concurrency": 3, "rate": 3, "burst": 3},
+    "roblox.com": {"concurrency": 6, "rate": 10, "burst": 20},
+    "translate.google.com": {"concurrency": 4, "rate": 5, "burst": 10},
+}
+DEFAULT_LIMITS = {"concurrency": 10, "rate": 20, "burst": 20}
+
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5        # segundos, se duplica en cada reintento
+MAX_RETRY_AFTER = 30      # si Discord/API pide esperar más, se falla en vez de bloquear el comando
+REQUEST_TIMEOUT = 10
+BREAKER_THRESHOLD = 5     # fallos seguidos para abrir el circuito
+BREAKER_COOLDOWN = 30     # segundos con el circuito abierto
+
+# Tiempo HTTP acumulado por el comando en curso; Metrics lo inicializa con [0.0] antes de cada comando
+COMMAND_HTTP_TIME = contextvars.ContextVar("command_http_time", default=None)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(HTTPError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False  # en half-open pasa una sola petición de prueba
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self.trial:
+            return False
+        self.trial = True
+        return True
+
+    def end_trial(self):
+        """La prueba terminó sin decidir nada (p. ej. un 4xx o una cancelación): la siguiente petición prueba otra vez."""
+        self.trial = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold or self.trial:
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+
+class HostPolicy:
+    def __init__(self, limits):
+        self.semaphore = asyncio.Semaphore(limits["concurrency"])
+        self.bucket = TokenBucket(limits["rate"], limits["burst"])
+        self.breaker = CircuitBreaker()
+        self.stats = defaultdict(int)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+
+class HTTPClient(commands.Cog):
+    """
+    Cliente HTTP compartido por todos los cogs: un pool de conexiones con keep-alive y caché DNS,
+    límites por host, reintentos con Retry-After y circuit breaker.
+    Uso: await self.bot.get_cog("HTTPClient").request_json("GET", url, params=...)
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.session = None
+        self.hosts = {}
+        self.command_http_time = COMMAND_HTTP_TIME
+
+    async def cog_load(self):
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            headers={"User-Agent": "SiquejBot (discord.py)"},
+            json_serialize=jsoncodec.dumps,
+        )
+
+    async def cog_unload(self):
+        if self.session:
+            await self.session.close()
+
+    def policy(self, host):
+        if host not in self.hosts:
+            limits = next((v for k, v in HOST_LIMITS.items() if host == k or host.endswith("." + k)), DEFAULT_LIMITS)
+            self.hosts[host] = HostPolicy(limits)
+        return self.hosts[host]
+
+    # ======================
+    # PETICIONES
+    # ======================
+    async def _request(self, method, url, parse, **kwargs):
+        spent = COMMAND_HTTP_TIME.get()
+        if spent is None:
+            return await self._send(method, url, parse, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await self._send(method, url, parse, **kwargs)
+        finally:
+            spent[0] += time.perf_counter() - start
+
+    async def _send(self, method, url, parse, **kwargs):
+        host = urlsplit(url).hostname or ""
+        policy = self.policy(host)
+        trial = policy.breaker.state == "half-open"  # si pasa, es la única petición de prueba
+        if not policy.breaker.allow():
+            policy.stats["circuit_open"] += 1
+            raise CircuitOpenError(None, f"{host} no disponible temporalmente")
+        if not trial:
+            return await self._attempts(policy, method, url, parse, **kwargs)
+        try:
+            return await self._attempts(policy, method, url, parse, **kwargs)
+        finally:
+            policy.breaker.end_trial()
+
+    async def _attempts(self, policy, method, url, parse, **kwargs):
+        last_error = None
+        for attempt in range(MAX_ATTEMPTS):
+            await policy.bucket.acquire()
+            async with policy.semaphore:
+                start = time.perf_counter()
+                try:
+                    async with self.session.request(method, url, **kwargs) as resp:
+                        elapsed = time.perf_counter() - start
+                        policy.latency_total += elapsed
+                        policy.latency_max = max(policy.latency_max, elapsed)
+                        policy.stats[f"{resp.status // 100}xx"] += 1
+
+                        if 200 <= resp.status < 300:
+                            policy.breaker.record_success()
+                            return await parse(resp)
+
+                        last_error = HTTPError(resp.status, f"Error HTTP {resp.status}")
+                        if resp.status == 429 or resp.status >= 500:
+                            if resp.status >= 500:
+                                policy.breaker.record_failure()
+                            delay = self.retry_delay(resp, attempt)
+                            if delay is None:
+                                break
+                        else:
+                            raise last_error
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    policy.stats["errors"] += 1
+                    policy.breaker.record_failure()
+                    last_error = HTTPError(None, f"Error de conexión: {e}")
+                    delay = BACKOFF_BASE * 2 ** attempt
+
+            if policy.breaker.state == "open":
+                # este fallo (o uno en paralelo) abrió el circuito: reintentar sería insistir con un host caído,
+                # y en half-open la prueba es una sola petición
+                policy.stats["circuit_open"] += 1
+                break
+            if attempt < MAX_ATTEMPTS - 1:
+                await asyncio.sleep(delay + random.uniform(0, BACKOFF_BASE))
+        raise last_error
+
+    def retry_delay(self, resp, attempt):
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after is None:
+            return BACKOFF_BASE * 2 ** attempt
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            return BACKOFF_BASE * 2 ** attempt
+        return delay if delay <= MAX_RETRY_AFTER else None
+
+    async def request_json(self, method, url, **kwargs):
+        """JSON de una respuesta 2xx; lanza HTTPError si no se pudo obtener."""
+        async def parse(resp):
+            return await resp.json(content_type=None, loads=jsoncodec.loads)
+        return await self._request(method, url, parse, **kwargs)
+
+    async def request_text(self, method, url, **kwargs):
+        async def parse(resp):
+            return await resp.text()
+        return await self._request(method, url, parse, **kwargs)
+
+    # ======================
+    # ESTADÍSTICAS
+    # ======================
+    @commands.command(name="httpstats")
+    @commands.is_owner()
+    async def httpstats(self, ctx):
+        lines = []
+        for host, p in sorted(self.hosts.items()):
+            total = sum(v for k, v in p.stats.items() if k.endswith("xx"))
+            avg = p.latency_total / total * 1000 if total else 0
+            codes = ", ".join(f"{k}: {v}" for k, v in sorted(p.stats.items()))
+            lines.append(f"**{host}** — {avg:.0f} ms prom., {p.latency_max * 1000:.0f} ms máx., circuito {p.breaker.state}\n{codes}")
+        embed = discord.Embed(title="🌐 HTTP", description="\n".join(lines)[:4000] or "Sin peticiones todavía", color=discord.Color.blurple())
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(HTTPClient(bot))
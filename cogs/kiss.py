@@ -1,21 +1,34 @@
 import discord
 from discord.ext import commands
+from bson.int64 import Int64
+from collections import OrderedDict
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+import asyncio
 import random
-import motor.motor_asyncio
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-mongo_uri = os.getenv("MONGO_URI")
-pair_db = None
-if mongo_uri:
-    client = motor.motor_asyncio.AsyncIOMotorClient(mongo_uri)
-    db = client["siquej_bot"]
-    pair_db = db["parejas"]
-    print("MongoDB conectado")
-else:
-    print("MongoDB no configurado")
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Las parejas viven en otra base de datos que el resto del bot; el cliente es el compartido de cogs/database.py
+KISS_DB = "siquej_bot"
+# Cada pareja es {"a": id menor, "b": id mayor, "count": n}, con a y b como int64
+PAIR_INDEXES = [
+    # parcial: los documentos antiguos (sin a/b) no chocan en (null, null) mientras se migran
+    IndexModel([("a", 1), ("b", 1)], unique=True, name="pair_ab_unique", partialFilterExpression={"a": {"$exists": True}}),
+    IndexModel([("count", -1)], name="count_desc"),        # ,kisstop
+    IndexModel([("a", 1), ("count", -1)], name="a_count"),  # ,mykisses (el usuario es a)
+    IndexModel([("b", 1), ("count", -1)], name="b_count"),  # ,mykisses (el usuario es b)
+]
+LEGACY_INDEX = "pair_unique"  # índice sobre el antiguo campo "pair" = "id1_id2"
+MIGRATED_FIELD = "migrated_from"  # _id de los documentos antiguos ya sumados en la pareja (solo durante la migración)
+DUPLICATE_KEY = 11000
+
+TOP_SIZE = 50               # parejas que se mantienen en el top global
+USER_TOP_SIZE = 10          # parejas por usuario en ,mykisses
+USER_TOPS_CACHED = 1000     # usuarios con su top en memoria
+LEADERBOARD_REFRESH = 60    # segundos mínimos entre agregaciones sobre la colección
 
 KISS_GIFS = [
     {"url": "https://raw.githubusercontent.com/siquejontop/bot-de-scan-prices-y-mas/main/assets/kiss.gif", "source": "Anime: Kiss x Sis"},
@@ -23,12 +36,107 @@ KISS_GIFS = [
     {"url": "https://raw.githubusercontent.com/siquejontop/bot-de-scan-prices-y-mas/main/assets/kiss2.gif", "source": "Anime: Toradora!"}, 
 ]
 
+def pair_of(user1, user2):
+    a, b = sorted((user1, user2))
+    return Int64(a), Int64(b)
+
+
+def pair_filter(pair):
+    return {"a": pair[0], "b": pair[1]}
+
+
+class TopPairs:
+    """
+    Top-K de parejas por número de besos. Se recarga con una agregación como mucho cada
+    LEADERBOARD_REFRESH segundos y, entre medias, cada beso lo actualiza con `offer` (O(K)).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.rows = {}  # {(a, b): count}
+        self.refreshed_at = 0.0
+
+    @property
+    def stale(self):
+        return time.monotonic() - self.refreshed_at > LEADERBOARD_REFRESH
+
+    def load(self, docs):
+        self.rows = {(doc["a"], doc["b"]): doc["count"] for doc in docs}
+        self.refreshed_at = time.monotonic()
+
+    def offer(self, pair, count):
+        if pair in self.rows or len(self.rows) < self.size:
+            self.rows[pair] = count
+            return
+        lowest = min(self.rows, key=self.rows.get)
+        if count > self.rows[lowest]:
+            del self.rows[lowest]
+            self.rows[pair] = count
+
+    def top(self, n=None):
+        return sorted(self.rows.items(), key=lambda item: -item[1])[:n]
+
+
+async def migrate_pair_keys(collection):
+    """
+    Migración única: {"pair": "id1_id2"} → {"a": id1, "b": id2}. Los duplicados que dejaron upserts
+    concurrentes sin índice se suman en una sola pareja. Devuelve cuántos documentos se migraron.
+    Se puede repetir tras un fallo a medias: ningún documento antiguo se suma dos veces.
+    """
+    migrated = 0
+    batch = []  # [(_id antiguo, pareja, count)]
+    async for doc in collection.find({"pair": {"$type": "string"}}, {"pair": 1, "count": 1}):
+        try:
+            user1, user2 = (int(part) for part in doc["pair"].split("_"))
+        except ValueError:
+            logger.warning(f"Pareja con clave inválida sin migrar: {doc['pair']!r}")
+            continue
+        batch.append((doc["_id"], pair_of(user1, user2), doc.get("count", 0)))
+        if len(batch) >= 1000:
+            migrated += await _flush_migration(collection, batch)
+            batch = []
+    if batch:
+        migrated += await _flush_migration(collection, batch)
+    if migrated:
+        await collection.update_many({MIGRATED_FIELD: {"$exists": True}}, {"$unset": {MIGRATED_FIELD: ""}})
+    return migrated
+
+
+async def _flush_migration(collection, batch):
+    """
+    Suma cada documento antiguo en su pareja y después lo borra. El _id antiguo queda anotado en la pareja
+    (MIGRATED_FIELD) en la misma escritura que el $inc, así que repetir el lote no vuelve a sumarlo.
+    """
+    pending = batch
+    for _ in range(2):
+        ops = [
+            UpdateOne(
+                {**pair_filter(pair), MIGRATED_FIELD: {"$ne": old_id}},
+                {"$inc": {"count": count}, "$push": {MIGRATED_FIELD: old_id}},
+                upsert=True,
+            )
+            for old_id, pair, count in pending
+        ]
+        try:
+            await collection.bulk_write(ops, ordered=False)
+            break
+        except BulkWriteError as e:
+            errors = e.details["writeErrors"]
+            if any(err["code"] != DUPLICATE_KEY for err in errors):
+                raise
+            # clave duplicada: o ya estaba sumado (el filtro no casa y el upsert choca con el índice único)
+            # o un beso creó la pareja a la vez; el segundo intento solo vuelve a fallar en el primer caso
+            pending = [pending[err["index"]] for err in errors]
+    await collection.delete_many({"_id": {"$in": [old_id for old_id, _, _ in batch]}})
+    return len(batch)
+
+
 class KissView(discord.ui.View):
-    def __init__(self, author, target, pair_key, gif_data):
+    def __init__(self, cog, author, target, gif_data):
         super().__init__(timeout=300)
+        self.cog = cog
         self.author = author
         self.target = target
-        self.pair_key = pair_key
         self.gif_data = gif_data
 
     @discord.ui.button(label="Corresponder", style=discord.ButtonStyle.grey, emoji="❤️")
@@ -36,15 +144,7 @@ class KissView(discord.ui.View):
         if interaction.user != self.target:
             return await interaction.response.send_message("Solo el mencionado puede corresponder.", ephemeral=True)
 
-        count = 1
-        if pair_db is not None:
-            result = await pair_db.find_one_and_update(
-                {"pair": self.pair_key},
-                {"$inc": {"count": 1}},
-                upsert=True,
-                return_document=True
-            )
-            count = result.get("count", 1)
+        count = await self.cog.add_kiss(self.author.id, self.target.id)
 
         embed = discord.Embed(color=0xFFC0CB)
         embed.description = f"**{self.target.display_name}** le dio un dulce beso a **{self.author.display_name}** 💕\n"
@@ -65,6 +165,137 @@ class KissView(discord.ui.View):
 class Interacciones(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.top_pairs = TopPairs(TOP_SIZE)
+        self.user_tops = OrderedDict()  # {user_id: TopPairs}, LRU
+        self.refresh_lock = asyncio.Lock()
+        self.setup_task = None
+
+    @property
+    def database(self):
+        return self.bot.get_cog("Database")
+
+    @property
+    def pairs(self):
+        return self.database.collection("parejas", KISS_DB)
+
+    async def cog_load(self):
+        if self.database:
+            self.setup_task = asyncio.create_task(self.prepare_collection())
+
+    async def cog_unload(self):
+        if self.setup_task:
+            self.setup_task.cancel()
+
+    async def prepare_collection(self):
+        """Crea el índice único nuevo, quita el antiguo y migra las claves "id1_id2" que queden."""
+        try:
+            indexes = await self.pairs.index_information()
+            if PAIR_INDEXES[0].document["name"] not in indexes:
+                # antes de quitar el antiguo: en ningún momento se pueden colar dos documentos de la misma pareja
+                await self.pairs.create_indexes(PAIR_INDEXES[:1])
+            if LEGACY_INDEX in indexes:
+                # con él, todas las parejas nuevas (sin campo "pair") chocarían en pair=null
+                await self.pairs.drop_index(LEGACY_INDEX)
+            migrated = await migrate_pair_keys(self.pairs)
+            if migrated:
+                logger.info(f"Parejas migradas a claves enteras: {migrated}")
+        except PyMongoError as e:
+            logger.error(f"No se pudo preparar la colección de parejas: {e}")
+        self.database.declare_indexes(self.pairs, PAIR_INDEXES, queries=[
+            {"a": Int64(0), "b": Int64(1)},
+            ({}, [("count", -1)]),
+            ({"$or": [{"a": Int64(0)}, {"b": Int64(0)}]}, [("count", -1)]),
+        ])
+
+    # ======================
+    # CONTADORES
+    # ======================
+    async def add_kiss(self, user1, user2):
+        """Suma un beso a la pareja y devuelve el total; la escritura va por el buffer de contadores de Database."""
+        database = self.database
+        if database is None:
+            return 1
+        pair = pair_of(user1, user2)
+        database.counters.incr(self.pairs, pair_filter(pair), "count")
+        doc = await database.counters.get(self.pairs, pair_filter(pair))
+        count = doc.get("count", 1)
+        self.top_pairs.offer(pair, count)
+        for user_id in pair:
+            if user_id in self.user_tops:
+                self.user_tops[user_id].offer(pair, count)
+        return count
+
+    # ======================
+    # RANKINGS
+    # ======================
+    async def aggregate_top(self, match, size):
+        pipeline = [{"$match": match}] if match else []
+        pipeline += [
+            {"$sort": {"count": -1}},
+            {"$limit": size},
+            {"$project": {"_id": 0, "a": 1, "b": 1, "count": 1}},
+        ]
+        return [doc async for doc in self.pairs.aggregate(pipeline)]
+
+    async def global_top(self):
+        async with self.refresh_lock:
+            if self.top_pairs.stale:
+                # lo pendiente del buffer se escribe antes para que la agregación lo vea
+                await self.database.counters.flush()
+                self.top_pairs.load(await self.aggregate_top(None, TOP_SIZE))
+        return self.top_pairs
+
+    async def user_top(self, user_id):
+        top = self.user_tops.get(user_id)
+        if top is None or top.stale:
+            await self.database.counters.flush()
+            top = TopPairs(USER_TOP_SIZE)
+            top.load(await self.aggregate_top({"$or": [{"a": Int64(user_id)}, {"b": Int64(user_id)}]}, USER_TOP_SIZE))
+            self.user_tops[user_id] = top
+            while len(self.user_tops) > USER_TOPS_CACHED:
+                self.user_tops.popitem(last=False)
+        self.user_tops.move_to_end(user_id)
+        return top
+
+    def user_name(self, user_id):
+        user = self.bot.get_user(user_id)
+        return user.display_name if user else f"<@{user_id}>"
+
+    @commands.command(name="kisstop", aliases=["topbesos"])
+    @commands.cooldown(1, 5, commands.BucketType.user)
+    async def kisstop(self, ctx):
+        if self.database is None:
+            return await ctx.send("No hay base de datos configurada.")
+        top = await self.global_top()
+        lines = [
+            f"**{i}.** {self.user_name(a)} 💋 {self.user_name(b)} — **{count}**"
+            for i, ((a, b), count) in enumerate(top.top(10), start=1)
+        ]
+        embed = discord.Embed(title="💞 Parejas con más besos", description="\n".join(lines) or "Todavía no hay besos.", color=0xFFC0CB)
+        await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+    @commands.command(name="mykisses", aliases=["misbesos"])
+    @commands.cooldown(1, 5, commands.BucketType.user)
+    async def mykisses(self, ctx, member: discord.Member = None):
+        if self.database is None:
+            return await ctx.send("No hay base de datos configurada.")
+        member = member or ctx.author
+        top = await self.user_top(member.id)
+        lines = [
+            f"**{i}.** {self.user_name(b if a == member.id else a)} — **{count}**"
+            for i, ((a, b), count) in enumerate(top.top(), start=1)
+        ]
+        embed = discord.Embed(title=f"💋 Besos de {member.display_name}", description="\n".join(lines) or "Sin besos todavía.", color=0xFFC0CB)
+        await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+    @commands.command(name="migratekisses")
+    @commands.is_owner()
+    async def migratekisses(self, ctx):
+        """Vuelve a lanzar la migración de claves "id1_id2" (normalmente se hace sola al cargar el cog)."""
+        if self.database is None:
+            return await ctx.send("No hay base de datos configurada.")
+        migrated = await migrate_pair_keys(self.pairs)
+        await ctx.send(f"✅ {migrated} parejas migradas.")
 
     @commands.command(aliases=["beso", "k"])
     @commands.cooldown(1, 5, commands.BucketType.user)
@@ -78,17 +309,7 @@ class Interacciones(commands.Cog):
 
         gif_data = random.choice(KISS_GIFS)
 
-        user_ids = sorted([ctx.author.id, member.id])
-        pair_key = f"{user_ids[0]}_{user_ids[1]}"
-        count = 1
-        if pair_db is not None:
-            result = await pair_db.find_one_and_update(
-                {"pair": pair_key},
-                {"$inc": {"count": 1}},
-                upsert=True,
-                return_document=True
-            )
-            count = result.get("count", 1)
+        count = await self.add_kiss(ctx.author.id, member.id)
 
         embed = discord.Embed(color=0xFFC0CB)
         embed.description = f"**{ctx.author.display_name}** le dio un dulce beso a **{member.display_name}** 💕\n"
@@ -96,7 +317,7 @@ class Interacciones(commands.Cog):
         embed.set_image(url=gif_data["url"])
         embed.set_footer(text=gif_data["source"])
 
-        view = KissView(ctx.author, member, pair_key, gif_data)
+        view = KissView(self, ctx.author, member, gif_data)
         await ctx.send(embed=embed, view=view)
 
 async def setup(bot):
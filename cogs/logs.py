@@ -1,71 +1,24 @@
 import logging
-import logging.handlers
-import os
 from datetime import datetime, timezone, timedelta
 import traceback
 import asyncio
 import discord
 from discord.ext import commands
 
+from cogs.eventbus import EventBus
+
 # ======================
 # CONFIGURACIÓN LOGS
 # ======================
 
-try:
-    import colorlog
-    HAS_COLORLOG = True
-except:
-    HAS_COLORLOG = False
-
 try:
     import config
     CONFIG = config
 except:
     CONFIG = None
 
-LOG_DIR = "logs"
-LOG_FILENAME = "bot.log"
-MAX_BYTES = 5 * 1024 * 1024
-BACKUP_COUNT = 5
-CONSOLE_LEVEL = logging.INFO
-FILE_LEVEL = logging.DEBUG
-LOGGER_NAME = "unban_bot"
-
-os.makedirs(LOG_DIR, exist_ok=True)
-log_path = os.path.join(LOG_DIR, LOG_FILENAME)
-
-
-def setup_root_logger():
-    logger = logging.getLogger(LOGGER_NAME)
-    logger.setLevel(logging.DEBUG)
-
-    if not logger.handlers:
-        fh = logging.handlers.RotatingFileHandler(
-            log_path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
-        )
-        fh.setLevel(FILE_LEVEL)
-        fh.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
-        logger.addHandler(fh)
-
-        ch = logging.StreamHandler()
-        ch.setLevel(CONSOLE_LEVEL)
-
-        if HAS_COLORLOG:
-            formatter = colorlog.ColoredFormatter(
-                "%(log_color)s%(asctime)s%(reset)s [%(log_color)s%(levelname)s%(reset)s] "
-                "%(log_color)s%(message)s%(reset)s",
-                datefmt="%H:%M:%S",
-            )
-        else:
-            formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", datefmt="%H:%M:%S")
-
-        ch.setFormatter(formatter)
-        logger.addHandler(ch)
-
-    return logger
-
-
-logger = setup_root_logger()
+# Handlers, formato y rotación: logging_config.py
+logger = logging.getLogger(__name__)
 
 
 # ===========================================================
@@ -75,15 +28,30 @@ logger = setup_root_logger()
 class Logs(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger = logger
         self.last_sent = {}
         self.logger.debug("✅ Cog de logs inicializado correctamente.")
 
+    async def cog_load(self):
+        EventBus.attach(self, {
+            "member.join": self.on_join,
+            "message.delete": self.on_delete,
+            "member.roles": self.on_roles_update,
+        })
+
+    async def cog_unload(self):
+        EventBus.detach(self)
+
     # ======================
     # BUSCAR CANAL DE LOGS
     # ======================
     def _find_log_channel(self, guild):
-        if CONFIG and hasattr(CONFIG, "LOG_CHANNEL_ID"):
+        guild_config = self.bot.get_cog("GuildConfig")
+        if guild_config:
+            ch = guild.get_channel(guild_config.get(guild).log_channel_id)
+            if ch:
+                return ch
+        elif CONFIG and hasattr(CONFIG, "LOG_CHANNEL_ID"):
             ch = guild.get_channel(CONFIG.LOG_CHANNEL_ID)
             if ch:
                 return ch
@@ -124,8 +92,8 @@ class Logs(commands.Cog):
     async def on_ready(self):
         self.logger.info(f"✅ Bot listo: {self.bot.user}")
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
+    async def on_join(self, record):
+        member = record.member
         ch = self._find_log_channel(member.guild)
         if ch:
             embed = self._embed("✅ Usuario unido", f"{member.mention}\nID: `{member.id}`", discord.Color.green())
@@ -139,20 +107,16 @@ class Logs(commands.Cog):
             embed = self._embed("❌ Usuario salió", f"{member} (`{member.id}`)", discord.Color.red())
             await self._safe_send(ch, embed)
 
-    @commands.Cog.listener()
-    async def on_message_delete(self, message):
-        if not message.guild or message.author.bot:
-            return
-
-        ch = self._find_log_channel(message.guild)
+    async def on_delete(self, record):
+        ch = self._find_log_channel(record.guild)
         if not ch:
             return
 
         embed = self._embed(
             "🗑️ Mensaje eliminado",
-            f"**Autor:** {message.author} (`{message.author.id}`)\n"
-            f"**Canal:** {message.channel.mention}\n"
-            f"**Contenido:** {message.content or '*[embed/archivo]*'}",
+            f"**Autor:** {record.author} (`{record.author.id}`)\n"
+            f"**Canal:** {record.channel.mention}\n"
+            f"**Contenido:** {record.content or '*[embed/archivo]*'}",
             discord.Color.orange()
         )
         await self._safe_send(ch, embed)
@@ -180,35 +144,30 @@ class Logs(commands.Cog):
     # 🔥 LOGS DE ROLES (AL ESTILO AUDIT LOG)
     # ===========================================================
 
-    @commands.Cog.listener()
-    async def on_member_update(self, before, after):
-        if before.roles == after.roles:
-            return
-
+    async def on_roles_update(self, record):
+        after = record.after
         ch = self._find_log_channel(after.guild)
         if not ch:
             return
 
-        # Intenta obtener la entrada de auditoría más reciente para member_role_update
+        # Entrada de auditoría de este cambio, desde el audit log compartido (cogs/auditlog.py)
         entry = None
-        try:
-            entry = (await after.guild.audit_logs(
-                limit=1,
-                action=discord.AuditLogAction.member_role_update
-            ).flatten())[0]
-        except Exception:
-            entry = None
+        audit = self.bot.get_cog("AuditLog")
+        if audit:
+            entry = await audit.wait_for(
+                after.guild, discord.AuditLogAction.member_role_update, target=after.id, within=10
+            )
 
         # Si la entrada fue hecha por el bot (porque el bot aplicó el cambio),
         # intentamos recuperar quién ejecutó la acción desde bot._last_role_action
         moderator = None
         try:
-            if entry and entry.user and entry.user.id == self.bot.user.id:
+            if entry and entry.user_id == self.bot.user.id:
                 moderator = None
                 if hasattr(self.bot, "_last_role_action"):
                     moderator = self.bot._last_role_action.pop(after.id, None)
             else:
-                moderator = entry.user if entry else None
+                moderator = await audit.executor(entry) if entry else None
         except Exception:
             moderator = entry.user if entry else None
 
@@ -216,8 +175,8 @@ class Logs(commands.Cog):
         if not moderator:
             moderator = "Desconocido"
 
-        added = list(set(after.roles) - set(before.roles))
-        removed = list(set(before.roles) - set(after.roles))
+        added = record.roles_added
+        removed = record.roles_removed
 
         embed = discord.Embed(
             color=discord.Color.blurple(),
@@ -0,0 +1,184 @@
+import discord
+from discord.ext import commands
+from collections import deque
+from datetime import datetime, timezone
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ======================
+# CONFIGURACIÓN
+# ======================
+SAMPLE_INTERVAL = 0.1  # cada cuánto se mide el lag (segundos)
+# bloqueo a partir del cual se registra (con un mínimo para que el watchdog no gire en vacío)
+SLOW_CALLBACK_THRESHOLD = max(0.01, float(os.getenv("LOOP_SLOW_MS", 200)) / 1000)
+WINDOW_SAMPLES = 3000  # ~5 minutos de muestras
+MAX_SLOW_RECORDS = 50
+COGS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoopMonitor(commands.Cog):
+    """Mide el lag del event loop y detecta callbacks que lo bloquean."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.samples = deque(maxlen=WINDOW_SAMPLES)
+        self.slow_callbacks = deque(maxlen=MAX_SLOW_RECORDS)
+        self.stall_count = 0
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id = None
+        self._stall = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._watchdog = None
+
+    async def cog_load(self):
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self._sampler = asyncio.create_task(self.sample_loop())
+        self._watchdog = threading.Thread(target=self.watchdog, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def cog_unload(self):
+        self._stop.set()
+        if self._sampler:
+            self._sampler.cancel()
+
+    # ======================
+    # MUESTREO (en el loop)
+    # ======================
+    async def sample_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self.heartbeat = time.monotonic()
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            lag = max(0.0, loop.time() - start - SAMPLE_INTERVAL)
+            self.heartbeat = time.monotonic()
+            self.samples.append(lag)
+
+            with self._lock:
+                stall, self._stall = self._stall, None
+            if stall is not None:
+                stall["duration"] = lag
+                stall["source"] = self.resolve_source(stall["qualname"])
+                logger.warning(
+                    f"Event loop bloqueado {lag * 1000:.0f} ms por {stall['source'] or stall['location'] or 'desconocido'}\n"
+                    + "".join(stall["stack"][-6:])
+                )
+
+    # ======================
+    # WATCHDOG (hilo aparte)
+    # ======================
+    def watchdog(self):
+        while not self._stop.wait(SLOW_CALLBACK_THRESHOLD / 4):
+            # el sampler duerme SAMPLE_INTERVAL entre latidos: solo cuenta lo que pase de ahí
+            if time.monotonic() - self.heartbeat < SAMPLE_INTERVAL + SLOW_CALLBACK_THRESHOLD:
+                continue
+            with self._lock:
+                if self._stall is not None:
+                    continue
+                frame = sys._current_frames().get(self.loop_thread_id)
+                if frame is None:
+                    continue
+                record = self.capture(frame)
+                self._stall = record
+                self.slow_callbacks.append(record)
+                self.stall_count += 1
+
+    def capture(self, frame):
+        """Guarda el stack del loop bloqueado y el método de cog más interno que aparece en él."""
+        qualname = location = None
+        f = frame
+        while f is not None:
+            code = f.f_code
+            if os.path.dirname(os.path.abspath(code.co_filename)) == COGS_DIR and not code.co_filename.endswith("loopmonitor.py"):
+                qualname = code.co_qualname
+                location = f"cogs/{os.path.basename(code.co_filename)}:{f.f_lineno}"
+                break
+            f = f.f_back
+        return {
+            "when": datetime.now(timezone.utc),
+            "duration": None,
+            "qualname": qualname,
+            "location": location,
+            "source": None,
+            "stack": traceback.format_stack(frame)[-15:],
+        }
+
+    def resolve_source(self, qualname):
+        """Traduce el método de cog al comando o listener responsable."""
+        if not qualname:
+            return None
+        for command in self.bot.walk_commands():
+            if command.callback.__qualname__ == qualname:
+                return f"comando ,{command.qualified_name}"
+        for command in self.bot.tree.walk_commands():
+            if getattr(command, "callback", None) and command.callback.__qualname__ == qualname:
+                return f"comando /{command.qualified_name}"
+        for event, listeners in self.bot.extra_events.items():
+            if any(l.__qualname__ == qualname for l in listeners):
+                return f"listener {qualname} ({event})"
+        return qualname
+
+    # ======================
+    # ESTADÍSTICAS
+    # ======================
+    def stats(self):
+        values = sorted(self.samples)
+        return {
+            "p50": percentile(values, 0.50),
+            "p99": percentile(values, 0.99),
+            "max": values[-1] if values else 0.0,
+            "last": self.samples[-1] if self.samples else 0.0,
+            "samples": len(values),
+        }
+
+    @commands.command(name="loopstats")
+    @commands.is_owner()
+    async def loopstats(self, ctx):
+        s = self.stats()
+        embed = discord.Embed(
+            title="⏱️ Event loop",
+            description=(
+                f"**p50:** {s['p50'] * 1000:.2f} ms\n"
+                f"**p99:** {s['p99'] * 1000:.2f} ms\n"
+                f"**Máximo:** {s['max'] * 1000:.2f} ms\n"
+                f"**Muestras:** {s['samples']} (cada {SAMPLE_INTERVAL * 1000:.0f} ms)\n"
+                f"**Bloqueos > {SLOW_CALLBACK_THRESHOLD * 1000:.0f} ms:** {self.stall_count}"
+            ),
+            color=discord.Color.blurple(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        recent = [r for r in self.slow_callbacks if r["duration"] is not None][-5:]
+        if recent:
+            embed.add_field(
+                name="Últimos bloqueos",
+                value="\n".join(
+                    f"<t:{int(r['when'].timestamp())}:R> **{r['duration'] * 1000:.0f} ms** — "
+                    f"{r['source'] or 'desconocido'} `{r['location'] or '?'}`"
+                    for r in reversed(recent)
+                ),
+                inline=False
+            )
+            stack = "".join(recent[-1]["stack"][-6:])
+            embed.add_field(name="Stack del último", value=f"```{stack[-1000:]}```", inline=False)
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(LoopMonitor(bot))
@@ -1,8 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
-import json
+import jsoncodec
 import os
 import qrcode
 import io
@@ -11,7 +10,6 @@ import io
 class LTC(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
         self.file_path = "ltc_addresses.json"
         self.addresses = self.load_addresses()
 
@@ -31,14 +29,18 @@ class LTC(commands.Cog):
         if os.path.exists(self.file_path):
             try:
                 with open(self.file_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                    return jsoncodec.load(f)
             except:
                 return {}
         return {}
 
     def save_addresses(self):
         with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(self.addresses, f, indent=2)
+            jsoncodec.dump(self.addresses, f, indent=True)
+
+    @property
+    def http(self):
+        return self.bot.get_cog("HTTPClient")
 
     # ==================================================================================
     # API PRECIO LTC
@@ -46,10 +48,8 @@ class LTC(commands.Cog):
     async def get_ltc_price(self):
         try:
             url = "https://api.coingecko.com/api/v3/simple/price?ids=litecoin&vs_currencies=usd,eur"
-            async with self.session.get(url, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return data["litecoin"]["usd"], data["litecoin"]["eur"]
+            data = await self.http.request_json("GET", url)
+            return data["litecoin"]["usd"], data["litecoin"]["eur"]
         except:
             pass
         return 75.0, 69.0  # fallback
@@ -60,14 +60,12 @@ class LTC(commands.Cog):
     async def get_ltc_balance(self, address):
         try:
             url = f"https://api.blockcypher.com/v1/ltc/main/addrs/{address}/balance"
-            async with self.session.get(url, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return (
-                        data.get("balance", 0) / 1e8,
-                        data.get("unconfirmed_balance", 0) / 1e8,
-                        data.get("total_received", 0) / 1e8
-                    )
+            data = await self.http.request_json("GET", url)
+            return (
+                data.get("balance", 0) / 1e8,
+                data.get("unconfirmed_balance", 0) / 1e8,
+                data.get("total_received", 0) / 1e8
+            )
         except:
             pass
         return None, None, None
@@ -78,29 +76,27 @@ class LTC(commands.Cog):
     async def get_ltc_transactions(self, address):
         try:
             url = f"https://api.blockcypher.com/v1/ltc/main/addrs/{address}/full"
-            async with self.session.get(url, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    txs = data.get("txs", [])[:5]
-
-                    formatted = []
-                    for tx in txs:
-                        # Valor recibido (positivo) o enviado (negativo)
-                        value = sum(
-                            o.get("value", 0) for o in tx.get("outputs", [])
-                            if o.get("addresses") and address in o["addresses"]
-                        ) / 1e8
-
-                        status = self.emoji_received if value > 0 else self.emoji_sent
-
-                        formatted.append({
-                            "hash": tx["hash"],
-                            "short": tx["hash"][:10] + "...",
-                            "value": value,
-                            "status": status,
-                        })
-
-                    return formatted
+            data = await self.http.request_json("GET", url)
+            txs = data.get("txs", [])[:5]
+
+            formatted = []
+            for tx in txs:
+                # Valor recibido (positivo) o enviado (negativo)
+                value = sum(
+                    o.get("value", 0) for o in tx.get("outputs", [])
+                    if o.get("addresses") and address in o["addresses"]
+                ) / 1e8
+
+                status = self.emoji_received if value > 0 else self.emoji_sent
+
+                formatted.append({
+                    "hash": tx["hash"],
+                    "short": tx["hash"][:10] + "...",
+                    "value": value,
+                    "status": status,
+                })
+
+            return formatted
         except:
             pass
         return []
@@ -237,9 +233,6 @@ class LTC(commands.Cog):
 
         await interaction.followup.send(embed=embed, file=file, view=view)
 
-    async def cog_unload(self):
-        await self.session.close()
-
 
 async def setup(bot):
     await bot.add_cog(LTC(bot))
@@ -0,0 +1,387 @@
+import discord
+from discord.ext import commands
+from aiohttp import web
+from collections import Counter, defaultdict
+from bisect import bisect_left
+from datetime import datetime
+import os
+import sys
+import time
+import random
+import logging
+
+import jsoncodec
+
+logger = logging.getLogger(__name__)
+
+# Servidor de salud/métricas (mismo puerto que usaba el keep-alive de Flask)
+HEALTH_HOST = "0.0.0.0"
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", 10000))
+
+
+MEMBER_SIZE_SAMPLE = 200  # miembros muestreados para estimar bytes por miembro
+
+# Límites superiores (segundos) de los buckets del histograma de latencia; el último bucket es +Inf
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+APP_START_TTL = 900  # segundos antes de descartar interacciones que nunca terminaron
+
+
+def member_footprint(member):
+    """Bytes aproximados de un Member y su User (sin contar objetos compartidos como guild/state)."""
+    seen = set()
+
+    def size(obj):
+        if obj is None or id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        total = sys.getsizeof(obj)
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if slot in ("guild", "_state", "__weakref__"):
+                    continue
+                value = getattr(obj, slot, None)
+                if isinstance(value, (str, bytes, int, float, tuple, list, dict, datetime)):
+                    total += sys.getsizeof(value)
+                elif hasattr(type(value), "__slots__") and not isinstance(value, (discord.Guild, discord.Role)):
+                    total += size(value)
+        return total
+
+    return size(member)
+
+
+class CommandStats:
+    """Histograma de latencia de un comando en buckets fijos, más tiempo HTTP y ejecuciones en curso."""
+    __slots__ = ("buckets", "count", "total", "http_total", "max", "in_flight")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.http_total = 0.0
+        self.max = 0.0
+        self.in_flight = 0
+
+    def observe(self, seconds, http_seconds):
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.http_total += http_seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimación por interpolación lineal dentro del bucket (como histogram_quantile)."""
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            if n and cumulative + n >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                return lower + (min(upper, self.max) - lower) * (rank - cumulative) / n
+            cumulative += n
+        return 0.0
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics(commands.Cog):
+    """Servidor HTTP en el loop del bot: liveness, readiness y métricas Prometheus."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.started_at = time.time()
+        self.command_counts = Counter()   # {(tipo, comando): usos}
+        self.command_errors = Counter()   # {(tipo, comando): errores}
+        self.command_stats = defaultdict(CommandStats)  # {(tipo, comando): CommandStats}
+        self._app_started = {}            # {interaction.id: (CommandStats, inicio, tiempo HTTP)}
+        self._tree_on_error = None
+        self.runner = None
+
+    async def cog_load(self):
+        app = web.Application()
+        app.router.add_get("/", self.handle_root)
+        app.router.add_get("/healthz", self.handle_live)
+        app.router.add_get("/readyz", self.handle_ready)
+        app.router.add_get("/metrics", self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, HEALTH_HOST, HEALTH_PORT).start()
+        logger.info(f"Servidor de salud iniciado en puerto {HEALTH_PORT}")
+
+        self.bot.before_invoke(self.before_command)
+        self.bot.after_invoke(self.after_command)
+        tree = self.bot.tree
+        self._tree_on_error = tree.on_error
+        tree.interaction_check = self.before_app_command
+        tree.on_error = self.app_command_error
+
+    async def cog_unload(self):
+        if self.runner:
+            await self.runner.cleanup()
+        self.bot._before_invoke = None
+        self.bot._after_invoke = None
+        tree = self.bot.tree
+        tree.__dict__.pop("interaction_check", None)
+        tree.on_error = self._tree_on_error
+
+    # ======================
+    # ESTADO
+    # ======================
+    def readiness(self):
+        report = getattr(self.bot, "cog_load_report", None)
+        return {
+            "gateway": self.bot.is_ready() and not self.bot.is_closed(),
+            "cogs": report is not None,
+            "cog_errors": sorted(n for n, r in (report or {}).items() if r["error"] is not None),
+        }
+
+    async def handle_root(self, request):
+        return web.Response(text="Bot is alive")
+
+    async def handle_live(self, request):
+        return web.json_response({"status": "alive", "uptime": round(time.time() - self.started_at, 1)}, dumps=jsoncodec.dumps)
+
+    async def handle_ready(self, request):
+        state = self.readiness()
+        ready = state["gateway"] and state["cogs"]
+        return web.json_response({"status": "ready" if ready else "starting", **state}, status=200 if ready else 503, dumps=jsoncodec.dumps)
+
+    async def handle_metrics(self, request):
+        return web.Response(text=self.render_metrics(), content_type="text/plain", charset="utf-8")
+
+    # ======================
+    # FORMATO PROMETHEUS
+    # ======================
+    def render_metrics(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if labels:
+                    label_str = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_str}}} {value}")
+                else:
+                    lines.append(f"{name} {value}")
+
+        latency = self.bot.latency
+        state = self.readiness()
+        metric("bot_up", "gauge", "1 si el gateway está conectado", [({}, int(state["gateway"]))])
+        metric("bot_uptime_seconds", "gauge", "Segundos desde que arrancó el proceso", [({}, round(time.time() - self.started_at, 3))])
+        metric("discord_ws_latency_seconds", "gauge", "Latencia del websocket del gateway",
+               [({}, latency if latency == latency and latency != float("inf") else -1)])
+        shard_latencies = getattr(self.bot, "shard_latencies", lambda: [(0, latency)])()
+        metric("discord_shard_latency_seconds", "gauge", "Latencia del websocket por shard",
+               [({"shard": sid}, lat if lat == lat and lat != float("inf") else -1) for sid, lat in shard_latencies])
+        metric("discord_shard_events_total", "counter", "Eventos de servidores recibidos por shard",
+               [({"shard": sid}, n) for sid, n in sorted(getattr(self.bot, "shard_event_counts", {}).items())])
+        monitor = self.bot.get_cog("LoopMonitor")
+        if monitor:
+            lag = monitor.stats()
+            metric("event_loop_lag_seconds", "summary", "Retraso del event loop (ventana reciente)",
+                   [({"quantile": "0.5"}, round(lag["p50"], 6)), ({"quantile": "0.99"}, round(lag["p99"], 6))])
+            metric("event_loop_lag_max_seconds", "gauge", "Máximo retraso del event loop en la ventana", [({}, round(lag["max"], 6))])
+            metric("event_loop_slow_callbacks_total", "counter", "Bloqueos del loop por encima del umbral", [({}, monitor.stall_count)])
+        metric("discord_guilds", "gauge", "Servidores conectados", [({}, len(self.bot.guilds))])
+        metric("discord_members", "gauge", "Miembros totales según member_count",
+               [({}, sum(g.member_count or 0 for g in self.bot.guilds))])
+        metric("discord_cached_members", "gauge", "Miembros en caché", [({}, sum(len(g.members) for g in self.bot.guilds))])
+        metric("discord_chunked_guilds", "gauge", "Servidores con la lista de miembros cargada",
+               [({}, sum(1 for g in self.bot.guilds if g.chunked))])
+        metric("bot_commands_total", "counter", "Comandos completados",
+               [({"type": t, "command": c}, n) for (t, c), n in sorted(self.command_counts.items())])
+        metric("bot_command_errors_total", "counter", "Comandos con error",
+               [({"type": t, "command": c}, n) for (t, c), n in sorted(self.command_errors.items())])
+        stats = sorted(self.command_stats.items())
+        lines.append("# HELP bot_command_duration_seconds Duración de los comandos de principio a fin")
+        lines.append("# TYPE bot_command_duration_seconds histogram")
+        for (t, c), st in stats:
+            labels = f'type="{_label(t)}",command="{_label(c)}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), st.buckets):
+                cumulative += n
+                lines.append(f'bot_command_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"bot_command_duration_seconds_sum{{{labels}}} {round(st.total, 6)}")
+            lines.append(f"bot_command_duration_seconds_count{{{labels}}} {st.count}")
+        metric("bot_command_http_seconds_total", "counter", "Tiempo acumulado de los comandos esperando HTTP saliente",
+               [({"type": t, "command": c}, round(st.http_total, 6)) for (t, c), st in stats])
+        metric("bot_commands_in_flight", "gauge", "Comandos ejecutándose ahora",
+               [({"type": t, "command": c}, st.in_flight) for (t, c), st in stats])
+        metric("discord_events_total", "counter", "Eventos del gateway despachados",
+               [({"event": e}, n) for e, n in sorted(getattr(self.bot, "event_counts", {}).items())])
+        metric("bot_listener_calls_total", "counter", "Llamadas a listeners de cogs",
+               [({"listener": l}, n) for l, n in sorted(getattr(self.bot, "listener_counts", {}).items())])
+        http = self.bot.get_cog("HTTPClient")
+        if http:
+            hosts = sorted(http.hosts.items())
+            metric("http_client_responses_total", "counter", "Respuestas HTTP salientes por host y clase de estado",
+                   [({"host": h, "code": k}, v) for h, p in hosts for k, v in sorted(p.stats.items()) if k.endswith("xx")])
+            metric("http_client_errors_total", "counter", "Errores de conexión/timeout y circuitos abiertos por host",
+                   [({"host": h, "kind": k}, v) for h, p in hosts for k, v in sorted(p.stats.items()) if not k.endswith("xx")])
+            metric("http_client_latency_seconds_total", "counter", "Tiempo acumulado en respuestas por host",
+                   [({"host": h}, round(p.latency_total, 6)) for h, p in hosts])
+            metric("http_client_circuit_open", "gauge", "1 si el circuito del host está abierto",
+                   [({"host": h}, int(p.breaker.state == "open")) for h, p in hosts])
+        database = self.bot.get_cog("Database")
+        if database:
+            pool = database.pool
+            metric("mongo_pool_connections", "gauge", "Conexiones abiertas del pool de MongoDB", [({}, pool.open)])
+            metric("mongo_pool_checked_out", "gauge", "Conexiones de MongoDB en uso", [({}, pool.checked_out)])
+            metric("mongo_pool_checkouts_total", "counter", "Conexiones obtenidas del pool", [({}, pool.checkouts)])
+            metric("mongo_pool_checkout_failures_total", "counter", "Fallos al obtener una conexión por motivo",
+                   [({"reason": r}, n) for r, n in sorted(pool.checkout_failures.items())])
+            metric("mongo_pool_wait_seconds_total", "counter", "Tiempo acumulado esperando una conexión libre",
+                   [({}, round(pool.wait_total, 6))])
+            metric("mongo_pool_wait_max_seconds", "gauge", "Mayor espera por una conexión", [({}, round(pool.wait_max, 6))])
+            metric("mongo_counter_pending", "gauge", "Incrementos de contadores sin escribir", [({}, database.counters.pending_ops)])
+            metric("mongo_counter_writes_total", "counter", "Documentos de contadores escritos con bulk_write",
+                   [({}, database.counters.written)])
+            cache = database.user_cache
+            metric("mongo_user_cache_requests_total", "counter", "Lecturas de get_user_data por resultado",
+                   [({"result": "hit"}, cache.hits), ({"result": "miss"}, cache.misses), ({"result": "coalesced"}, cache.coalesced)])
+        bus = self.bot.get_cog("EventBus")
+        if bus:
+            stats = sorted(bus.stats.items())
+            metric("eventbus_subscriber_calls_total", "counter", "Llamadas a suscriptores del event bus",
+                   [({"subscriber": n}, st["calls"]) for n, st in stats])
+            metric("eventbus_subscriber_seconds_total", "counter", "Tiempo acumulado en suscriptores del event bus",
+                   [({"subscriber": n}, round(st["total"], 6)) for n, st in stats])
+            metric("eventbus_subscriber_errors_total", "counter", "Errores en suscriptores del event bus",
+                   [({"subscriber": n}, st["errors"]) for n, st in stats])
+        return "\n".join(lines) + "\n"
+
+    # ======================
+    # MEMORIA DE MIEMBROS
+    # ======================
+    def member_cache_report(self):
+        members = [m for g in self.bot.guilds for m in g.members]
+        sample = random.sample(members, min(MEMBER_SIZE_SAMPLE, len(members)))
+        per_member = sum(member_footprint(m) for m in sample) / len(sample) if sample else 0
+        return {
+            "members": len(members),
+            "bytes_per_member": per_member,
+            "total_bytes": per_member * len(members),
+            "chunked": sum(1 for g in self.bot.guilds if g.chunked),
+            "guilds": len(self.bot.guilds),
+        }
+
+    @commands.command(name="membercache")
+    @commands.is_owner()
+    async def membercache(self, ctx):
+        r = self.member_cache_report()
+        flags = self.bot._connection.member_cache_flags
+        embed = discord.Embed(
+            title="🧠 Caché de miembros",
+            description=(
+                f"**Miembros en caché:** {r['members']:,}\n"
+                f"**Bytes por miembro (aprox.):** {r['bytes_per_member']:,.0f}\n"
+                f"**Total estimado:** {r['total_bytes'] / 1024 / 1024:,.2f} MiB\n"
+                f"**Servidores cargados:** {r['chunked']}/{r['guilds']}\n"
+                f"**Flags:** {', '.join(name for name, enabled in flags if enabled) or 'ninguna'}"
+            ),
+            color=discord.Color.blurple()
+        )
+        top = sorted(self.bot.guilds, key=lambda g: len(g.members), reverse=True)[:10]
+        if top:
+            embed.add_field(
+                name="Servidores con más miembros en caché",
+                value="\n".join(f"{g.name}: {len(g.members):,}/{g.member_count or 0:,}{' ✅' if g.chunked else ''}" for g in top),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    # ======================
+    # LATENCIA DE COMANDOS
+    # ======================
+    def start_http_timer(self):
+        http = self.bot.get_cog("HTTPClient")
+        if http is None:
+            return [0.0]
+        spent = [0.0]
+        http.command_http_time.set(spent)
+        return spent
+
+    async def before_command(self, ctx):
+        stats = self.command_stats[("prefix", ctx.command.qualified_name)]
+        stats.in_flight += 1
+        ctx.metrics_start = (stats, time.perf_counter(), self.start_http_timer())
+
+    async def after_command(self, ctx):
+        # after_invoke también corre si el comando lanzó una excepción
+        started = getattr(ctx, "metrics_start", None)
+        if started is None:
+            return
+        stats, start, spent = started
+        stats.in_flight -= 1
+        stats.observe(time.perf_counter() - start, spent[0])
+
+    async def before_app_command(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+        now = time.perf_counter()
+        if len(self._app_started) > 1000:
+            for key in [k for k, v in self._app_started.items() if now - v[1] > APP_START_TTL]:
+                self._app_started[key][0].in_flight -= 1
+                del self._app_started[key]
+        name = interaction.command.qualified_name if interaction.command else "desconocido"
+        stats = self.command_stats[("slash", name)]
+        stats.in_flight += 1
+        self._app_started[interaction.id] = (stats, now, self.start_http_timer())
+        return True
+
+    def finish_app_command(self, interaction):
+        started = self._app_started.pop(interaction.id, None)
+        if started is None:
+            return
+        stats, start, spent = started
+        stats.in_flight -= 1
+        stats.observe(time.perf_counter() - start, spent[0])
+
+    async def app_command_error(self, interaction: discord.Interaction, error):
+        self.finish_app_command(interaction)
+        name = interaction.command.qualified_name if interaction.command else "desconocido"
+        self.command_errors[("slash", name)] += 1
+        await self._tree_on_error(interaction, error)
+
+    @commands.command(name="cmdstats")
+    @commands.is_owner()
+    async def cmdstats(self, ctx, top: int = 15):
+        ranked = sorted(self.command_stats.items(), key=lambda kv: kv[1].quantile(0.99), reverse=True)[:top]
+        lines = []
+        for (t, c), st in ranked:
+            http_share = st.http_total / st.total * 100 if st.total else 0
+            prefix = "/" if t == "slash" else ","
+            lines.append(
+                f"`{prefix}{c}` — {st.count} usos • p50 {st.quantile(0.5) * 1000:.0f} / "
+                f"p95 {st.quantile(0.95) * 1000:.0f} / p99 {st.quantile(0.99) * 1000:.0f} ms • "
+                f"HTTP {http_share:.0f}% • errores {self.command_errors[(t, c)]} • en curso {st.in_flight}"
+            )
+        embed = discord.Embed(
+            title="⏱️ Latencia de comandos",
+            description="\n".join(lines) or "Sin datos todavía.",
+            color=discord.Color.blurple()
+        )
+        await ctx.send(embed=embed)
+
+    # ======================
+    # CONTADORES DE COMANDOS
+    # ======================
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx):
+        self.command_counts[("prefix", ctx.command.qualified_name)] += 1
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        name = ctx.command.qualified_name if ctx.command else "desconocido"
+        self.command_errors[("prefix", name)] += 1
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self.command_counts[("slash", command.qualified_name)] += 1
+        self.finish_app_command(interaction)
+
+
+async def setup(bot):
+    await bot.add_cog(Metrics(bot))
@@ -6,13 +6,8 @@ import asyncio
 import re
 from typing import Optional
 
-# ============================================================
-# ⚙️ Configuración
-# ============================================================
-MUTE_ROLE_ID = 1418314510049083556  # ID del rol de mute
-LIMIT_ROLE_ID = 1415860204624416971  # ID del rol límite para permisos
-LOG_CHANNEL_ID = 1418314310739955742  # ID del canal de logs
-OWNER_IDS = {335596693603090434, 523662219020337153}  # IDs con permisos absolutos
+from config import OWNER_IDS  # IDs con permisos absolutos
+from cogs.guildconfig import DEFAULTS  # rol de mute, rol límite y canal de logs: por servidor
 
 # ============================================================
 # 🛡️ Moderation Cog
@@ -25,6 +20,10 @@ class Moderation(commands.Cog):
         self.bot = bot
         self.warnings = {}  # Dict[user_id_str]: list of {reason, moderator, timestamp}
 
+    def settings(self, guild):
+        guild_config = self.bot.get_cog("GuildConfig")
+        return guild_config.get(guild) if guild_config else DEFAULTS
+
     # ============================================================
     # 🔍 Helpers de Permisos y Jerarquía
     # ============================================================
@@ -37,12 +36,12 @@ class Moderation(commands.Cog):
             return False
 
     def has_permission(self, ctx: commands.Context) -> bool:
-        """Check if the author has permission based on LIMIT_ROLE_ID or ownership."""
+        """Check if the author has permission based on the limit role or ownership."""
         author = ctx.author
         if author.id in OWNER_IDS or (ctx.guild and author == ctx.guild.owner):
             return True
 
-        limit_role = ctx.guild.get_role(LIMIT_ROLE_ID) if ctx.guild else None
+        limit_role = ctx.guild.get_role(self.settings(ctx.guild).limit_role_id) if ctx.guild else None
         if not limit_role:
             return True
 
@@ -78,7 +77,7 @@ class Moderation(commands.Cog):
     # ============================================================
     async def log_action(self, ctx: commands.Context, title: str, color: discord.Colour, target: Optional[discord.abc.Snowflake] = None, extra: str = ""):
         """Send a log embed to the configured log channel."""
-        channel = self.bot.get_channel(LOG_CHANNEL_ID)
+        channel = ctx.guild.get_channel(self.settings(ctx.guild).mod_log_channel_id) if ctx.guild else None
         if not channel:
             return
 
@@ -127,6 +126,13 @@ class Moderation(commands.Cog):
             member = ctx.guild.get_member(int(id_match.group(1)))
             if member:
                 return member
+            try:
+                return await ctx.guild.fetch_member(int(id_match.group(1)))
+            except discord.HTTPException:
+                pass
+
+        # Name lookups need the member list
+        await self.bot.ensure_chunked(ctx.guild)
 
         # Try name#discriminator
         if '#' in identifier:
@@ -220,7 +226,7 @@ class Moderation(commands.Cog):
         await self.log_action(ctx, "⚠️ Advertencia", discord.Color.yellow(), target=member, extra=f"Razón: {reason}")
 
         if len(self.warnings[uid]) >= 3:
-            mute_role = ctx.guild.get_role(MUTE_ROLE_ID)
+            mute_role = ctx.guild.get_role(self.settings(ctx.guild).mute_role_id)
             if mute_role:
                 ok2, err2 = self.check_hierarchy(ctx, member)
                 if ok2:
@@ -323,7 +329,7 @@ class Moderation(commands.Cog):
         if not ok:
             return await ctx.send(err)
 
-        mute_role = ctx.guild.get_role(MUTE_ROLE_ID)
+        mute_role = ctx.guild.get_role(self.settings(ctx.guild).mute_role_id)
         if not mute_role:
             return await ctx.send("❌ Rol de mute no configurado o no encontrado.")
 
@@ -379,7 +385,7 @@ class Moderation(commands.Cog):
         if not ok:
             return await ctx.send(err)
 
-        mute_role = ctx.guild.get_role(MUTE_ROLE_ID)
+        mute_role = ctx.guild.get_role(self.settings(ctx.guild).mute_role_id)
         if not mute_role:
             return await ctx.send("❌ Rol de mute no configurado.")
 
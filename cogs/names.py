@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 
+from cogs.eventbus import EventBus
+
 # Configura el prefijo directamente aquí o en tu bot principal
 # Si usas bot = commands.Bot(command_prefix=',') en tu main.py, no necesitas nada más.
 
@@ -9,8 +11,14 @@ class Names(commands.Cog):
         self.bot = bot
         self.fixed_names = {}  # {user_id: "forced_nick"}
 
-    @commands.Cog.listener()
-    async def on_member_update(self, before, after):
+    async def cog_load(self):
+        EventBus.attach(self, {"member.nick": self.on_nick_change})
+
+    async def cog_unload(self):
+        EventBus.detach(self)
+
+    async def on_nick_change(self, record):
+        after = record.after
         if after.id in self.fixed_names and after.nick != self.fixed_names[after.id]:
             try:
                 await after.edit(nick=self.fixed_names[after.id], reason="Restoring forced nickname")
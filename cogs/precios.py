@@ -1,192 +1,498 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
+from array import array
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
 import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import unicodedata
+
+import jsoncodec
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+#              BÚSQUEDA DE ÍTEMS
+# ============================================
+PREFIX_TOP = 10        # candidatos guardados por prefijo
+TRIGRAM_CANDIDATES = 20  # nombres que pasan del filtro de trigramas al ranking por distancia
+MAX_EDITS = 2          # erratas toleradas (1 cada 3 letras, como mucho 2)
+COMMON_GRAM_SHARE = 0.02  # trigramas en más de este % de nombres no se cuentan (salvo que no quede otro)
+AUTO_MIN_SCORE = 0.75  # similitud mínima para aceptar una corrección sin preguntar
+AUTO_MARGIN = 0.15     # ventaja mínima sobre el segundo ítem distinto
+SUGGEST_MIN_SCORE = 0.3  # por debajo no se ofrece ni como sugerencia
+
+
+def normalize(text):
+    """minúsculas, sin acentos, "&" / " y " → "and", solo letras y números: "Ketchuru & Musturú" → "ketchuruandmusturu"."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"\s*&\s*|\s+y\s+", "and", text)
+    return re.sub(r"[^a-z0-9]", "", text)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a, b, limit):
+    """Levenshtein entre a y b, o limit + 1 si se pasa (solo la banda diagonal, con corte temprano)."""
+    la, lb = len(a), len(b)
+    if abs(la - lb) > limit:
+        return limit + 1
+    over = limit + 1
+    previous = list(range(lb + 1))
+    for i in range(1, la + 1):
+        ca = a[i - 1]
+        current = [over] * (lb + 1)
+        current[0] = i
+        row_min = i
+        for j in range(max(1, i - limit), min(lb, i + limit) + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[lb], over)
+
+
+class ItemIndex:
+    """
+    Índice de nombres y alias de la calculadora, construido una vez por catálogo.
+    - `exact`: nombre normalizado → clave del ítem.
+    - `prefixes`: el trie de prefijos aplanado en un dict (prefijo → hasta PREFIX_TOP claves ya ordenadas),
+      así completar un prefijo es un solo acceso O(len(prefijo)).
+    - `grams`: trigrama → nombres, para encontrar candidatos con erratas y ordenarlos por distancia de edición.
+    """
+
+    def __init__(self, names):
+        # names: {nombre visible o alias: clave}
+        self.exact = {}
+        for name, key in names.items():
+            self.exact.setdefault(normalize(name), key)
+        self.names = list(self.exact)
+
+        ranked = defaultdict(list)
+        for name, key in self.exact.items():
+            for end in range(1, len(name) + 1):
+                ranked[name[:end]].append((len(name), name, key))
+        self.prefixes = {}
+        for prefix, entries in ranked.items():
+            keys = []
+            for _, _, key in sorted(entries):
+                if key not in keys:
+                    keys.append(key)
+                    if len(keys) == PREFIX_TOP:
+                        break
+            self.prefixes[prefix] = tuple(keys)
+
+        self.grams = defaultdict(list)
+        self.gram_counts = []
+        for i, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.grams[gram].append(i)
+
+    def complete(self, text):
+        """Claves cuyo nombre o alias empieza por `text` (las más cortas primero)."""
+        return self.prefixes.get(normalize(text), ())
+
+    def rank(self, text, limit=5):
+        """[(clave, similitud 0..1)] ordenado; sin claves repetidas."""
+        query = normalize(text)
+        if not query:
+            return []
+        if query in self.exact:
+            return [(self.exact[query], 1.0)]
+
+        scores = {}
+        for key in self.prefixes.get(query, ()):
+            scores[key] = 0.95  # prefijo exacto: "spaghetti" → spaghettitualetti
+
+        query_grams = trigrams(query)
+        postings = sorted((self.grams[gram] for gram in query_grams if gram in self.grams), key=len)
+        common_limit = max(50, int(len(self.names) * COMMON_GRAM_SHARE))
+        # los trigramas muy repetidos ("los", "la ") cuestan mucho y apenas distinguen nada
+        postings = [p for p in postings if len(p) <= common_limit] or postings[:3]
+        shared = Counter()
+        for posting in postings:
+            shared.update(posting)
+        max_edits = max(1, min(MAX_EDITS, len(query) // 3))
+        # cada edición rompe como mucho 3 trigramas: con menos en común la distancia no puede salir
+        min_common = len(postings) - 3 * max_edits - 1
+        for i, common in shared.most_common(TRIGRAM_CANDIDATES):
+            name = self.names[i]
+            full = head = max_edits + 1
+            if common >= min_common:
+                # contra el nombre entero y, si no se parece, contra su principio ("dragn" ~ "drago"ncannelloni)
+                full = bounded_distance(query, name, max_edits)
+                if full > max_edits:
+                    head = bounded_distance(query, name[:len(query)], max_edits)
+            score = max(
+                1 - full / max(len(query), len(name)) if full <= max_edits else 0,
+                0.9 * (1 - head / len(query)) if head <= max_edits else 0,
+                # en medio del nombre ("combinasion"): buena sugerencia, rara vez corrección automática
+                0.6 + 0.3 * len(query) / len(name) if query in name else 0,
+                # solo trigramas en común (Dice): sirve para ordenar sugerencias, nunca llega a AUTO_MIN_SCORE
+                0.6 * 2 * common / (len(query_grams) + self.gram_counts[i]),
+            )
+            key = self.exact[name]
+            if score >= SUGGEST_MIN_SCORE and score > scores.get(key, 0):
+                scores[key] = score
+        return sorted(scores.items(), key=lambda item: -item[1])[:limit]
+
+    def resolve(self, text, limit=5):
+        """
+        (clave, sugerencias): la clave si el nombre existe o la corrección no es ambigua
+        (por encima de AUTO_MIN_SCORE y con AUTO_MARGIN sobre la siguiente); si no, None y las mejores sugerencias.
+        """
+        ranked = self.rank(text, limit)
+        if not ranked:
+            return None, []
+        best_key, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0
+        if best == 1.0 or (best >= AUTO_MIN_SCORE and best - runner_up >= AUTO_MARGIN):
+            return best_key, ranked
+        return None, ranked
+
+
+# ============================================
+#                  CATÁLOGO
+# ============================================
+CATALOG_PATH = os.getenv("PRICE_CATALOG", "precios.json")
+CATALOG_POLL_INTERVAL = 1.0  # segundos entre comprobaciones del archivo
+CATALOG_HISTORY = 20         # versiones que se guardan para ,catalogo
+PAGE_SIZE = 9                # ítems por página de ,helpprices
+
+BATCH_MAX_ITEMS = 1000       # líneas por ,valuar
+BATCH_MAX_BYTES = 256 * 1024  # tamaño máximo del archivo adjunto
+BATCH_TABLE_ROWS = 25        # filas en el embed; la tabla completa va adjunta
+AUTOCOMPLETE_LIMIT = 25      # máximo de opciones que acepta Discord
+AUTOCOMPLETE_CACHE_SIZE = 5000  # prefijos cacheados por versión del catálogo
+NUMBER_RE = re.compile(r"^(\d+(?:\.\d+)?)m?$", re.IGNORECASE)
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def parse_catalog(raw):
+    """Valida el JSON del catálogo; devuelve (versión, formulas, aliases) con el formato de siempre."""
+    if not isinstance(raw, dict) or not isinstance(raw.get("items"), dict):
+        raise CatalogError('falta el objeto "items"')
+    errors = []
+    formulas, aliases = {}, {}
+    for key, item in raw["items"].items():
+        if key != normalize(key):
+            errors.append(f"{key}: la clave debe ir normalizada ({normalize(key)})")
+            continue
+        if not isinstance(item, dict):
+            errors.append(f"{key}: debe ser un objeto")
+            continue
+        name = item.get("name")
+        numbers = [item.get(field) for field in ("base", "mult", "add")]
+        if not isinstance(name, str) or not name.strip():
+            errors.append(f"{key}: falta name")
+        if not all(isinstance(n, (int, float)) and not isinstance(n, bool) for n in numbers):
+            errors.append(f"{key}: base, mult y add tienen que ser números")
+            continue
+        base, mult, add = numbers
+        formulas[key] = (base, mult, add, f"(M − {base:g}) × {mult:g} + {add:g}", name)
+        for alias in item.get("aliases", []):
+            if not isinstance(alias, str) or not alias.strip():
+                errors.append(f"{key}: alias vacío o no es texto")
+                continue
+            alias = alias.lower()
+            if aliases.get(alias, key) != key:
+                errors.append(f"alias {alias} repetido en {aliases[alias]} y {key}")
+            aliases[alias] = key
+    for alias, key in aliases.items():
+        if alias in formulas and alias != key:
+            errors.append(f"alias {alias} de {key} es la clave de otro ítem")
+    if not formulas and not errors:
+        errors.append("el catálogo no tiene ítems")
+    if errors:
+        raise CatalogError("; ".join(errors[:10]) + (f" (y {len(errors) - 10} más)" if len(errors) > 10 else ""))
+    return str(raw.get("version", "")), formulas, aliases
+
+
+class Catalog:
+    """
+    Una versión compilada del catálogo: fórmulas, alias, índice de búsqueda y páginas de ,helpprices.
+    No se modifica nunca; al recargar se construye otra y se sustituye entera.
+    """
+
+    def __init__(self, formulas, aliases, version="", digest="", number=1):
+        self.formulas = formulas
+        self.aliases = aliases
+        self.version = version
+        self.digest = digest
+        self.number = number
+        self.loaded_at = datetime.now(timezone.utc)
+        self.aliases_by_key = defaultdict(list)
+        for alias, key in aliases.items():
+            self.aliases_by_key[key].append(alias)
+        self.index = self.build_index()
+        self.pages = self.build_price_pages()
+        # columnas (base, mult, add) para valorar muchos ítems en una pasada
+        self.rows = {key: i for i, key in enumerate(formulas)}
+        self.bases = array("d", (f[0] for f in formulas.values()))
+        self.mults = array("d", (f[1] for f in formulas.values()))
+        self.adds = array("d", (f[2] for f in formulas.values()))
+        self.sorted_keys = sorted(formulas, key=lambda key: formulas[key][4].lower())
+        self.choice_cache = {}  # {prefijo normalizado: [Choice]}; muere con esta versión del catálogo
+
+    @property
+    def label(self):
+        name = f"v{self.version}" if self.version else f"#{self.number}"
+        return f"{name} ({self.digest[:7]})" if self.digest else name
+
+    def value_many(self, keys, ms):
+        """Precio de cada (ítem, M), con el mismo max(0, ...) que ,precio."""
+        bases, mults, adds, rows = self.bases, self.mults, self.adds, self.rows
+        return [max(0, (m - bases[r]) * mults[r] + adds[r]) for r, m in zip((rows[k] for k in keys), ms)]
+
+    def choices(self, text):
+        """
+        Opciones del autocompletado de /precio para lo escrito hasta ahora. Un prefijo conocido es un acceso
+        al dict de prefijos del índice; solo si no hay ninguno se ordena por similitud. Se cachea por prefijo.
+        """
+        query = normalize(text)
+        cached = self.choice_cache.get(query)
+        if cached is not None:
+            return cached
+        if not query:
+            keys = self.sorted_keys[:AUTOCOMPLETE_LIMIT]
+        else:
+            keys = self.index.prefixes.get(query) or [key for key, _ in self.index.rank(query, AUTOCOMPLETE_LIMIT)]
+        choices = [
+            app_commands.Choice(name=f"{self.formulas[key][4]} — {self.formulas[key][3]}"[:100], value=key)
+            for key in keys
+        ]
+        if len(self.choice_cache) >= AUTOCOMPLETE_CACHE_SIZE:
+            self.choice_cache.clear()
+        self.choice_cache[query] = choices
+        return choices
+
+    def build_index(self):
+        names = {key: key for key in self.formulas}
+        names.update({pretty: key for key, (*_, pretty) in self.formulas.items()})
+        names.update(self.aliases)
+        return ItemIndex(names)
+
+    def build_price_pages(self):
+        formulas_items = sorted(self.formulas.items(), key=lambda x: x[1][4])
+        pages = [formulas_items[i:i + PAGE_SIZE] for i in range(0, len(formulas_items), PAGE_SIZE)]
+        embeds = []
 
-class Precios(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-
-        # ============================================
-        #                   FORMULAS
-        # ============================================
-        self.formulas = {
-            "esoksekolah": (30, 0.01, 1, "(M − 30) × 0.01 + 1", "Esok sekolah"),
-            "loscombinasionas": (15, 0.01, 1.5, "(M − 15) × 0.01 + 1.5", "Los combinasionas"),
-            "lagrandecombinasion": (10, 0.02, 1.5, "(M − 10) × 0.02 + 1.5", "La grande combinasion"),
-            "loshotspositos": (20, 0.02, 2, "(M − 20) × 0.02 + 2", "Los hotspositos"),
-            "losbros": (24, 0.02, 3, "(M − 24) × 0.02 + 3", "Los bros"),
-            "ketupatkepat": (35, 0.02, 8, "(M − 35) × 0.02 + 8", "Ketupat kepat"),
-            "nuclearodinossauro": (15, 0.03, 7, "(M − 15) × 0.03 + 7", "Nuclearo dinossauro"),
-            "tralaledon": (27.5, 0.02, 7, "(M − 27.5) × 0.02 + 7", "Tralaledon"),
-            "ketchuruandmusturu": (42.5, 0.03, 12, "(M − 42.5) × 0.03 + 12", "Ketchuru and musturu"),
-            "lasupremecombinasion": (40, 0.11, 25, "(M − 40) × 0.11 + 25", "La supreme combinasion"),
-
-            "lassis": (17.5, 0.02, 1.5, "(M − 17.5) × 0.02 + 1.5", "Las sis"),
-            "tacoritabicicleta": (16.5, 0.02, 2, "(M − 16.5) × 0.02 + 2", "Tacorita bicicleta"),
-            "laextinctgrande": (23.5, 0.02, 3, "(M − 23.5) × 0.02 + 3", "La extinct grande"),
-            "lostacoritas": (32, 0.03, 3, "(M − 32) × 0.03 + 3", "Los tacoritas"),
-            "celularciniviciosini": (22.5, 0.02, 3, "(M − 22.5) × 0.02 + 3", "Celularcini viciosini"),
-            "losprimos": (31, 0.02, 3.5, "(M − 31) × 0.02 + 3.5", "Los primos"),
-            "spaghettitualetti": (60, 0.02, 5, "(M − 60) × 0.02 + 5", "Spaghetti tualetti"),
-            "tictacsahur": (37.5, 0.04, 7, "(M − 37.5) × 0.04 + 7", "Tictac sahur"),
-            "garamaandmadundung": (50, 0.05, 20, "(M − 50) × 0.05 + 20", "Garama and madundung"),
-            "dragoncannelloni": (200, 0.08, 90, "(M − 200) × 0.08 + 90", "Dragon cannelloni"),
-
-            "chillinchili": (25, 0.02, 3, "(M − 25) × 0.02 + 3", "Chillin chili"),
-            "eviledon": (31.5, 0.02, 4.5, "(M − 31.5) × 0.02 + 4.5", "Eviledon"),
-            "tangtangkelentang": (33.5, 0.04, 5, "(M − 33.5) × 0.04 + 5", "Tang tang kelentang"),
-            "moneymoneypuggy": (21, 0.03, 5, "(M − 21) × 0.03 + 5", "Money money puggy"),
-            "lassecretcombinasion": (125, 0.05, 10, "(M − 125) × 0.05 + 10", "La secret combinasion"),
-            "burguroandfryuro": (150, 0.05, 30, "(M − 150) × 0.05 + 30", "Burguro and fryuro"),
-            "strawberryelephant": (350, 0.30, 700, "(M − 350) × 0.30 + 700", "Strawberry elephant"),
-
-            "laspookygrande": (24.5, 0.02, 2.5, "(M − 24.5) × 0.02 + 2.5", "La spooky grande"),
-            "losspookycombinasionas": (20, 0.02, 2, "(M − 20) × 0.02 + 2", "Los spooky combinasionas"),
-            "mieteteirabicicleteira": (26, 0.02, 3, "(M − 26) × 0.02 + 3", "Mieteteira bicicleteira"),
-            "chipsoandqueso": (25, 0.02, 4, "(M − 25) × 0.02 + 4", "Chipso and queso"),
-            "latacocombinasion": (35, 0.03, 4, "(M − 35) × 0.03 + 4", "La taco combinasion"),
-            "lacasa": (100, 0.05, 12, "(M − 100) × 0.05 + 12", "La casa boo"),
-            "spookyandpumpky": (80, 0.05, 22, "(M − 80) × 0.05 + 22", "Spooky and pumpky"),
-            "headless": (175, 0.08, 30, "(M − 175) × 0.08 + 30", "Headless horseman"),
-            "meowl": (275, 0.30, 500, "(M − 275) × 0.30 + 500", "Meowl"),
-        }
-
-        # ============================================
-        #                ALIASES MEGAPACK
-        # ============================================
-        self.aliases = {
-            # Esok sekolah
-            "es": "esoksekolah", "sek": "esoksekolah", "sekolah": "esoksekolah",
-            "esok": "esoksekolah", "esoksk": "esoksekolah", "skl": "esoksekolah",
-
-            # Los combinasionas
-            "lc": "loscombinasionas", "comb": "loscombinasionas",
-            "combi": "loscombinasionas", "combina": "loscombinasionas",
-            "lcmb": "loscombinasionas",
-
-            # Grande combinasion
-            "lgc": "lagrandecombinasion", "lg": "lagrandecombinasion",
-            "bigcomb": "lagrandecombinasion",
-
-            # Hotspósitos
-            "lhp": "loshotspositos", "hots": "loshotspositos", "positos": "loshotspositos",
-            "hotsp": "loshotspositos",
-
-            # Bros
-            "lb": "losbros", "bros": "losbros", "br": "losbros", "bro": "losbros",
-
-            # Ketupat kepat
-            "kk": "ketupatkepat", "ket": "ketupatkepat", "kep": "ketupatkepat",
-            "ketupat": "ketupatkepat", "kepat": "ketupatkepat",
-
-            # Nuclearo dinossauro
-            "nd": "nuclearodinossauro", "nuke": "nuclearodinossauro",
-            "dino": "nuclearodinossauro", "dn": "nuclearodinossauro",
-
-            # Tralaledon
-            "tr": "tralaledon", "tral": "tralaledon", "lale": "tralaledon",
-
-            # Ketchuru & musturu
-            "km": "ketchuruandmusturu", "musturu": "ketchuruandmusturu",
-            "ketchuru": "ketchuruandmusturu",
-
-            # Las sis
-            "ls": "lassis", "sis": "lassis",
-
-            # Tacorita bicicleta
-            "tb": "tacoritabicicleta", "taco": "tacoritabicicleta",
-            "bici": "tacoritabicicleta",
-
-            # Extinct grande
-            "leg": "laextinctgrande", "ext": "laextinctgrande",
-
-            # Tacoritas
-            "lt": "lostacoritas", "tacoritas": "lostacoritas",
-
-            # Celularcini viciosini
-            "ccv": "celularciniviciosini", "celular": "celularciniviciosini",
-            "vicio": "celularciniviciosini",
-
-            # Primos
-            "lp": "losprimos", "prim": "losprimos",
-
-            # Spaghetti tualetti
-            "st": "spaghettitualetti",
-
-            # Tictac sahur
-            "ts": "tictacsahur",
-
-            # Garama & madundung
-            "gm": "garamaandmadundung",
-
-            # Dragon cannelloni
-            "dc": "dragoncannelloni", "dragon": "dragoncannelloni",
-
-            # Chillin chili
-            "cc": "chillinchili", "chili": "chillinchili",
-
-            # Eviledon
-            "ev": "eviledon",
+        for i, page in enumerate(pages, start=1):
+            embed = discord.Embed(
+                title="📘 Lista de Precios Brainrots",
+                description="Usa: `,precio <alias> <millones>`\nEj: `,precio meowl 300`",
+                color=discord.Color.orange()
+            )
 
-            # Tang tang kelentang
-            "ttk": "tangtangkelentang",
+            for key, (_, _, _, _, pretty) in page:
+                aliases = self.aliases_by_key.get(key, [])
 
-            # Money money puggy
-            "mmp": "moneymoneypuggy", "puggy": "moneymoneypuggy",
+                alias_str = ", ".join([f"`{key}`"] + [f"`{a}`" for a in aliases][:4])
+                if len(aliases) > 4:
+                    alias_str += " …"
 
-            # Secret combinasion
-            "lsec": "lassecretcombinasion",
+                ejemplo = aliases[0] if aliases else key
 
-            # Burguro & fryuro
-            "bf": "burguroandfryuro",
+                embed.add_field(
+                    name=f"⭐ {pretty}",
+                    value=f"**Alias:** {alias_str}\n**Ejemplo:** `,precio {ejemplo} 100`",
+                    inline=False
+                )
 
-            # Strawberry elephant
-            "se": "strawberryelephant",
+            embed.set_footer(text=f"Página {i}/{len(pages)} • Total: {len(self.formulas)} ítems • Catálogo {self.label}")
+            embeds.append(embed)
+        return embeds
+
+
+def parse_batch(text):
+    """
+    Líneas "ítem M" (o "ítem,M" de un CSV; varias por línea separadas con ";").
+    Devuelve ([(línea, nombre, M)], [errores]).
+    """
+    entries, errors = [], []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        for chunk_no, chunk in enumerate(line.split(";")):
+            chunk = chunk.strip()
+            if not chunk or chunk.startswith("#"):
+                continue
+            fields = [f.strip() for f in re.split(r"[,\t]", chunk)] if ("," in chunk or "\t" in chunk) else chunk.split()
+            fields = [f for f in fields if f]
+            match = NUMBER_RE.match(fields[-1]) if len(fields) > 1 else None
+            if match is None:
+                # solo el primer trozo de la primera línea puede ser la cabecera de un CSV ("item,millones")
+                header = line_no == 1 and chunk_no == 0 and len(fields) > 1 and not any(NUMBER_RE.match(f) for f in fields)
+                if not header:
+                    errors.append(f"línea {line_no}: `{chunk[:40]}` (formato: ítem M)")
+                continue
+            entries.append((line_no, " ".join(fields[:-1]), float(match.group(1))))
+    return entries, errors
+
+
+def load_catalog(path=CATALOG_PATH, number=1):
+    with open(path, "rb") as f:
+        data = f.read()
+    version, formulas, aliases = parse_catalog(jsoncodec.loads(data))
+    return Catalog(formulas, aliases, version, hashlib.sha1(data).hexdigest(), number)
+
+
+class PricePagesView(discord.ui.View):
+    """Páginas de ,helpprices; los embeds vienen ya construidos del catálogo."""
+
+    def __init__(self, author, pages):
+        super().__init__(timeout=60)
+        self.author = author
+        self.pages = pages  # se guarda la lista del momento: un cambio de catálogo no mueve las páginas abiertas
+        self.page = 0
+        self.message = None
+        self.update_buttons()
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user != self.author:
+            await interaction.response.send_message("Solo quien pidió la lista puede pasar de página.", ephemeral=True)
+            return False
+        return True
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page == len(self.pages) - 1
+
+    async def show(self, interaction):
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+
+    @discord.ui.button(emoji="⬅️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await self.show(interaction)
+
+    @discord.ui.button(emoji="➡️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(len(self.pages) - 1, self.page + 1)
+        await self.show(interaction)
+
+    async def on_timeout(self):
+        if self.message is None:
+            return
+        try:
+            await self.message.edit(view=None)
+        except discord.HTTPException:
+            pass
 
-            # Spooky grande
-            "lsg": "laspookygrande",
 
-            # Spooky combinasionas
-            "lsc": "losspookycombinasionas",
+class Precios(commands.Cog):
+    """
+    Calculadora de precios. El catálogo vive en precios.json (PRICE_CATALOG): al guardarlo se valida,
+    se compila en otro hilo y sustituye al actual de golpe; un archivo inválido se ignora y sigue el anterior.
+    """
 
-            # Bicicleteira
-            "mb": "mieteteirabicicleteira",
+    def __init__(self, bot):
+        self.bot = bot
+        self.catalog = load_catalog()
+        self.catalog_history = deque([self.catalog], maxlen=CATALOG_HISTORY)
+        self.catalog_stat = self.stat_catalog()
+        self.watch_task = None
 
-            # Chipso y queso
-            "cq": "chipsoandqueso",
+    async def cog_load(self):
+        self.watch_task = asyncio.create_task(self.watch_catalog())
 
-            # Taco combinasion
-            "ltc": "latacocombinasion",
+    async def cog_unload(self):
+        if self.watch_task:
+            self.watch_task.cancel()
 
-            # Casa boo
-            "lcb": "lacasa",
+    # Atajos a la versión actual (cada comando guarda la suya en una variable local al empezar)
+    @property
+    def formulas(self):
+        return self.catalog.formulas
 
-            # Spooky pumpky
-            "sp": "spookyandpumpky",
+    @property
+    def aliases(self):
+        return self.catalog.aliases
 
-            # Headless horseman
-            "hh": "headless", "horseman": "headless",
+    @property
+    def index(self):
+        return self.catalog.index
 
-            # Meowl  
-            "meow": "meowl", "meo": "meowl", "miau": "meowl",
-        }
+    # ===============================================================
+    #                   RECARGA DEL CATÁLOGO
+    # ===============================================================
+    def stat_catalog(self):
+        try:
+            st = os.stat(CATALOG_PATH)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def watch_catalog(self):
+        while True:
+            await asyncio.sleep(CATALOG_POLL_INTERVAL)
+            current = self.stat_catalog()
+            if current is not None and current != self.catalog_stat:
+                self.catalog_stat = current
+                await self.reload_catalog()
+
+    async def reload_catalog(self):
+        """Carga el archivo; devuelve el catálogo nuevo, o None si no cambió o es inválido."""
+        start = asyncio.get_running_loop().time()
+        try:
+            catalog = await asyncio.to_thread(load_catalog, CATALOG_PATH, self.catalog.number + 1)
+        except (OSError, ValueError) as e:
+            logger.error(f"Catálogo de precios inválido; se mantiene {self.catalog.label}: {e}")
+            return None
+        if catalog.digest == self.catalog.digest:
+            return None
+        # una sola asignación: los comandos en curso terminan con la versión que ya tenían
+        self.catalog = catalog
+        self.catalog_history.append(catalog)
+        elapsed = (asyncio.get_running_loop().time() - start) * 1000
+        logger.info(f"Catálogo de precios {catalog.label} cargado: {len(catalog.formulas)} ítems en {elapsed:.1f} ms")
+        return catalog
 
         # ===============================================================
         # EMBED GENERATORS
         # ===============================================================
 
-    def make_embed(self, ctx, nombre: str, formula: str, operacion: str, resultado: float, pretty: str):
+    def make_embed(self, author, nombre: str, formula: str, operacion: str, resultado: float, pretty: str, nota: str = None, catalog=None):
         embed = discord.Embed(
             title=f"Calculadora de Precios - {pretty}",
-            description=f"Conversión automática usando la fórmula de **{pretty}**",
+            description=f"Conversión automática usando la fórmula de **{pretty}**" + (f"\n{nota}" if nota else ""),
             color=discord.Color.blurple()
         )
         embed.add_field(name="Fórmula", value=f"`{formula}`", inline=False)
         embed.add_field(name="Operación", value=f"`{operacion}`", inline=False)
         embed.add_field(name="Resultado", value=f"**${resultado:.2f}**", inline=False)
-        embed.set_footer(text=f"Pedido por {ctx.author}", icon_url=ctx.author.display_avatar.url)
+        version = f" • Catálogo {catalog.label}" if catalog else ""
+        embed.set_footer(text=f"Pedido por {author}{version}", icon_url=author.display_avatar.url)
         return embed
 
+    def price_embed(self, author, catalog, nombre, m, buscado, sugerencias):
+        """Embed de ,precio y /precio para un ítem ya resuelto."""
+        nota = None if sugerencias and sugerencias[0][1] == 1.0 else f"*(«{buscado}» → **{catalog.formulas[nombre][4]}**)*"
+        base, mult, suma, formula, pretty = catalog.formulas[nombre]
+        result = max(0, (m - base) * mult + suma)
+        operacion = f"( {m} − {base} ) × {mult} + {suma}"
+        return self.make_embed(author, nombre, formula, operacion, result, pretty, nota, catalog)
+
     def error_embed(self, ctx, msg: str):
         return discord.Embed(
             title="Error en el comando",
@@ -204,103 +510,142 @@ class Precios(commands.Cog):
                 ctx, f"Debes especificar el nombre. Ejemplo: `{ctx.prefix}{ctx.command} spooky 100`"
             ))
 
-        nombre = nombre.lower()
-
-        if nombre in self.aliases:
-            nombre = self.aliases[nombre]
-
-        if nombre not in self.formulas:
-            sugerencias = [k for k in self.formulas.keys() if nombre in k] or [
-                k for k, v in self.aliases.items() if nombre in k
-            ]
-            sugerencia = f" ¿Quisiste decir `{sugerencias[0]}`?" if sugerencias else ""
-            return await ctx.send(embed=self.error_embed(ctx, f"No encontré **{nombre}**.{sugerencia}"))
+        catalog = self.catalog
+        buscado = nombre
+        nombre, sugerencias = catalog.index.resolve(buscado)
+        if nombre is None:
+            opciones = ", ".join(f"`{key}`" for key, _ in sugerencias[:3])
+            sugerencia = f" ¿Quisiste decir {opciones}?" if opciones else ""
+            return await ctx.send(embed=self.error_embed(ctx, f"No encontré **{buscado}**.{sugerencia}"))
 
         if m is None:
             return await ctx.send(embed=self.error_embed(
                 ctx, f"Debes especificar la cantidad de millones. Ejemplo: `{ctx.prefix}{ctx.command} {nombre} 100`"
             ))
 
-        base, mult, suma, formula, pretty = self.formulas[nombre]
-        result = max(0, (m - base) * mult + suma)
-        operacion = f"( {m} − {base} ) × {mult} + {suma}"
+        await ctx.send(embed=self.price_embed(ctx.author, catalog, nombre, m, buscado, sugerencias))
 
-        await ctx.send(embed=self.make_embed(ctx, nombre, formula, operacion, result, pretty))
+    # ===============================================================
+    #                    /precio
+    # ===============================================================
+    @app_commands.command(name="precio", description="Calcula el precio de un brainrot según sus millones")
+    @app_commands.describe(item="Nombre o alias (se autocompleta)", millones="Millones (M) del brainrot")
+    async def precio_slash(self, interaction: discord.Interaction, item: str, millones: app_commands.Range[float, 0]):
+        catalog = self.catalog
+        nombre, sugerencias = catalog.index.resolve(item)
+        if nombre is None:
+            opciones = ", ".join(f"`{key}`" for key, _ in sugerencias[:3])
+            sugerencia = f" ¿Quisiste decir {opciones}?" if opciones else ""
+            return await interaction.response.send_message(f"No encontré **{item}**.{sugerencia}", ephemeral=True)
+        await interaction.response.send_message(embed=self.price_embed(interaction.user, catalog, nombre, millones, item, sugerencias))
+
+    @precio_slash.autocomplete("item")
+    async def precio_item_autocomplete(self, interaction: discord.Interaction, current: str):
+        # se dispara en cada tecla: solo lecturas de lo ya construido para esta versión del catálogo
+        return self.catalog.choices(current)
 
     # ===============================================================
     #                   LISTA DE PRECIOS
     # ===============================================================
     @commands.command(name="helpprices", aliases=["precios", "listaprecios"])
     async def helpprices(self, ctx):
+        pages = self.catalog.pages
+        if len(pages) == 1:
+            return await ctx.send(embed=pages[0])
+        view = PricePagesView(ctx.author, pages)
+        view.message = await ctx.send(embed=pages[0], view=view)
 
-        formulas_items = sorted(self.formulas.items(), key=lambda x: x[1][4])
-        embeds = []
-
-        pages = [formulas_items[i:i + 9] for i in range(0, len(formulas_items), 9)]
-        left_arrow = "⬅️"
-        right_arrow = "➡️"
-
-        for i, page in enumerate(pages, start=1):
-            embed = discord.Embed(
-                title="📘 Lista de Precios Brainrots",
-                description="Usa: `,precio <alias> <millones>`\nEj: `,precio meowl 300`",
-                color=discord.Color.orange()
-            )
-
-            for key, (_, _, _, _, pretty) in page:
-                aliases = [a for a, real in self.aliases.items() if real == key]
 
-                alias_str = ", ".join([f"`{key}`"] + [f"`{a}`" for a in aliases][:4])
-                if len(aliases) > 4:
-                    alias_str += " …"
-
-                ejemplo = aliases[0] if aliases else key
-
-                embed.add_field(
-                    name=f"⭐ {pretty}",
-                    value=f"**Alias:** {alias_str}\n**Ejemplo:** `,precio {ejemplo} 100`",
-                    inline=False
-                )
-
-            embed.set_footer(text=f"Página {i}/{len(pages)} • Total: {len(self.formulas)} ítems")
-            embeds.append(embed)
-
-        message = await ctx.send(embed=embeds[0])
-
-        if len(embeds) == 1:
-            return
-
-        await message.add_reaction(left_arrow)
-        await message.add_reaction(right_arrow)
-
-        current_page = 0
+    # ===============================================================
+    #                   VALUACIÓN EN LOTE
+    # ===============================================================
+    @commands.command(name="valuar", aliases=["bulkprice", "valorar"])
+    async def valuar(self, ctx, *, texto: str = None):
+        catalog = self.catalog
+        if ctx.message.attachments:
+            adjunto = ctx.message.attachments[0]
+            if adjunto.size > BATCH_MAX_BYTES:
+                return await ctx.send(embed=self.error_embed(ctx, f"El archivo supera {BATCH_MAX_BYTES // 1024} KB."))
+            texto = (await adjunto.read()).decode("utf-8", errors="replace")
+        if not texto:
+            return await ctx.send(embed=self.error_embed(
+                ctx, f"Pasa una lista `ítem M` (una por línea o separadas con `;`) o adjunta un .txt/.csv.\n"
+                     f"Ejemplo: `{ctx.prefix}{ctx.invoked_with} meowl 300; dragon 250; se 400`"
+            ))
 
-        def check(reaction, user):
-            return (
-                user == ctx.author
-                and reaction.message.id == message.id
-                and str(reaction.emoji) in [left_arrow, right_arrow]
-            )
+        entries, errores = parse_batch(texto)
+        if len(entries) > BATCH_MAX_ITEMS:
+            return await ctx.send(embed=self.error_embed(ctx, f"Máximo {BATCH_MAX_ITEMS} ítems por mensaje ({len(entries)} recibidos)."))
+
+        keys, ms, filas = [], [], []
+        resueltos = {}  # el mismo nombre suele repetirse en un inventario
+        for line_no, nombre, m in entries:
+            if nombre not in resueltos:
+                resueltos[nombre] = catalog.index.resolve(nombre)
+            key, sugerencias = resueltos[nombre]
+            if key is None:
+                opciones = f" (¿{', '.join(k for k, _ in sugerencias[:2])}?)" if sugerencias else ""
+                errores.append(f"línea {line_no}: no encontré `{nombre[:30]}`{opciones}")
+                continue
+            keys.append(key)
+            ms.append(m)
+            filas.append((catalog.formulas[key][4], m, sugerencias[0][1] < 1.0))
+
+        if not keys:
+            return await ctx.send(embed=self.error_embed(ctx, "Ningún ítem reconocido. Formato: `ítem M; ítem M` o una línea por ítem.\n" + "\n".join(errores[:10])))
+
+        valores = catalog.value_many(keys, ms)
+        total = sum(valores)
+        tabla = [f"{'Ítem':<24}{'M':>9}{'Valor':>11}"] + [
+            f"{(pretty + ('*' if corregido else ''))[:23]:<24}{m:>9g}{valor:>11.2f}"
+            for (pretty, m, corregido), valor in zip(filas, valores)
+        ]
+
+        mostradas = tabla[:BATCH_TABLE_ROWS + 1]
+        truncada = len(tabla) > len(mostradas)
+        if truncada:
+            mostradas.append(f"… y {len(tabla) - len(mostradas)} más (tabla completa adjunta)")
+        embed = discord.Embed(
+            title=f"Valuación de {len(keys)} ítems",
+            description="```\n" + "\n".join(mostradas) + "\n```",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(name="Total", value=f"**${total:,.2f}**", inline=False)
+        if any(corregido for *_, corregido in filas):
+            embed.add_field(name="Nota", value="* nombre corregido automáticamente", inline=False)
+        if errores:
+            extra = f"\n… y {len(errores) - 5} más" if len(errores) > 5 else ""
+            embed.add_field(name=f"Sin valorar ({len(errores)})", value="\n".join(errores[:5])[:1000] + extra, inline=False)
+        embed.set_footer(text=f"Pedido por {ctx.author} • Catálogo {catalog.label}", icon_url=ctx.author.display_avatar.url)
+
+        archivo = None
+        if truncada:
+            contenido = "\n".join(tabla) + f"\n\n{'TOTAL':<24}{'':>9}{total:>11.2f}\n"
+            archivo = discord.File(io.BytesIO(contenido.encode("utf-8")), "valuacion.txt")
+        await ctx.send(embed=embed, file=archivo)
 
-        while True:
-            try:
-                reaction, user = await self.bot.wait_for("reaction_add", timeout=60, check=check)
-            except asyncio.TimeoutError:
-                await message.clear_reactions()
-                break
-
-            if str(reaction.emoji) == right_arrow and current_page < len(embeds) - 1:
-                current_page += 1
-                await message.edit(embed=embeds[current_page])
-
-            elif str(reaction.emoji) == left_arrow and current_page > 0:
-                current_page -= 1
-                await message.edit(embed=embeds[current_page])
-
-            try:
-                await message.remove_reaction(reaction.emoji, user)
-            except:
-                pass
+    # ===============================================================
+    #                   VERSIONES DEL CATÁLOGO
+    # ===============================================================
+    @commands.group(name="catalogo", aliases=["catalog"], invoke_without_command=True)
+    async def catalogo(self, ctx):
+        current = self.catalog
+        lines = [
+            f"{'➡️' if c is current else '▫️'} **{c.label}** • {len(c.formulas)} ítems, {len(c.aliases)} alias • "
+            f"<t:{int(c.loaded_at.timestamp())}:R>"
+            for c in reversed(self.catalog_history)
+        ]
+        embed = discord.Embed(title="📦 Versiones del catálogo de precios", description="\n".join(lines), color=discord.Color.orange())
+        embed.set_footer(text=f"Archivo: {CATALOG_PATH} • se recarga solo al guardarlo")
+        await ctx.send(embed=embed)
+
+    @catalogo.command(name="reload", aliases=["recargar"])
+    @commands.is_owner()
+    async def catalogo_reload(self, ctx):
+        catalog = await self.reload_catalog()
+        if catalog is None:
+            return await ctx.send(f"Sin cambios (o archivo inválido, mira el log); sigue {self.catalog.label}.")
+        await ctx.send(f"✅ Catálogo {catalog.label} cargado: {len(catalog.formulas)} ítems.")
 
 
 async def setup(bot):
@@ -0,0 +1,120 @@
+from discord.ext import commands
+import asyncio
+import contextlib
+import gzip
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# RECORD_EVENTS=ruta.jsonl.gz graba desde el arranque (incluye READY y GUILD_CREATE, necesarios para el replay).
+# Activa también enable_debug_events en main.py; sin esa variable no llegan los payloads crudos.
+RECORD_PATH = os.getenv("RECORD_EVENTS")
+FLUSH_INTERVAL = 1.0  # segundos entre escrituras al archivo
+
+
+class GatewayRecorder(commands.Cog):
+    """
+    Graba los payloads crudos del gateway en JSONL comprimido, una línea por payload:
+    {"ts": <epoch>, "p": <payload tal cual llegó>}. Se reproduce con `python -m benchmarks.replay`.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.path = None
+        self.file = None
+        self.buffer = []
+        self.count = 0
+        self.started_at = None
+        self.flush_task = None
+        self.write_task = None  # writelines en curso en un hilo
+
+    async def cog_load(self):
+        if RECORD_PATH:
+            await self.start(RECORD_PATH)
+
+    async def cog_unload(self):
+        await self.stop()
+
+    @property
+    def recording(self):
+        return self.file is not None
+
+    async def start(self, path):
+        if self.recording:
+            await self.stop()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = await asyncio.to_thread(gzip.open, path, "at", encoding="utf-8")
+        self.path = path
+        self.count = 0
+        self.started_at = time.time()
+        self.flush_task = asyncio.create_task(self.flush_loop())
+        logger.info(f"Grabando eventos del gateway en {path}")
+
+    async def stop(self):
+        if not self.recording:
+            return
+        self.flush_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.flush_task
+        if self.write_task:
+            # cancelar al que esperaba no para el hilo: hay que dejar que termine antes de escribir y cerrar
+            await self.write_task
+        await self.flush()
+        file, self.file = self.file, None
+        await asyncio.to_thread(file.close)
+        logger.info(f"Grabación detenida: {self.count} payloads en {self.path}")
+
+    async def flush(self):
+        if not self.buffer or self.file is None:
+            return
+        lines, self.buffer = self.buffer, []
+        self.write_task = asyncio.create_task(asyncio.to_thread(self.file.writelines, lines))
+        await asyncio.shield(self.write_task)
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    @commands.Cog.listener()
+    async def on_socket_raw_receive(self, msg):
+        if self.file is None:
+            return
+        # El payload ya es JSON: se envuelve sin volver a parsearlo
+        self.buffer.append(f'{{"ts":{time.time():.6f},"p":{msg}}}\n')
+        self.count += 1
+
+    # ======================
+    # COMANDOS
+    # ======================
+    @commands.group(name="record", invoke_without_command=True)
+    @commands.is_owner()
+    async def record(self, ctx):
+        if not self.recording:
+            return await ctx.send("⏹️ No se está grabando.")
+        elapsed = time.time() - self.started_at
+        await ctx.send(f"⏺️ Grabando en `{self.path}`: {self.count:,} payloads en {elapsed:.0f}s.")
+
+    @record.command(name="start")
+    @commands.is_owner()
+    async def record_start(self, ctx, path: str = "data/gateway.jsonl.gz"):
+        if not self.bot._enable_debug_events:
+            return await ctx.send("❌ Arranca el bot con `RECORD_EVENTS` para recibir los payloads crudos.")
+        await self.start(path)
+        await ctx.send(
+            f"⏺️ Grabando en `{path}`. Sin READY/GUILD_CREATE el replay solo servirá con servidores sintéticos; "
+            "para una grabación completa usa `RECORD_EVENTS` al arrancar."
+        )
+
+    @record.command(name="stop")
+    @commands.is_owner()
+    async def record_stop(self, ctx):
+        count, path = self.count, self.path
+        await self.stop()
+        await ctx.send(f"⏹️ Grabación detenida: {count:,} payloads en `{path}`.")
+
+
+async def setup(bot):
+    await bot.add_cog(GatewayRecorder(bot))
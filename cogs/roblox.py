@@ -1,34 +1,19 @@
 import discord
 from discord.ext import commands
-import aiohttp
 import asyncio
 
 class RobloxCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = None
-
-    async def cog_load(self):
-        self.session = aiohttp.ClientSession()
-
-    async def cog_unload(self):
-        if self.session:
-            await self.session.close()
 
     async def safe_request(self, method, url, **kwargs):
-        for attempt in range(3):
-            try:
-                async with self.session.request(method, url, **kwargs) as resp:
-                    if resp.status == 429:
-                        retry_after = int(resp.headers.get("Retry-After", 5))
-                        await asyncio.sleep(retry_after)
-                        continue
-                    if resp.status != 200:
-                        return None, f"Error HTTP {resp.status}"
-                    return await resp.json(), None
-            except Exception as e:
-                return None, f"Error de conexión: {str(e)}"
-        return None, "Demasiadas solicitudes. Intenta más tarde."
+        # Reintentos, Retry-After y límites de Roblox los maneja el cliente HTTP compartido
+        try:
+            return await self.bot.get_cog("HTTPClient").request_json(method, url, **kwargs), None
+        except Exception as e:
+            if getattr(e, "status", None) == 429:
+                return None, "Demasiadas solicitudes. Intenta más tarde."
+            return None, str(e)
 
     @commands.command(name="roblox", aliases=["rblx", "rbx"])
     async def roblox_profile(self, ctx, *, args: str = None):
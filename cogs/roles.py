@@ -5,8 +5,6 @@ import logging
 from typing import List, Optional, Set, Union
 import re
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ========================
@@ -203,11 +201,18 @@ class Roles(commands.Cog):
         matches = [r for r in ctx.guild.roles if role_arg in r.name.lower()]
         return matches[0] if len(matches) == 1 else matches if matches else None
 
-    def find_member(self, ctx, member_arg):
+    async def find_member(self, ctx, member_arg):
         member_arg = member_arg.strip()
         if member_arg.isdigit() or member_arg.startswith("<@"):
             member_id = int(re.sub(r"[<@!>]", "", member_arg))
-            return ctx.guild.get_member(member_id)
+            member = ctx.guild.get_member(member_id)
+            if member:
+                return member
+            try:
+                return await ctx.guild.fetch_member(member_id)
+            except discord.HTTPException:
+                return None
+        await self.bot.ensure_chunked(ctx.guild)
         return discord.utils.find(
             lambda m: m.name.lower() == member_arg.lower() or (m.nick and m.nick.lower() == member_arg.lower()),
             ctx.guild.members
@@ -233,7 +238,7 @@ class Roles(commands.Cog):
     @commands.command(name="addrole", aliases=["addr", "ar"])
     @commands.has_permissions(manage_roles=True)
     async def addrole(self, ctx, member_arg: str, *, role_arg: str):
-        member = self.find_member(ctx, member_arg)
+        member = await self.find_member(ctx, member_arg)
         if not member:
             return await ctx.send(embed=discord.Embed(
                 description=f"❌ User **{member_arg}** not found.",
@@ -288,7 +293,7 @@ class Roles(commands.Cog):
     @commands.command(name="addroles", aliases=["addrs", "ars"])
     @commands.has_permissions(manage_roles=True)
     async def addroles(self, ctx, member_arg: str, *, roles_arg: str):
-        member = self.find_member(ctx, member_arg)
+        member = await self.find_member(ctx, member_arg)
         if not member:
             return await ctx.send(embed=discord.Embed(
                 description=f"❌ User **{member_arg}** not found.",
@@ -352,7 +357,7 @@ class Roles(commands.Cog):
     @commands.command(name="removerole", aliases=["rr", "remrole"])
     @commands.has_permissions(manage_roles=True)
     async def removerole(self, ctx, member_arg: str, *, role_arg: str):
-        member = self.find_member(ctx, member_arg)
+        member = await self.find_member(ctx, member_arg)
         if not member:
             return await ctx.send(embed=discord.Embed(
                 description=f"❌ User **{member_arg}** not found.",
@@ -405,7 +410,7 @@ class Roles(commands.Cog):
     @commands.command(name="purgeroles", aliases=["clearroles", "pr"])
     @commands.has_permissions(manage_roles=True)
     async def purgeroles(self, ctx, member_arg: str):
-        member = self.find_member(ctx, member_arg)
+        member = await self.find_member(ctx, member_arg)
         if not member:
             return await ctx.send(embed=discord.Embed(
                 description=f"❌ User **{member_arg}** not found.",
@@ -428,7 +433,12 @@ class Roles(commands.Cog):
             # register moderator
             self.bot._last_role_action[member.id] = ctx.author
 
-            await member.remove_roles(*roles_to_remove, reason=f"purgeroles by {ctx.author} ({ctx.author.id})")
+            queue = self.bot.get_cog("ActionQueue")
+            await queue.do(
+                ctx.guild, "member_edit",
+                lambda: member.remove_roles(*roles_to_remove, reason=f"purgeroles by {ctx.author} ({ctx.author.id})"),
+                label=f"purgeroles {member}"
+            )
             embed = discord.Embed(
                 description=f"🗑️ {ctx.author.mention} removed all roles from {member.mention}",
                 color=discord.Color.red()
@@ -461,7 +471,7 @@ class Roles(commands.Cog):
     @commands.command(name="togglerole", aliases=["r", "role"])
     @commands.has_permissions(manage_roles=True)
     async def toggle_role(self, ctx, member_arg: str, *, role_arg: str):
-        member = self.find_member(ctx, member_arg)
+        member = await self.find_member(ctx, member_arg)
         if not member:
             return await ctx.send(embed=discord.Embed(
                 description=f"❌ User **{member_arg}** not found.",
@@ -514,18 +524,20 @@ class Roles(commands.Cog):
     @commands.command(name="restoreroles", aliases=["rrs", "restorer"])
     @commands.has_permissions(manage_roles=True)
     async def restoreroles(self, ctx, member_arg: str):
-        member = self.find_member(ctx, member_arg)
+        member = await self.find_member(ctx, member_arg)
         if not member:
             return await ctx.send(embed=discord.Embed(
                 description=f"❌ User **{member_arg}** not found.",
                 color=discord.Color.red()
             ))
 
-        after_time = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+        # Cambios de la última hora desde el audit log compartido, del más antiguo al más nuevo
+        audit = self.bot.get_cog("AuditLog")
         role_changes = []
-        async for entry in ctx.guild.audit_logs(limit=100, after=after_time, action=discord.AuditLogAction.member_role_update):
-            if entry.target.id == member.id:
-                role_changes.append(entry)
+        if audit:
+            role_changes = audit.find(
+                ctx.guild, discord.AuditLogAction.member_role_update, target=member.id, within=3600
+            )[::-1]
 
         if not role_changes:
             return await ctx.send(embed=discord.Embed(
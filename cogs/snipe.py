@@ -2,6 +2,8 @@ import discord
 from discord.ext import commands
 import datetime
 
+from cogs.eventbus import EventBus
+
 class Snipe(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -11,14 +13,19 @@ class Snipe(commands.Cog):
         # Diccionario para mensajes editados: {guild_id: {channel_id: [(before, after, author, timestamp)]}}
         self.edited_messages = {}
 
+    async def cog_load(self):
+        EventBus.attach(self, {"message.delete": self.on_delete})
+
+    async def cog_unload(self):
+        EventBus.detach(self)
+
     # Evento: Detectar mensajes eliminados
-    @commands.Cog.listener()
-    async def on_message_delete(self, message):
-        if not message.guild or message.author.bot or not message.content.strip():
+    async def on_delete(self, record):
+        if not record.content.strip():
             return
 
-        guild_id = message.guild.id
-        channel_id = message.channel.id
+        guild_id = record.guild.id
+        channel_id = record.channel.id
 
         # Inicializar estructuras si no existen
         if guild_id not in self.sniped_messages:
@@ -27,14 +34,12 @@ class Snipe(commands.Cog):
             self.sniped_messages[guild_id][channel_id] = []
 
         # Guardar el mensaje eliminado con adjuntos y embeds
-        attachments = [a.url for a in message.attachments] if message.attachments else []
-        embeds = [e.to_dict() for e in message.embeds] if message.embeds else []
         self.sniped_messages[guild_id][channel_id].append((
-            message.content,
-            message.author,
+            record.content,
+            record.author,
             datetime.datetime.now(datetime.timezone.utc),
-            attachments,
-            embeds
+            record.attachments,
+            record.embeds
         ))
 
         # Limitar a los últimos 5 mensajes eliminados por canal
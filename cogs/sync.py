@@ -1,15 +1,68 @@
-# cogs/sync.py
 from discord.ext import commands
+import hashlib
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Hash del árbol de slash commands sincronizado por última vez (por aplicación)
+SYNC_STATE_FILE = "command_sync.json"
+
+def load_sync_state():
+    if not os.path.exists(SYNC_STATE_FILE):
+        return {}
+    try:
+        with open(SYNC_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_sync_state(data):
+    with open(SYNC_STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+def tree_hash(tree):
+    """Hash estable del payload que se enviaría a Discord al sincronizar."""
+    payload = sorted((cmd.to_dict(tree) for cmd in tree.get_commands()), key=lambda c: c["name"])
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 class Sync(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def sync_tree(self):
+        """Sincroniza siempre y guarda el hash del árbol sincronizado."""
+        synced = await self.bot.tree.sync()
+        state = load_sync_state()
+        state[str(self.bot.application_id)] = tree_hash(self.bot.tree)
+        save_sync_state(state)
+        return synced
+
+    async def sync_if_changed(self):
+        """Sincroniza solo si los slash commands cambiaron desde la última vez."""
+        current = tree_hash(self.bot.tree)
+        if load_sync_state().get(str(self.bot.application_id)) == current:
+            logger.info(f"Slash commands sin cambios ({current[:12]}), no se sincroniza")
+            return None
+        synced = await self.sync_tree()
+        logger.info(f"{len(synced)} comandos slash sincronizados: {[cmd.name for cmd in synced]}")
+        return synced
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        try:
+            await self.sync_if_changed()
+        except Exception as e:
+            logger.error(f"Error sincronizando comandos: {e}")
+
     @commands.command()
     @commands.is_owner()
     async def sync(self, ctx):
+        """Fuerza la sincronización aunque el hash no haya cambiado."""
         try:
-            synced = await ctx.bot.tree.sync()
+            synced = await self.sync_tree()
             await ctx.send(f"Sincronizados {len(synced)} comandos: {', '.join([c.name for c in synced])}")
         except Exception as e:
             await ctx.send(f"Error: {e}")
@@ -1,44 +1,116 @@
 
 import discord
 from discord.ext import commands
-from deep_translator import GoogleTranslator
-import json
+import html
+import jsoncodec
 import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Ruta del JSON donde guardamos los idiomas
 LANG_FILE = "languages.json"
 
+# Versión móvil de Google Translate (la misma que usaba deep-translator), vía el cliente HTTP compartido
+TRANSLATE_URL = "https://translate.google.com/m"
+RESULT_RE = re.compile(r'<div class="result-container">(.*?)</div>', re.S)
+MAX_CHARS = 5000
+
+# Idiomas de Google Translate: {nombre: código}, como los aceptaba deep-translator (nombre o código)
+LANGUAGES = {
+    "afrikaans": "af", "albanian": "sq", "amharic": "am", "arabic": "ar", "armenian": "hy", "assamese": "as",
+    "aymara": "ay", "azerbaijani": "az", "bambara": "bm", "basque": "eu", "belarusian": "be", "bengali": "bn",
+    "bhojpuri": "bho", "bosnian": "bs", "bulgarian": "bg", "catalan": "ca", "cebuano": "ceb", "chichewa": "ny",
+    "chinese (simplified)": "zh-CN", "chinese (traditional)": "zh-TW", "corsican": "co", "croatian": "hr",
+    "czech": "cs", "danish": "da", "dhivehi": "dv", "dogri": "doi", "dutch": "nl", "english": "en",
+    "esperanto": "eo", "estonian": "et", "ewe": "ee", "filipino": "tl", "finnish": "fi", "french": "fr",
+    "frisian": "fy", "galician": "gl", "georgian": "ka", "german": "de", "greek": "el", "guarani": "gn",
+    "gujarati": "gu", "haitian creole": "ht", "hausa": "ha", "hawaiian": "haw", "hebrew": "iw", "hindi": "hi",
+    "hmong": "hmn", "hungarian": "hu", "icelandic": "is", "igbo": "ig", "ilocano": "ilo", "indonesian": "id",
+    "irish": "ga", "italian": "it", "japanese": "ja", "javanese": "jw", "kannada": "kn", "kazakh": "kk",
+    "khmer": "km", "kinyarwanda": "rw", "konkani": "gom", "korean": "ko", "krio": "kri",
+    "kurdish (kurmanji)": "ku", "kurdish (sorani)": "ckb", "kyrgyz": "ky", "lao": "lo", "latin": "la",
+    "latvian": "lv", "lingala": "ln", "lithuanian": "lt", "luganda": "lg", "luxembourgish": "lb",
+    "macedonian": "mk", "maithili": "mai", "malagasy": "mg", "malay": "ms", "malayalam": "ml", "maltese": "mt",
+    "maori": "mi", "marathi": "mr", "meiteilon (manipuri)": "mni-Mtei", "mizo": "lus", "mongolian": "mn",
+    "myanmar": "my", "nepali": "ne", "norwegian": "no", "odia (oriya)": "or", "oromo": "om", "pashto": "ps",
+    "persian": "fa", "polish": "pl", "portuguese": "pt", "punjabi": "pa", "quechua": "qu", "romanian": "ro",
+    "russian": "ru", "samoan": "sm", "sanskrit": "sa", "scots gaelic": "gd", "sepedi": "nso", "serbian": "sr",
+    "sesotho": "st", "shona": "sn", "sindhi": "sd", "sinhala": "si", "slovak": "sk", "slovenian": "sl",
+    "somali": "so", "spanish": "es", "sundanese": "su", "swahili": "sw", "swedish": "sv", "tajik": "tg",
+    "tamil": "ta", "tatar": "tt", "telugu": "te", "thai": "th", "tigrinya": "ti", "tsonga": "ts",
+    "turkish": "tr", "turkmen": "tk", "twi": "ak", "ukrainian": "uk", "urdu": "ur", "uyghur": "ug",
+    "uzbek": "uz", "vietnamese": "vi", "welsh": "cy", "xhosa": "xh", "yiddish": "yi", "yoruba": "yo", "zulu": "zu",
+}
+# Nombres en español de los más usados
+LANGUAGES.update({
+    "español": "es", "inglés": "en", "ingles": "en", "portugués": "pt", "portugues": "pt", "francés": "fr",
+    "frances": "fr", "alemán": "de", "aleman": "de", "italiano": "it", "japonés": "ja", "japones": "ja",
+    "coreano": "ko", "chino": "zh-CN", "ruso": "ru", "árabe": "ar", "arabe": "ar",
+})
+CODES = {code.lower(): code for code in LANGUAGES.values()}
+
+
+class TranslationError(Exception):
+    pass
+
+
+def resolve_language(value):
+    """Código de Google para un código o nombre de idioma (sin distinguir mayúsculas); None si no existe."""
+    value = value.strip().lower()
+    return CODES.get(value) or LANGUAGES.get(value)
+
 # Función para cargar los idiomas guardados
 def load_languages():
     if not os.path.exists(LANG_FILE):
         return {}
     with open(LANG_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+        return jsoncodec.load(f)
 
 # Función para guardar idiomas en el JSON
 def save_languages(data):
     with open(LANG_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+        jsoncodec.dump(data, f, indent=True)
 
 class Translate(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.languages = load_languages()
 
+    async def google_translate(self, text: str, target: str) -> str:
+        if len(text) > MAX_CHARS:
+            raise ValueError(f"El texto no puede superar {MAX_CHARS} caracteres")
+        page = await self.bot.get_cog("HTTPClient").request_text(
+            "GET", TRANSLATE_URL, params={"sl": "auto", "tl": target, "q": text}
+        )
+        match = RESULT_RE.search(page)
+        if not match:
+            # Google cambió el HTML de /m (o devolvió otra página): que se vea en el log, no solo en el canal
+            logger.error("Respuesta de Google Translate sin result-container", extra={"target": target, "page": page[:500]})
+            raise TranslationError("Google Translate devolvió una página que no sé leer")
+        return html.unescape(match.group(1))
+
     # ✅ Comando para configurar idioma preferido por usuario
     @commands.command(name="setlang")
     async def setlang(self, ctx, lang: str = None):
         if not lang:
-            return await ctx.send("⚠️ Debes especificar un idioma. Ejemplo: `$setlang es` o `$setlang en`")
+            return await ctx.send("⚠️ Debes especificar un idioma. Ejemplo: `$setlang es` o `$setlang english`")
 
-        self.languages[str(ctx.author.id)] = lang
+        code = resolve_language(lang)
+        if code is None:
+            return await ctx.send(f"❌ `{lang}` no es un idioma soportado. Usa un código (`es`, `en`, `pt`...) o su nombre (`spanish`, `inglés`...).")
+        self.languages[str(ctx.author.id)] = code
         save_languages(self.languages)
-        await ctx.send(f"✅ Tu idioma preferido se ha configurado a `{lang}`.")
+        await ctx.send(f"✅ Tu idioma preferido se ha configurado a `{code}`.")
 
     # ✅ Comando para traducir texto o mensajes respondidos
     @commands.command(name="translate")
     async def translate(self, ctx, *, text: str = None):
-        lang = self.languages.get(str(ctx.author.id), "es")  # por defecto español
+        saved = self.languages.get(str(ctx.author.id), "es")  # por defecto español
+        lang = resolve_language(saved)
+        if lang is None:  # guardado antes de validar setlang
+            return await ctx.send(f"❌ Tu idioma guardado (`{saved}`) no es válido. Cámbialo con `setlang`.")
 
         # Si no escriben texto pero responden a un mensaje
         if not text and ctx.message.reference:
@@ -49,7 +121,7 @@ class Translate(commands.Cog):
             return await ctx.send("⚠️ Debes escribir un texto o responder a un mensaje para traducir.")
 
         try:
-            result = GoogleTranslator(source="auto", target=lang).translate(text)
+            result = await self.google_translate(text, lang)
             embed = discord.Embed(
                 title="🌍 Traducción",
                 description=f"**Texto original:**\n{text}\n\n**Traducción ({lang}):**\n{result}",
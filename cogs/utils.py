@@ -154,6 +154,7 @@ class Utils(commands.Cog):
     @commands.command(aliases=["serverinfo", "sv", "guild"])
     async def server(self, ctx):
         g = ctx.guild
+        await self.bot.ensure_chunked(g)
         embed = discord.Embed(title=f"**{g.name}**", color=discord.Color.blue(), timestamp=datetime.now(timezone.utc))
         if g.icon: embed.set_thumbnail(url=g.icon.url)
         if g.banner: embed.set_image(url=g.banner.url)
@@ -176,6 +177,7 @@ class Utils(commands.Cog):
     # =====================================================
     @commands.command(aliases=["ri"])
     async def roleinfo(self, ctx, role: discord.Role):
+        await self.bot.ensure_chunked(ctx.guild)
         embed = discord.Embed(title=f"Rol: {role.name}", color=role.color)
         embed.add_field(name="ID", value=role.id)
         embed.add_field(name="Miembros", value=len(role.members))
@@ -190,6 +192,7 @@ class Utils(commands.Cog):
     async def finduser(self, ctx, *, nombre: str = None):
         if not nombre:
             return await ctx.send("Usa: `,finduser <nombre>`")
+        await self.bot.ensure_chunked(ctx.guild)
         resultados = [m for m in ctx.guild.members if nombre.lower() in m.display_name.lower()]
         if not resultados:
             return await ctx.send("No se encontraron usuarios.")
@@ -7,13 +7,25 @@ load_dotenv()
 # 🔑 El TOKEN siempre viene de las variables de entorno
 TOKEN = os.getenv("DISCORD_TOKEN")
 
+# 🚀 Perfil de ejecución: "fast" usa uvloop y orjson si están instalados (ver main.py y jsoncodec.py)
+RUNTIME_PROFILE = os.getenv("RUNTIME_PROFILE", "default").lower()
+
 # ⚙️ Configuración de roles y logs
+# Valores por defecto: cada servidor puede cambiarlos con ,config (cogs/guildconfig.py)
+PREFIX = ","
 LOG_CHANNEL_ID = 1421331172969156660  
 REQUIRED_ROLE_ID = 1421330888192561152  
 MAX_ROLE_ID = 1415860211318521966  
 JOIN_ROLE_ID = 1421330898569269409
 LIMIT_ROLE_ID = 1415860211318521966
 MUTE_ROLE_ID = 1415860201554448506
+PROTECTED_ROLE_ID = 1421330892038869063
+OWNER_ROLE_ID = 1421330806399565888  # rol Co-Owner
+
+# 👑 Globales (no configurables por servidor): dueños del bot con permisos absolutos
+OWNER_IDS = {335596693603090434, 523662219020337153, 1158970670928113745}
+# Whitelist del antinuke por defecto
+WHITELIST = {1325579039888511056, 235148962103951360, 416358583220043796, 710034409214181396, 972725581236043796}
 
 def get_log_channel(guild):
     """Devuelve el canal de logs de un servidor"""
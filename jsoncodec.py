@@ -0,0 +1,43 @@
+"""
+Codec JSON compartido: orjson con RUNTIME_PROFILE=fast (o JSON_CODEC=orjson), si no la librería estándar.
+Misma interfaz en ambos casos; dumps siempre devuelve str, y las claves no-str (IDs int) se convierten
+a str igual que en json.
+"""
+import json
+import os
+
+import config
+
+BACKEND = os.getenv("JSON_CODEC") or ("orjson" if config.RUNTIME_PROFILE == "fast" else "json")
+
+if BACKEND == "orjson":
+    try:
+        import orjson
+    except ImportError:
+        BACKEND = "json"
+
+if BACKEND == "orjson":
+    _OPTS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj, *, indent=False, sort_keys=False, default=None):
+        option = _OPTS | (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+
+    loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+else:
+    def dumps(obj, *, indent=False, sort_keys=False, default=None):
+        if indent:
+            return json.dumps(obj, indent=2, sort_keys=sort_keys, default=default, ensure_ascii=False)
+        return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, default=default, ensure_ascii=False)
+
+    loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
+
+def dump(obj, fp, **kwargs):
+    fp.write(dumps(obj, **kwargs))
+
+
+def load(fp):
+    return loads(fp.read())
@@ -0,0 +1,139 @@
+"""
+Logging compartido por el bot y todos los cogs.
+
+El event loop solo encola registros (QueueHandler); un hilo (QueueListener) los formatea y escribe
+en consola y en un archivo JSONL rotado y comprimido. Variables de entorno:
+
+LOG_LEVEL=INFO                         nivel por defecto
+LOG_LEVELS=cogs.antinuke=DEBUG,discord=INFO   niveles por logger (cada cog usa logging.getLogger(__name__))
+LOG_FILE=logs/bot.jsonl                archivo JSON (vacío para desactivarlo)
+LOG_MAX_BYTES=5242880 LOG_BACKUPS=5    rotación
+LOG_COMPRESS=1                         gzip de los archivos rotados
+LOG_CONSOLE=color | json               formato de consola
+"""
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+from datetime import datetime, timezone
+
+import colorlog
+
+import jsoncodec
+
+# Atributos estándar de LogRecord: todo lo demás viene de `extra=` y se incluye en el JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# discord.py registra cada conexión/reanudación en INFO; se mantiene como antes salvo que LOG_LEVELS diga otra cosa
+DEFAULT_LEVELS = {"discord": "WARNING"}
+
+_listener = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los campos de `extra=` al mismo nivel."""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        return jsoncodec.dumps(data, default=str)
+
+
+class LoopQueueHandler(logging.handlers.QueueHandler):
+    """
+    Encola el registro con el mensaje ya interpolado (los args pueden cambiar o no ser thread-safe),
+    pero sin formatearlo: cada handler del listener aplica su propio formato.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    """Configura el logging una sola vez; llamadas posteriores no hacen nada."""
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers = []
+    console = logging.StreamHandler()
+    if os.getenv("LOG_CONSOLE", "color").lower() == "json":
+        console.setFormatter(JSONFormatter())
+    else:
+        console.setFormatter(colorlog.ColoredFormatter(
+            "%(log_color)s[%(asctime)s] [%(levelname)-8s] %(name)s: %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+            log_colors={
+                "DEBUG": "cyan",
+                "INFO": "green",
+                "WARNING": "yellow",
+                "ERROR": "red",
+                "CRITICAL": "bold_red",
+            },
+        ))
+    handlers.append(console)
+
+    log_file = os.getenv("LOG_FILE", "logs/bot.jsonl")
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", 5 * 1024 * 1024)),
+            backupCount=int(os.getenv("LOG_BACKUPS", 5)),
+            encoding="utf-8",
+            delay=True,
+        )
+        if os.getenv("LOG_COMPRESS", "1") != "0":
+            file_handler.namer = lambda name: name + ".gz"
+            file_handler.rotator = _gzip_rotator
+        file_handler.setFormatter(JSONFormatter())
+        handlers.append(file_handler)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LoopQueueHandler(queue.SimpleQueue()))
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in {**DEFAULT_LEVELS, **_parse_levels(os.getenv("LOG_LEVELS", ""))}.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(root.handlers[0].queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
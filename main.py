@@ -3,15 +3,20 @@ import discord
 from discord.ext import commands
 import os
 import asyncio
+import ast
+import importlib
+import time
 import logging
-import colorlog
 import pyfiglet
 from dotenv import load_dotenv
-from flask import Flask
-import threading
+from collections import Counter
 import signal
 import sys
 
+import config
+import jsoncodec
+from logging_config import setup_logging
+
 # ============================================================
 # Configuración Inicial
 # ============================================================
@@ -26,51 +31,154 @@ def setup_environment():
 # Logging
 # ============================================================
 def configure_logging():
-    logger = logging.getLogger("discord_bot")
-    logger.setLevel(logging.INFO)
-    handler = colorlog.StreamHandler()
-    handler.setFormatter(
-        colorlog.ColoredFormatter(
-            "%(log_color)s[%(asctime)s] [%(levelname)-8s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-            log_colors={
-                "DEBUG": "cyan",
-                "INFO": "green",
-                "WARNING": "yellow",
-                "ERROR": "red",
-                "CRITICAL": "bold_red",
-            },
-        )
-    )
-    logger.addHandler(handler)
-    return logger
-
-# ============================================================
-# Flask Keep-Alive
-# ============================================================
-app = Flask("keep_alive")
-@app.route("/")
-def home():
-    return "Bot is alive"
-
-def run_flask_server():
-    server_thread = threading.Thread(
-        target=lambda: app.run(host="0.0.0.0", port=10000, use_reloader=False),
-        daemon=True,
-    )
-    server_thread.start()
-    logger.info("Servidor Flask iniciado en puerto 10000")
+    setup_logging()  # ver logging_config.py
+    return logging.getLogger("discord_bot")
 
 # ============================================================
 # BOT + INTENTS
 # ============================================================
+load_dotenv()
+
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 intents.guilds = True
 intents.messages = True
+intents.moderation = True  # on_audit_log_entry_create (cogs/auditlog.py)
+
+def member_cache_flags():
+    """
+    MEMBER_CACHE=all (por defecto) | none | lista de flags separadas por coma (joined,voice,...).
+    Menos flags = menos objetos Member en memoria.
+    """
+    value = os.getenv("MEMBER_CACHE", "all").lower().replace(" ", "")
+    if value == "all":
+        return discord.MemberCacheFlags.from_intents(intents)
+    if value == "none":
+        return discord.MemberCacheFlags.none()
+    return discord.MemberCacheFlags(**{flag: True for flag in value.split(",") if flag})
+
+# lazy: cada servidor se carga la primera vez que un comando necesita su lista de miembros
+# staggered: todos los servidores después de on_ready, escalonados por shard
+MEMBER_CHUNKING = os.getenv("MEMBER_CHUNKING", "lazy").lower()
+
+# ============================================================
+# Sharding
+# ============================================================
+def shard_options():
+    """
+    Lee el modo de sharding del entorno:
+    SHARDING=auto → AutoShardedBot (Discord decide cuántos shards)
+    SHARD_COUNT=4 [SHARD_IDS=0,1] → shards fijos (los de este proceso)
+    Sin SHARDING → un solo websocket, como siempre.
+    """
+    mode = os.getenv("SHARDING", "off").lower()
+    if mode in ("", "off", "0", "false"):
+        return False, {}
+
+    kwargs = {}
+    shard_count = os.getenv("SHARD_COUNT")
+    shard_ids = os.getenv("SHARD_IDS")
+    if shard_count:
+        kwargs["shard_count"] = int(shard_count)
+    if shard_ids:
+        if not shard_count:
+            raise ValueError("SHARD_IDS requiere SHARD_COUNT")
+        kwargs["shard_ids"] = [int(s) for s in shard_ids.split(",") if s.strip()]
+    return True, kwargs
+
+# Pausa entre chunks de miembros de un mismo shard
+CHUNK_DELAY = float(os.getenv("CHUNK_DELAY", 1.0))
+
+class SiquejBotMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Contadores para /metrics (cogs/metrics.py)
+        self.event_counts = Counter()
+        self.listener_counts = Counter()
+        self.shard_event_counts = Counter()
+        self._chunk_task = None
+        self._chunk_locks = {}
+
+    def dispatch(self, event_name, /, *args, **kwargs):
+        self.event_counts[event_name] += 1
+        if args:
+            guild = args[0] if isinstance(args[0], discord.Guild) else getattr(args[0], "guild", None)
+            if guild is not None:
+                self.shard_event_counts[guild.shard_id] += 1
+        for listener in self.extra_events.get(f"on_{event_name}", ()):
+            self.listener_counts[listener.__qualname__] += 1
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def ensure_chunked(self, guild):
+        """Carga la lista de miembros de un servidor si todavía no está en caché."""
+        if guild is None or guild.chunked:
+            return guild
+        lock = self._chunk_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            if not guild.chunked:
+                start = time.perf_counter()
+                await guild.chunk()
+                logger.info(f"Miembros de {guild.name} cargados bajo demanda ({len(guild.members)} en {time.perf_counter() - start:.2f}s)")
+        return guild
+
+    def shard_latencies(self):
+        """[(shard_id, latencia)] tanto con AutoShardedBot como con un solo shard."""
+        if hasattr(self, "latencies"):
+            return self.latencies
+        return [(self.shard_id or 0, self.latency)]
+
+    async def get_context(self, origin, /, *, cls=commands.Context):
+        ctx = await super().get_context(origin, cls=cls)
+        # Si el comando pertenece a un cog diferido, se carga y se vuelve a resolver
+        if ctx.command is None and ctx.invoked_with in LAZY_COMMANDS:
+            if await load_lazy_cog(LAZY_COMMANDS[ctx.invoked_with]):
+                ctx = await super().get_context(origin, cls=cls)
+        return ctx
+
+class SiquejBot(SiquejBotMixin, commands.Bot):
+    pass
+
+class ShardedSiquejBot(SiquejBotMixin, commands.AutoShardedBot):
+    pass
+
+def get_prefix(bot, message):
+    """Prefijo por servidor desde la caché de cogs/guildconfig.py (sin I/O por mensaje)."""
+    guild_config = bot.get_cog("GuildConfig")
+    if guild_config is None or message.guild is None:
+        return config.PREFIX
+    return guild_config.get(message.guild).prefix
+
+SHARDED, SHARD_KWARGS = shard_options()
+bot = (ShardedSiquejBot if SHARDED else SiquejBot)(
+    command_prefix=get_prefix,
+    intents=intents,
+    help_command=None,
+    chunk_guilds_at_startup=False,  # ver MEMBER_CHUNKING
+    member_cache_flags=member_cache_flags(),
+    enable_debug_events=bool(os.getenv("RECORD_EVENTS")),  # payloads crudos para cogs/recorder.py
+    **SHARD_KWARGS,
+)
+
+async def chunk_guilds_staggered():
+    """Pide los miembros de cada servidor de uno en uno por shard, de menor a mayor tamaño."""
+    start = time.perf_counter()
+    by_shard = {}
+    for guild in sorted(bot.guilds, key=lambda g: g.member_count or 0):
+        if not guild.chunked:
+            by_shard.setdefault(guild.shard_id, []).append(guild)
+
+    async def chunk_shard(guilds):
+        for guild in guilds:
+            try:
+                await guild.chunk()
+            except Exception as e:
+                logger.warning(f"Error cargando miembros de {guild.name}: {e}")
+            await asyncio.sleep(CHUNK_DELAY)
 
-bot = commands.Bot(command_prefix=",", intents=intents, help_command=None)
+    await asyncio.gather(*(chunk_shard(guilds) for guilds in by_shard.values()))
+    total = sum(len(guilds) for guilds in by_shard.values())
+    logger.info(f"Miembros cargados en {total} servidores ({len(by_shard)} shards) en {time.perf_counter() - start:.1f}s")
 
 # ============================================================
 # Eventos
@@ -81,13 +189,11 @@ async def on_ready():
     print(f"\n{banner}")
     logger.info(f"Bot conectado como {bot.user} (ID: {bot.user.id})")
     await bot.change_presence(activity=discord.Game("online"))
-
-    # SINCRONIZAR SLASH COMMANDS
-    try:
-        synced = await bot.tree.sync()
-        logger.info(f"{len(synced)} comandos slash sincronizados: {[cmd.name for cmd in synced]}")
-    except Exception as e:
-        logger.error(f"Error sincronizando comandos: {e}")
+    if SHARDED:
+        logger.info(f"Shards: {sorted(bot.shards)} de {bot.shard_count}")
+    if MEMBER_CHUNKING == "staggered" and (bot._chunk_task is None or bot._chunk_task.done()):
+        bot._chunk_task = asyncio.create_task(chunk_guilds_staggered())
+    # Los slash commands se sincronizan desde cogs/sync.py solo si cambiaron
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -102,14 +208,132 @@ async def on_command_error(ctx, error):
 # ============================================================
 # Carga de Cogs
 # ============================================================
+# Dependencias: cada cog se carga después de los cogs de su lista
+COG_DEPENDENCIES = {
+    "guildconfig": ["database"],
+    "kiss": ["database"],
+    "roles": ["logs", "auditlog", "actionqueue"],
+    "logs": ["eventbus", "auditlog", "guildconfig"],
+    "events": ["eventbus", "guildconfig"],
+    "antinuke": ["eventbus", "auditlog", "actionqueue", "guildconfig"],
+    "moderation": ["guildconfig"],
+    "fun": ["eventbus", "auditlog", "actionqueue"],
+    "backup": ["actionqueue"],
+    "names": ["eventbus"],
+    "snipe": ["eventbus"],
+    "ltc": ["httpclient"],
+    "crypto": ["httpclient"],
+    "roblox": ["httpclient"],
+    "translate": ["httpclient"],
+}
+
+# Cogs poco usados: no se cargan al iniciar, sino con el primer uso de uno de sus comandos.
+# Solo cogs sin listeners ni slash commands, porque esos necesitan estar cargados desde el inicio.
+LAZY_COGS = {
+    "backup": ["backup", "restore"],
+    "crypto": ["cripto"],
+    "roblox": ["roblox", "rblx", "rbx"],
+    "translate": ["translate", "setlang"],
+    "howto": ["howto", "howtoes"],
+    "coinflip": ["coinflip", "flip", "coin", "tictactoe", "ttt"],
+}
+LAZY_COMMANDS = {cmd: cog for cog, cmds in LAZY_COGS.items() for cmd in cmds}
+
+_lazy_locks = {}
+
+def discover_cogs():
+    return sorted(
+        filename[:-3] for filename in os.listdir("./cogs")
+        if filename.endswith(".py") and not filename.startswith("_")
+    )
+
+def cog_load_levels(names):
+    """Agrupa los cogs en niveles; cada nivel solo depende de niveles anteriores."""
+    pending = set(names)
+    levels = []
+    while pending:
+        level = sorted(n for n in pending if not set(COG_DEPENDENCIES.get(n, [])) & pending)
+        if not level:
+            logger.warning(f"Dependencias circulares entre cogs: {sorted(pending)}")
+            level = sorted(pending)
+        levels.append(level)
+        pending -= set(level)
+    return levels
+
+def cog_imports(name):
+    """Módulos que importa un cog en su nivel superior (sin ejecutarlo)."""
+    path = os.path.join("cogs", f"{name}.py")
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.add(node.module)
+    return sorted(m for m in modules if m.split(".")[0] != "cogs")
+
+def warm_imports(name):
+    """Importa las dependencias de un cog; se ejecuta en un hilo para solapar los imports."""
+    start = time.perf_counter()
+    for module in cog_imports(name):
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            # el error real aparecerá al cargar el cog
+            logging.getLogger("discord_bot").debug(f"Precarga de {module} (cog {name}) falló: {e!r}")
+    return time.perf_counter() - start
+
+async def timed_load(name):
+    start = time.perf_counter()
+    await bot.load_extension(f"cogs.{name}")
+    return time.perf_counter() - start
+
+async def load_lazy_cog(name):
+    extension = f"cogs.{name}"
+    lock = _lazy_locks.setdefault(name, asyncio.Lock())
+    async with lock:
+        if extension in bot.extensions:
+            return True
+        try:
+            elapsed = await timed_load(name)
+            logger.info(f"Cog diferido cargado: {extension} ({elapsed * 1000:.1f} ms)")
+            return True
+        except Exception as e:
+            logger.error(f"Error cargando cog diferido {extension}: {e}")
+            return False
+
 async def load_cogs():
-    for filename in os.listdir("./cogs"):
-        if filename.endswith(".py") and not filename.startswith("_"):
-            try:
-                await bot.load_extension(f"cogs.{filename[:-3]}")
-                logger.info(f"Cog cargado: cogs.{filename[:-3]}")
-            except Exception as e:
-                logger.error(f"Error cargando cog {filename}: {e}")
+    start = time.perf_counter()
+    names = [n for n in discover_cogs() if n not in LAZY_COGS]
+
+    # 1) Imports de terceros en paralelo (hilos)
+    import_times = await asyncio.gather(*(asyncio.to_thread(warm_imports, n) for n in names))
+    report = {n: {"import": t, "setup": None, "error": None} for n, t in zip(names, import_times)}
+
+    # 2) Setup de los cogs, nivel por nivel; los cogs de un mismo nivel se cargan a la vez
+    async def load_one(name):
+        try:
+            report[name]["setup"] = await timed_load(name)
+        except Exception as e:
+            report[name]["error"] = e
+            logger.error(f"Error cargando cog cogs.{name}: {e}")
+
+    for level in cog_load_levels(names):
+        await asyncio.gather(*(load_one(n) for n in level))
+
+    bot.cog_load_report = report
+    log_cog_report(report, time.perf_counter() - start)
+
+def log_cog_report(report, total):
+    lines = [f"{'cog':<14}{'import':>10}{'setup':>10}  estado"]
+    for name, r in sorted(report.items(), key=lambda item: -(item[1]["import"] + (item[1]["setup"] or 0))):
+        setup_ms = f"{r['setup'] * 1000:.1f}" if r["setup"] is not None else "-"
+        estado = "ok" if r["error"] is None else "error"
+        lines.append(f"{name:<14}{r['import'] * 1000:>10.1f}{setup_ms:>10}  {estado}")
+    cargados = sum(1 for r in report.values() if r["error"] is None)
+    lines.append(f"{cargados}/{len(report)} cogs en {total * 1000:.1f} ms • diferidos: {', '.join(sorted(LAZY_COGS))}")
+    logger.info("Carga de cogs:\n" + "\n".join(lines))
 
 # ============================================================
 # Cierre
@@ -122,6 +346,21 @@ def setup_signal_handlers(loop):
     for sig in (signal.SIGINT, signal.SIGTERM):
         loop.add_signal_handler(sig, lambda: asyncio.create_task(shutdown_bot()))
 
+# ============================================================
+# Perfil de ejecución
+# ============================================================
+def install_event_loop_policy():
+    """Con RUNTIME_PROFILE=fast usa uvloop si está instalado (el JSON lo decide jsoncodec.py)."""
+    if config.RUNTIME_PROFILE != "fast":
+        return "asyncio"
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("RUNTIME_PROFILE=fast pero uvloop no está instalado; se usa asyncio")
+        return "asyncio"
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
+
 # ============================================================
 # Main
 # ============================================================
@@ -140,8 +379,10 @@ async def main():
 if __name__ == "__main__":
     TOKEN = setup_environment()
     logger = configure_logging()
-    run_flask_server()
-    loop = asyncio.get_event_loop()
+    loop_impl = install_event_loop_policy()
+    logger.info(f"Perfil {config.RUNTIME_PROFILE}: loop {loop_impl}, JSON {jsoncodec.BACKEND}")
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
     setup_signal_handlers(loop)
     try:
         loop.run_until_complete(main())